@@ -0,0 +1,60 @@
+"""Compare building the workflow sections in one walk against a walk per section
+
+The separate walks return plain dicts, the single walk also makes the dicts read only and caches
+them on the parts. ``rebuild`` times the single walk of a workflow compiled before, with one
+changed screen.
+
+    python benchmarks/compile.py
+"""
+import timeit
+
+from sample import LargeWorkflow
+from workflows_engine.core.compiler import WorkflowCompiler
+
+
+def separate_walks(workflow):
+    return {
+        "validators": workflow.get_validators(),
+        "components": workflow.get_base_components(),
+        "flow": workflow.base_flow_task.as_dict(),
+        "json_validators": workflow.get_json_validators(),
+    }
+
+
+def single_walk(workflow):
+    return WorkflowCompiler().compile(workflow.base_flow_task)
+
+
+def change_screen(workflow):
+    """Compile the workflow and change one of its screens"""
+    single_walk(workflow)
+    workflow.base_flow_task.tasks[0].tasks[0].changed()
+
+
+def time_fresh(func, number, setup=None):
+    """Time ``func`` on a new workflow each time, so the dicts cached on the parts of the
+    workflow by ``WorkflowCompiler`` are only reused after ``setup``"""
+    seconds = 0
+    for _ in range(number):
+        workflow = LargeWorkflow()
+        if setup is not None:
+            setup(workflow)
+        seconds += timeit.timeit(lambda: func(workflow), number=1)
+    return seconds / number
+
+
+def main(number=20):
+    workflow = LargeWorkflow()
+    assert separate_walks(workflow) == single_walk(workflow)
+    timings = (
+        ("separate_walks", separate_walks, None),
+        ("single_walk", single_walk, None),
+        ("rebuild", single_walk, change_screen),
+    )
+    for name, func, setup in timings:
+        seconds = min(time_fresh(func, number, setup) for _ in range(3))
+        print("{:<16}{:>10.2f} ms".format(name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare the time to import only ``Workflow`` against importing the whole package
+
+Each import is timed in a fresh interpreter.
+
+    python benchmarks/imports.py
+"""
+import subprocess
+import sys
+
+STATEMENTS = (
+    ("workflow", "from workflows_engine import Workflow"),
+    ("package", "from workflows_engine import Workflow, components, validators"),
+)
+
+TIMER = """
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(statement):
+    output = subprocess.check_output([sys.executable, "-c", TIMER.format(statement)])
+    return float(output)
+
+
+def main(repeat=10):
+    for name, statement in STATEMENTS:
+        seconds = min(time_import(statement) for _ in range(repeat))
+        print("{:<16}{:>10.2f} ms".format(name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Compare building a workflow from scratch, rebuilding it and rebuilding it after a change
+
+    python benchmarks/incremental.py
+"""
+import timeit
+
+from sample import LargeWorkflow
+
+
+def main(number=10):
+    workflow = LargeWorkflow()
+    workflow.as_dict()
+
+    def fresh():
+        LargeWorkflow().as_dict()
+
+    def full():
+        workflow.clear_cache()
+        workflow.as_dict()
+
+    def incremental():
+        workflow.changed()
+        workflow.as_dict()
+
+    for func in (fresh, full, incremental):
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print("{:<16}{:>10.2f} ms".format(func.__name__, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
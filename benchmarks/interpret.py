@@ -0,0 +1,25 @@
+"""Run the sample workflow with the headless interpreter and report the cost of its path
+
+    python benchmarks/interpret.py
+"""
+import timeit
+
+from sample import LargeWorkflow
+from workflows_engine.core.interpreter import Interpreter
+
+
+def main(number=10):
+    workflow = LargeWorkflow(context={"done": True, "value": 1, "total": 200})
+    interpreter = Interpreter(workflow, handlers={"/api/save": lambda payload: {"saved": True}})
+    inputs = [{"$.values[{}]".format(index): index} for index in range(200)]
+
+    report = interpreter.run(inputs=inputs)
+    for key, value in report.as_dict().items():
+        print("{:<16}{:>10}".format(key, str(value)))
+
+    seconds = min(timeit.repeat(lambda: interpreter.run(inputs=inputs), number=number, repeat=3))
+    print("{:<16}{:>10.2f} ms".format("run", seconds / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
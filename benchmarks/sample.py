@@ -0,0 +1,67 @@
+"""A large workflow used by the benchmarks"""
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+
+
+class LargeWorkflow(Workflow):
+    """A workflow of ``screens`` screens split over sub flows of ten screens"""
+
+    def flow(self, screens=200):
+        is_int = validators.is_int(value_key="$.value")
+        is_true = validators.is_true(value_key="$.done")
+        sub_flow = None
+        for index in range(screens):
+            if index % 10 == 0:
+                sub_flow = self.add_task(
+                    task_type="flow", name="flow_{}".format(index), preconditions=is_true
+                )
+            sub_flow.add_task(
+                task_type="screen",
+                name="screen_{}".format(index),
+                components=[
+                    [
+                        components.MessageBox(
+                            identifier="message_{}".format(index),
+                            message_type="info",
+                            background_color="#d9d9d9",
+                            template="Screen {} of {{{{$.total}}}}".format(index),
+                        ),
+                    ],
+                    [
+                        components.Input(
+                            label="Value {}".format(index),
+                            target="value_{}".format(index),
+                            destination_path="$.values[{}]".format(index),
+                            validators=[is_int],
+                        ),
+                        components.Modal(
+                            title="Confirm",
+                            components=[
+                                [components.Textbox(content="Are you sure?")],
+                                [components.Button(text="Yes", action="submit", style="primary")],
+                            ],
+                            trigger_conditions=[is_true],
+                        ),
+                    ],
+                    [
+                        components.Table(
+                            identifier="table_{}".format(index),
+                            table_components=[
+                                components.Textbox(identifier="cell_{}".format(column))
+                                for column in range(5)
+                            ],
+                            table_data_path="$.rows",
+                            table_headers_path="$.headers",
+                        ),
+                    ],
+                    [components.Button(text="Next", action="next", style="primary")],
+                ],
+            )
+            sub_flow.add_task(
+                task_type="jsonrpc",
+                name="save_{}".format(index),
+                url="/api/save",
+                method="POST",
+                payload_paths=[{"key": "$.values", "result_key": "$.values"}],
+                preconditions=is_int,
+            )
@@ -0,0 +1,85 @@
+"""Compare translatable attributes stored in slots against a WeakKeyDictionary per attribute
+
+Reports the memory used by ``count`` buttons, the time to create them and to read their text,
+and the memory used by a large workflow.
+
+    python benchmarks/translate.py
+"""
+import gc
+import timeit
+import tracemalloc
+from weakref import WeakKeyDictionary
+
+from sample import LargeWorkflow
+from workflows_engine.core.components import Button
+from workflows_engine.core.translate import Translatable
+
+
+class WeakTranslatable:
+    """The previous implementation of ``Translatable``"""
+
+    _translator = staticmethod(lambda x: x)
+
+    def __init__(self):
+        self._refs = WeakKeyDictionary()
+
+    def __get__(self, inst, cls):
+        if inst is None:
+            return self
+        value = self._refs.get(inst)
+        if isinstance(value, str):
+            return self._translator(value)
+        return value
+
+    def __set__(self, inst, value):
+        self._refs[inst] = value
+
+
+class SlotButton:
+    __slots__ = ["_text"]
+
+    text = Translatable()
+
+    def __init__(self, text):
+        self.text = text
+
+
+class WeakButton:
+    __slots__ = ["__weakref__"]
+
+    text = WeakTranslatable()
+
+    def __init__(self, text):
+        self.text = text
+
+
+def measure(func):
+    """Get the result of func and the bytes it allocated"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(count=10000, number=10):
+    for cls in (SlotButton, WeakButton):
+        buttons, size = measure(lambda: [cls("Button {}".format(i)) for i in range(count)])
+        create = min(timeit.repeat(lambda: [cls("Button") for _ in range(count)], number=number))
+        read = min(timeit.repeat(lambda: [b.text for b in buttons], number=number))
+        print(
+            "{:<12}{:>10.1f} KiB{:>10.2f} ms create{:>10.2f} ms read".format(
+                cls.__name__, size / 1024, create / number * 1000, read / number * 1000
+            )
+        )
+        del buttons
+
+    _, size = measure(lambda: [Button("submit", "primary", "Button") for _ in range(count)])
+    print("{:<12}{:>10.1f} KiB".format("Button", size / 1024))
+    _, size = measure(LargeWorkflow)
+    print("{:<12}{:>10.1f} KiB".format("Workflow", size / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compare validating many contexts one by one against validating them as a batch
+
+    python benchmarks/validate.py
+"""
+import random
+import timeit
+
+from sample import LargeWorkflow
+
+
+def main(records=20000, number=3):
+    workflow = LargeWorkflow()
+    validators = workflow.get_compiled_validators()
+    rng = random.Random(0)
+    contexts = [
+        {"values": [rng.choice(("1", "x", 2, None)) for _ in range(200)]} for _ in range(records)
+    ]
+    masks = validators.get_error_masks(contexts)
+    for index in range(0, records, 997):
+        assert set(validators.get_errors(contexts[index])) == {
+            path for path, mask in masks.items() if mask[index]
+        }
+
+    def one_by_one():
+        return [validators.get_errors(context) for context in contexts]
+
+    def batch():
+        return validators.get_error_masks(contexts)
+
+    for func in (one_by_one, batch):
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print("{:<16}{:>10.2f} ms".format(func.__name__, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
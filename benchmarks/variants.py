@@ -0,0 +1,33 @@
+"""Compare building a variant of a workflow from scratch against cloning the built workflow
+
+    python benchmarks/variants.py
+"""
+import timeit
+
+from sample import LargeWorkflow
+from workflows_engine.core.tasks import Redirect
+
+
+def build(workflow):
+    variant = LargeWorkflow()
+    variant.replace_task("flow_0", Redirect(name="flow_0", url="/"))
+    return variant.as_dict()
+
+
+def clone(workflow):
+    variant = workflow.clone()
+    variant.replace_task("flow_0", Redirect(name="flow_0", url="/"))
+    return variant.as_dict()
+
+
+def main(number=10):
+    workflow = LargeWorkflow()
+    workflow.as_dict()
+    assert build(workflow) == clone(workflow)
+    for func in (build, clone):
+        seconds = min(timeit.repeat(lambda: func(workflow), number=number, repeat=3)) / number
+        print("{:<16}{:>10.2f} ms".format(func.__name__, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
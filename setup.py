@@ -28,8 +28,6 @@ setup(
         "Topic :: Software Development :: Build Tools",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3 :: Only",
@@ -37,7 +35,7 @@ setup(
     keywords="udes",
     package_dir={"workflows_engine": "src"},
     packages=get_packages("workflows_engine", "src"),
-    python_requires=">=3.5, <4",
+    python_requires=">=3.7, <4",
     install_requires=["simplejson"],
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
@@ -1,9 +1,4 @@
-from . import utils
-from . import exceptions
-from . import core
-from . import validators
-from . import components
-from .core.workflows import Workflow
+import importlib
 
 __version__ = "0.1"
 
@@ -15,3 +10,23 @@ __all__ = (
     "components",
     "Workflow",
 )
+
+# Submodules and attributes are imported when first accessed, so importing only ``Workflow`` does
+# not import the components
+_submodules = ("utils", "exceptions", "core", "validators", "components")
+_attributes = {"Workflow": ".core.workflows"}
+
+
+def __getattr__(name):
+    if name in _submodules:
+        value = importlib.import_module("." + name, __name__)
+    elif name in _attributes:
+        value = getattr(importlib.import_module(_attributes[name], __name__), name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
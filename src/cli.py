@@ -0,0 +1,87 @@
+"""Command line interface
+
+    python -m workflows_engine compile --output artifacts myapp.workflows
+"""
+import argparse
+import importlib
+import inspect
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .core.artifacts import ArtifactStore
+from .core.workflows import Workflow
+
+__all__ = ("main", "find_workflows", "compile_workflows")
+
+
+def find_workflows(module_name):
+    """Get the keys of the ``Workflow`` subclasses defined in a module"""
+    module = importlib.import_module(module_name)
+    return [
+        ArtifactStore.get_key(obj)
+        for _, obj in inspect.getmembers(module, inspect.isclass)
+        if issubclass(obj, Workflow) and obj is not Workflow and obj.__module__ == module.__name__
+    ]
+
+
+def _load_class(key):
+    module_name, _, qualname = key.rpartition(".")
+    obj = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _compile(key, path):
+    """Get the key and hash of the compiled workflow, or the key and the error raised building
+    it, e.g. when the workflow requires arguments"""
+    try:
+        workflow = _load_class(key)()
+        return key, ArtifactStore(path).write(workflow.get_compiled()), None
+    except Exception as error:
+        return key, None, "{}: {}".format(type(error).__name__, error)
+
+
+def compile_workflows(module_names, path, jobs=None, errors=None):
+    """Build the workflows of the modules in a process pool and write them to an ``ArtifactStore``
+
+    Workflows which cannot be built are skipped.
+
+    args:
+        errors: dict (default=None)
+            When given, the error of each skipped workflow is added by key
+
+    Returns the manifest of the compiled workflows.
+    """
+    keys = [key for module_name in module_names for key in find_workflows(module_name)]
+    manifest = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for key, workflow_hash, error in executor.map(_compile, keys, [path] * len(keys)):
+            if error is None:
+                manifest[key] = workflow_hash
+            elif errors is not None:
+                errors[key] = error
+    ArtifactStore(path).write_manifest(manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="workflows_engine")
+    commands = parser.add_subparsers(dest="command")
+    compile_parser = commands.add_parser("compile", help="Compile workflows to artifacts")
+    compile_parser.add_argument("modules", nargs="+", help="Modules defining the workflows")
+    compile_parser.add_argument("-o", "--output", default="workflow_artifacts")
+    compile_parser.add_argument("-j", "--jobs", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command != "compile":
+        parser.print_help()
+        return 2
+
+    errors = {}
+    manifest = compile_workflows(args.modules, args.output, args.jobs, errors)
+    for key, workflow_hash in sorted(manifest.items()):
+        print(workflow_hash, key)
+    for key, error in sorted(errors.items()):
+        print("Skipped {}: {}".format(key, error), file=sys.stderr)
+    return 1 if errors else 0
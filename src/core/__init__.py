@@ -1,15 +1,31 @@
-from . import translate
-from . import containers
-from . import validators
-from . import components
-from . import tasks
-from . import workflows
+import importlib
 
 __all__ = (
+    "cache",
+    "hashing",
     "translate",
     "validators",
     "containers",
     "components",
     "tasks",
+    "patch",
+    "readonly",
+    "jsonpath",
+    "loader",
     "workflows",
+    "artifacts",
+    "interpreter",
 )
+
+
+# Submodules are imported when first accessed
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module = importlib.import_module("." + name, __name__)
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,203 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from .workflows import CompiledWorkflow
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    shared_memory = None
+
+__all__ = ("ArtifactStore", "SharedWorkflowStore")
+
+
+# Shared workflow stores start with the length of their JSON index
+INDEX_HEADER = struct.Struct("<Q")
+
+# Artifacts are stored as the workflow JSON with an empty context, which is removed when loaded
+# so the context of a workflow can be appended
+EMPTY_CONTEXT = b"{}}"
+
+
+class ArtifactStore:
+    """A directory of compiled workflows stored by hash, with a manifest of key to hash
+
+    The key of a workflow is the dotted path of its class, see ``get_key``. Artifacts are memory
+    mapped when loaded so processes loading the same artifacts share their pages.
+
+    args:
+        path: str
+            The directory of the store, created when written to
+    """
+
+    __slots__ = ["path", "_manifest"]
+
+    manifest_name = "manifest.json"
+
+    def __init__(self, path):
+        self.path = path
+        self._manifest = None
+
+    @staticmethod
+    def get_key(workflow_class):
+        return "{}.{}".format(workflow_class.__module__, workflow_class.__qualname__)
+
+    def get_path(self, workflow_hash):
+        return os.path.join(self.path, workflow_hash[:2], workflow_hash + ".json")
+
+    def _write_file(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(temporary_path, path)
+
+    def write(self, compiled):
+        """Write a compiled workflow, returning its hash"""
+        path = self.get_path(compiled.hash)
+        if not os.path.exists(path):
+            self._write_file(path, b"".join((compiled.encoded, EMPTY_CONTEXT)))
+        return compiled.hash
+
+    def get_manifest(self):
+        if self._manifest is None:
+            try:
+                with open(os.path.join(self.path, self.manifest_name)) as fp:
+                    self._manifest = json.load(fp)
+            except FileNotFoundError:
+                self._manifest = {}
+        return self._manifest
+
+    def write_manifest(self, manifest):
+        """Update the manifest with the hashes of ``manifest``"""
+        self.get_manifest().update(manifest)
+        data = json.dumps(self._manifest, indent=2, sort_keys=True).encode()
+        self._write_file(os.path.join(self.path, self.manifest_name), data)
+
+    def get(self, key):
+        """Get the memory mapped compiled workflow of a key, None if not in the manifest"""
+        workflow_hash = self.get_manifest().get(key)
+        if workflow_hash is None:
+            return None
+
+        with open(self.get_path(workflow_hash), "rb") as fp:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        encoded = memoryview(mapped)[: -len(EMPTY_CONTEXT)]
+        return CompiledWorkflow.from_encoded(encoded, workflow_hash)
+
+
+class SharedWorkflowStore:
+    """Compiled workflows published in a shared memory segment, with an index of key to hash
+
+    The process starting the workers of a server, e.g. a pre-forking server, builds the workflows
+    once with ``create``. The workflows loaded from the store, see ``Workflow.load_artifact``,
+    serve their encoded JSON from the shared pages, so workers do not build the workflows or hold
+    a copy of them. Workers forked after the store is created use it directly, other processes
+    use ``attach``.
+
+    The segment is not modified once created. The process creating the store must ``unlink`` it
+    when the workers have stopped.
+
+    args:
+        memory: SharedMemory
+            The segment of the store
+    """
+
+    __slots__ = ["memory", "_index"]
+
+    get_key = staticmethod(ArtifactStore.get_key)
+
+    def __init__(self, memory):
+        self.memory = memory
+        self._index = None
+
+    @property
+    def name(self):
+        """The name of the segment, to ``attach`` to it"""
+        return self.memory.name
+
+    @classmethod
+    def create(cls, workflow_classes, name=None):
+        """Build the workflow classes without arguments and publish them in a new segment"""
+        if shared_memory is None:
+            raise RuntimeError("Shared workflow stores require Python 3.8 or later")
+
+        index = {}
+        encoded = []
+        offsets = {}
+        offset = 0
+        for workflow_class in workflow_classes:
+            compiled = workflow_class().get_compiled()
+            if compiled.hash not in offsets:
+                offsets[compiled.hash] = offset
+                encoded.append(compiled.encoded)
+                offset += len(compiled.encoded)
+            index[cls.get_key(workflow_class)] = [
+                compiled.hash,
+                offsets[compiled.hash],
+                len(compiled.encoded),
+            ]
+
+        index_data = json.dumps(index).encode()
+        start = INDEX_HEADER.size + len(index_data)
+        memory = shared_memory.SharedMemory(name=name, create=True, size=start + offset)
+        INDEX_HEADER.pack_into(memory.buf, 0, len(index_data))
+        memory.buf[INDEX_HEADER.size : start] = index_data
+        for data, data_offset in zip(encoded, offsets.values()):
+            memory.buf[start + data_offset : start + data_offset + len(data)] = data
+        return cls(memory)
+
+    @classmethod
+    def attach(cls, name):
+        """Open the store created with the segment ``name`` by another process
+
+        Before Python 3.13 segments are unlinked when the resource tracker of the process which
+        opened them exits, so only processes started by the process creating the store, which
+        share its tracker, should attach to it.
+        """
+        if shared_memory is None:
+            raise RuntimeError("Shared workflow stores require Python 3.8 or later")
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory)
+
+    def get_index(self):
+        """Get the dict of key to the hash, offset and length of each workflow"""
+        if self._index is None:
+            (index_length,) = INDEX_HEADER.unpack_from(self.memory.buf, 0)
+            start = INDEX_HEADER.size + index_length
+            index = json.loads(bytes(self.memory.buf[INDEX_HEADER.size : start]))
+            self._index = {
+                key: (workflow_hash, start + offset, length)
+                for key, (workflow_hash, offset, length) in index.items()
+            }
+        return self._index
+
+    def get_manifest(self):
+        """Get the dict of key to hash of the workflows in the store"""
+        return {key: value[0] for key, value in self.get_index().items()}
+
+    def get(self, key):
+        """Get the compiled workflow of a key using the shared pages, None if not in the store"""
+        entry = self.get_index().get(key)
+        if entry is None:
+            return None
+        workflow_hash, offset, length = entry
+        encoded = self.memory.buf[offset : offset + length]
+        return CompiledWorkflow.from_encoded(encoded, workflow_hash)
+
+    def close(self):
+        """Close the segment in this process, the compiled workflows from ``get`` must have been
+        released"""
+        self._index = None
+        self.memory.close()
+
+    def unlink(self):
+        """Remove the segment once no process uses it, called by the process which created it"""
+        self.memory.unlink()
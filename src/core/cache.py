@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from threading import Lock
+
+__all__ = ("LRUCache",)
+
+
+class LRUCache:
+    """A least recently used cache bounded by number of entries and total size
+
+    The cache may be used from several threads.
+
+    args:
+        max_entries: int
+            The maximum number of entries kept, the least recently used entry is evicted when
+            this is exceeded
+
+        max_size: int (default=None)
+            The maximum sum of the sizes given to ``set``. If None then the size is not bounded
+    """
+
+    __slots__ = ["max_entries", "max_size", "size", "_entries", "_lock"]
+
+    def __init__(self, max_entries, max_size=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, size=0):
+        """Add value to the cache, values larger than ``max_size`` are not cached"""
+        with self._lock:
+            self._pop(key)
+            if self.max_entries <= 0 or (self.max_size is not None and size > self.max_size):
+                return value
+            self._entries[key] = (value, size)
+            self.size += size
+            self._evict()
+            return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.size -= entry[1]
+        return entry[0]
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            self.max_size is not None and self.size > self.max_size
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
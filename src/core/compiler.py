@@ -0,0 +1,388 @@
+from itertools import count
+from operator import attrgetter
+from .readonly import read_only
+from .translate import (
+    PendingTranslation,
+    Translatable,
+    keep_untranslated,
+    pending_translations,
+    replace_pending,
+    use_message_keys,
+)
+
+__all__ = (
+    "WorkflowCompiler",
+    "Parts",
+    "SameIdentiferDifferentValues",
+    "mark_changed",
+    "new_version",
+    "get_part_version",
+    "get_state",
+    "set_state",
+)
+
+
+# Attributes of tasks, components and validators caching values derived from their other
+# attributes
+CACHE_ATTRIBUTES = frozenset(("_dict_cache", "_fingerprint"))
+# Attributes which are not part of the dict of a task, component or validator, which are not
+# pickled or copied
+UNTRACKED_ATTRIBUTES = CACHE_ATTRIBUTES | {"_version"}
+
+_slot_names = {}
+_attribute_getters = {}
+# Versions are shared by all parts, see ``new_version``
+_versions = count(1)
+
+
+class SameIdentiferDifferentValues(Exception):
+    """Two parts share an identifier, ``first`` and ``second`` are their dicts"""
+
+    def __init__(self, message, first=None, second=None):
+        super().__init__(message)
+        self.first = first
+        self.second = second
+
+
+def freeze_list(list_to_freeze):
+    return frozenset(
+        dict_to_set(value)
+        if isinstance(value, dict)
+        else freeze_list(value)
+        if isinstance(value, list)
+        else
+        value
+        for value in list_to_freeze
+    )
+
+
+def dict_to_set(d):
+    return frozenset(
+        (key, dict_to_set(value))
+        if isinstance(value, dict)
+        else (key, freeze_list(value))
+        if isinstance(value, list)
+        else (key, value)
+        for key, value in d.items()
+    )
+
+
+def new_version():
+    """Get a version greater than the versions of the parts changed so far"""
+    return next(_versions)
+
+
+def mark_changed(part):
+    """Mark a task, component or validator as modified so its dict, and the dicts of the tasks
+    and components containing it, are rebuilt when next compiled"""
+    part._version = new_version()
+    part._dict_cache = None
+
+
+def get_attribute_values(part):
+    """Get a tuple of the values of the attributes of a part, compared to find the attributes
+    which have been set since its dict was cached"""
+    getter = _attribute_getters.get(type(part))
+    if getter is None:
+        names = [name for name in get_slot_names(type(part)) if name not in UNTRACKED_ATTRIBUTES]
+        getter = _attribute_getters[type(part)] = attrgetter(*names) if names else lambda part: ()
+    try:
+        values = getter(part)
+    except AttributeError:
+        # Some slots are not set
+        values = tuple(
+            getattr(part, name, None)
+            for name in get_slot_names(type(part))
+            if name not in UNTRACKED_ATTRIBUTES
+        )
+    if hasattr(part, "__dict__"):
+        values = (values, tuple(part.__dict__.items()))
+    return values
+
+
+def get_part_version(part):
+    """Get the version of a task, component or validator, changed when its attributes have been
+    set since its dict was cached, see ``WorkflowCompiler.get_dict``"""
+    try:
+        cached = part._dict_cache
+    except AttributeError:
+        return 0
+    if cached is not None and get_attribute_values(part) != cached[4]:
+        mark_changed(part)
+    return part._version
+
+
+def get_slot_names(cls):
+    """Get the names of the slots of a class and its bases"""
+    names = _slot_names.get(cls)
+    if names is None:
+        names = {}
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ("__dict__", "__weakref__"):
+                    names[name] = None
+        names = _slot_names[cls] = tuple(names)
+    return names
+
+
+def get_state(part):
+    """Get the attributes of a task, component, validator or container to pickle or copy
+
+    The state is a dict of the attributes which are not None, without the cached values and the
+    version, versions are only compared within a process.
+    """
+    state = dict(getattr(part, "__dict__", ()))
+    for name in get_slot_names(type(part)):
+        value = getattr(part, name, None)
+        if value is not None and name not in UNTRACKED_ATTRIBUTES:
+            state[name] = value
+    return state
+
+
+def set_state(part, state):
+    """Set the attributes of a part from ``get_state``, the attributes left out are None and the
+    version of the part is 0"""
+    for name in get_slot_names(type(part)):
+        setattr(part, name, 0 if name == "_version" else None)
+    for name, value in state.items():
+        setattr(part, name, value)
+
+
+class Parts:
+    """Dicts of validators or components by identifier
+
+    A part seen before is skipped by identity. The values of different parts with the same
+    identifier are equal, or compared by fingerprint, a frozen form of their dict ignoring the
+    order of lists which is cached on the part with the dict it was computed from.
+
+    args:
+        part_type: str
+            The name of the parts, used in errors
+
+        dict_getter: Callable
+            Returns the dict of a part
+    """
+
+    __slots__ = ["part_type", "dict_getter", "result", "parts", "_seen"]
+
+    def __init__(self, part_type, dict_getter):
+        self.part_type = part_type
+        self.dict_getter = dict_getter
+        self.result = {}
+        # The first part added for each identifier
+        self.parts = {}
+        # Parts are kept so their ids cannot be reused
+        self._seen = {}
+
+    def get_fingerprint(self, part, part_dict=None):
+        if part_dict is None:
+            part_dict = self.dict_getter(part)
+        cached = getattr(part, "_fingerprint", None)
+        if cached is not None and cached[0] is part_dict:
+            return cached[1]
+
+        fingerprint = dict_to_set(part_dict)
+        try:
+            part._fingerprint = (part_dict, fingerprint)
+        except AttributeError:
+            pass
+        return fingerprint
+
+    def add(self, part):
+        """Add the dict of the part
+
+        Raises ``SameIdentiferDifferentValues`` when a part with the same identifier but different
+        values has been added.
+        """
+        if id(part) in self._seen:
+            return
+        self._seen[id(part)] = part
+
+        name = part.identifier
+        first = self.parts.get(name)
+        if first is None:
+            self.result[name] = self.dict_getter(part)
+            self.parts[name] = part
+            return
+
+        second = self.dict_getter(part)
+        if second is self.result[name] or second == self.result[name]:
+            return
+        first_fingerprint = self.get_fingerprint(first, self.result[name])
+        fingerprint = self.get_fingerprint(part, second)
+        if first_fingerprint is not fingerprint and first_fingerprint != fingerprint:
+            message = (
+                "Two {part_type} with the same identifer({name}) but different values: "
+                "{first} and {second}"
+            )
+            raise SameIdentiferDifferentValues(
+                message.format(
+                    part_type=self.part_type, name=name, first=self.result[name], second=second
+                ),
+                self.result[name],
+                second,
+            )
+
+
+class WorkflowCompiler:
+    """Builds the sections of a workflow dict in a single walk of its flow
+
+    Tasks and components are visited through their ``compile`` method. Tasks return their dict
+    and add the validators and components they use to the compiler, components add themselves,
+    their validators and the components they contain. The default implementations of ``compile``
+    use ``get_validators`` and ``get_base_components``/``get_components`` so custom tasks and
+    components only need to override it when that would walk their children more than once.
+
+    The dicts of tasks, components and validators are cached on them, see ``get_dict``, so
+    compiling a flow again only rebuilds the dicts of the parts which have changed and of the
+    parts containing them. Setting an attribute of a part changes it, while its lists and dicts
+    are only modified through its methods, or its ``changed`` method must be called after
+    modifying them.
+
+    args:
+        message_keys: bool (default=False)
+            When True translatable values are replaced by message keys and the strings are
+            added to the ``messages`` section by message key, see ``get_message_key``
+
+        since: int (default=None)
+            Dicts cached before the version ``since``, see ``new_version``, are rebuilt
+    """
+
+    __slots__ = [
+        "message_keys",
+        "since",
+        "version",
+        "state",
+        "validators",
+        "components",
+        "json_validators",
+        "_visited",
+    ]
+
+    def __init__(self, message_keys=False, since=None):
+        self.message_keys = message_keys
+        self.since = since or 0
+        # The dicts built are cached with this version, they are up to date while the parts they
+        # depend on have lower versions
+        self.version = new_version()
+        self.state = None
+        self.validators = Parts("validators", lambda x: self.get_dict(x, x.as_dict))
+        self.components = Parts(
+            "components", lambda x: self.get_dict(x, x.get_base_component_dict)
+        )
+        self.json_validators = Parts("json_validators", lambda x: self.get_dict(x, x.as_dict))
+        self._visited = {}
+
+    def compile(self, flow):
+        """Get the validators, components, flow and json_validators sections of a flow
+
+        Translated dicts are only cached for the translator and locale when the locale is known
+        or strings are not translated, otherwise the translatable strings are collected during
+        the walk and translated together at the end, with ``Translatable._batch_translator``
+        when set, so the cached dicts do not depend on how strings are translated.
+        """
+        translator = Translatable.get_translator()
+        locale = Translatable.get_locale()
+        batch_translator = Translatable._batch_translator
+        if (
+            batch_translator is None
+            and not self.message_keys
+            and (locale is not None or translator is keep_untranslated)
+        ):
+            self.state = (translator, locale)
+            return self._compile(flow)
+
+        self.state = (PendingTranslation, None)
+        with pending_translations():
+            workflow_dict = self._compile(flow)
+        if self.message_keys:
+            workflow_dict, messages = use_message_keys(workflow_dict)
+            workflow_dict["messages"] = messages
+            return workflow_dict
+        if batch_translator is not None:
+            return batch_translator.translate_pending(workflow_dict)
+        return replace_pending(
+            workflow_dict, lambda strings: {string: translator(str(string)) for string in strings}
+        )
+
+    def _compile(self, flow):
+        flow_dict = self.compile_task(flow)
+        workflow_dict = read_only(
+            {
+                "validators": self.validators.result,
+                "components": self.components.result,
+                "flow": flow_dict,
+                "json_validators": self.json_validators.result,
+            }
+        )
+        # The dict getters of the parts reference the compiler, the reference cycle would keep
+        # the parts of the walk until collected
+        for parts in (self.validators, self.components, self.json_validators):
+            parts.dict_getter = None
+        return dict(workflow_dict)
+
+    def compile_task(self, task):
+        return task.compile(self)
+
+    def get_dict(self, part, dict_getter, children=()):
+        """Get a read only copy of the dict of a part from ``dict_getter``, or the copy cached on
+        the part when neither the parts it depends on, see ``get_version``, nor the ``children``
+        dicts it contains have changed since it was cached.
+
+        The versions of a part are only compared when a dict is cached on it, so the first walk
+        of a flow only copies and caches the dicts it builds.
+        """
+        get_version = getattr(part, "get_version", None)
+        if get_version is None:
+            return dict_getter()
+
+        cached = part._dict_cache
+        if (
+            cached is not None
+            and cached[0] == self.state
+            and cached[1] > self.since
+            and max(get_version()) < cached[1]
+            and len(cached[2]) == len(children)
+            and all(old is new for old, new in zip(cached[2], children))
+        ):
+            return cached[3]
+
+        part_dict = read_only(dict_getter())
+        part._dict_cache = (
+            self.state,
+            self.version,
+            tuple(children),
+            part_dict,
+            get_attribute_values(part),
+        )
+        return part_dict
+
+    def _first_visit(self, part):
+        # Parts are kept so their ids cannot be reused during the walk
+        if id(part) in self._visited:
+            return False
+        self._visited[id(part)] = part
+        return True
+
+    def add_validators(self, validators):
+        """Add a validator or iterable of validators"""
+        for validator in validators or ():
+            if self._first_visit(validator):
+                self.validators.add(validator)
+
+    def add_json_validators(self, json_validators):
+        for json_validator in json_validators or ():
+            for validator in json_validator:
+                self.json_validators.add(validator)
+
+    def add_component(self, component):
+        """Add a component without the components it contains"""
+        self.components.add(component)
+        self.add_json_validators(component.json_validators)
+
+    def add_components(self, components):
+        """Compile a component or row of components, each component is only compiled once"""
+        for component in components:
+            if self._first_visit(component):
+                component.compile(self)
@@ -1,4 +1,8 @@
-from .translate import Translatable
+import copy
+
+from .compiler import get_part_version, get_state, mark_changed, set_state
+from .containers import Populate
+from .translate import Translatable, call_translated
 from ..exceptions import InvalidArguments
 
 
@@ -44,6 +48,18 @@ def validate_size(size):
     return size
 
 
+def get_values(value_dict, keys):
+    """Get a dict of the ``keys`` which are in ``value_dict`` to their values"""
+    return {key: value_dict[key] for key in keys if key in value_dict}
+
+
+def get_components_version(components):
+    """Get the versions of a list of components or rows of components, see ``get_version``"""
+    return tuple(
+        version for row in components for component in row for version in component.get_version()
+    )
+
+
 class Component:
     __slots__ = [
         "_identifier",
@@ -51,9 +67,11 @@ class Component:
         "flow_attrs",
         "update_context",
         "preconditions",
-        "__weakref__",
         "json_validators",
         "css_style",
+        "_fingerprint",
+        "_version",
+        "_dict_cache",
     ]
 
     def __init__(
@@ -73,16 +91,76 @@ class Component:
         self.preconditions = preconditions or []
         self.json_validators = json_validators or {}
         self.css_style = css_style
+        self._fingerprint = None
+        self._version = 0
+        self._dict_cache = None
 
     def __iter__(self):
         yield self
 
+    @staticmethod
+    def add_component_type(name, component_class):
+        COMPONENT_TYPE_MAPPING[name] = component_class
+
+    @classmethod
+    def from_dict(cls, name, component_dict, flow_dict, loader):
+        """Create the component from its dict in the components section of a workflow dict and
+        its dict in a screen or containing component, see ``WorkflowLoader``"""
+        return cls(**cls.kwargs_from_dict(name, component_dict, flow_dict, loader))
+
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        """Get the arguments creating the component from its dicts"""
+        kwargs = {
+            "identifier": name,
+            "destination_path": flow_dict.get("destination_path"),
+            "flow_attrs": flow_dict.get("attrs"),
+            "update_context": flow_dict.get("update_context"),
+            "preconditions": loader.get_validators(flow_dict.get("preconditions")),
+        }
+        if "css_style" in component_dict:
+            kwargs["css_style"] = component_dict["css_style"]
+        return kwargs
+
+    def get_version(self):
+        """Get the versions of the component, of the validators it references and of the
+        components it contains"""
+        return (
+            (get_part_version(self),)
+            + tuple(get_part_version(validator) for validator in self.get_validators())
+            + tuple(
+                get_part_version(validator)
+                for json_validator in self.json_validators
+                for validator in json_validator
+            )
+        )
+
+    def changed(self):
+        """Mark the component as modified after modifying its lists or dicts in place"""
+        mark_changed(self)
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
+    def copy(self):
+        """Get a shallow copy of the component to modify, e.g. in a variant of a workflow
+
+        The copy shares the lists of the component, so assign new lists rather than modifying
+        them.
+        """
+        component = copy.copy(self)
+        mark_changed(component)
+        return component
+
     def _get_default_identifier(self):
         return self.__class__.__name__.lower()
 
     @property
     def identifier(self):
-        return self._identifier or self._get_default_identifier()
+        return self._identifier or call_translated(self._get_default_identifier)
 
     def get_flow_attrs(self):
         return self.flow_attrs
@@ -125,6 +203,15 @@ class Component:
     def get_components(self):
         yield self
 
+    def compile(self, compiler):
+        """Add the component, its validators and the components it contains to a
+        ``WorkflowCompiler``"""
+        compiler.add_component(self)
+        compiler.add_validators(self.get_validators())
+        for components in self.get_components():
+            if components is not self:
+                compiler.add_components(components)
+
 
 class Textbox(Component):
     __slots__ = ["content", "align"]
@@ -134,6 +221,12 @@ class Textbox(Component):
         self.content = content
         self.align = align
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(get_values(component_dict, ("content", "align")))
+        return kwargs
+
     def get_base_component_dict(self):
         return {
             "type": "textbox",
@@ -155,6 +248,12 @@ class Metrics(Component):
         super().__init__(**kwargs)
         self.label = label
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(get_values(component_dict, ("label",)))
+        return kwargs
+
     def get_base_component_dict(self):
         return {"type": "metrics", "label": self.label}
 
@@ -178,6 +277,7 @@ class Input(Component):
         "response_path",
         "json_validators",
         "max_length",
+        "_label",
     ]
 
     label = Translatable()
@@ -225,6 +325,28 @@ class Input(Component):
         # By default, limit to max 100 characters
         self.max_length = max_length or 100
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        populate = component_dict.get("populate")
+        kwargs.update(
+            component_type=component_dict["type"],
+            validators=loader.get_validators(component_dict.get("validator")),
+            json_validators=loader.get_json_validators(component_dict.get("json_validators")),
+            populate=populate and Populate(
+                loader.get_validators(populate["validators"]),
+                path=populate.get("path"),
+                value=populate.get("value"),
+            ),
+        )
+        keys = (
+            "label", "target", "obscure", "input_key", "input_ref", "output_ref", "output",
+            "default_value", "url", "method", "payload_paths", "payload", "response_path",
+            "max_length",
+        )
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def _get_default_identifier(self):
         return "_".join([self.component_type, self.target.lower().replace(" ", "_")])
 
@@ -278,7 +400,7 @@ class Input(Component):
         yield from super().get_validators()
         yield from self.validators
         if self.populate:
-            self.populate.get_validators()
+            yield from self.populate.get_validators()
 
     def get_payload(self):
         return self.payload
@@ -341,6 +463,17 @@ class InputNumber(Input):
         self.disabled_path = disabled_path or ""
         self.second_style = second_style is None and True or second_style
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        del kwargs["component_type"]
+        keys = (
+            "max_number", "min_number", "readonly", "step", "disabled", "max_number_path",
+            "min_number_path", "disabled_path", "second_style",
+        )
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
 
 class InputWithSuggestions(Input):
     __slots__ = [
@@ -375,6 +508,13 @@ class InputWithSuggestions(Input):
         super().__init__(**kwargs)
         self.suggestions_path, self.suggestions = self.get_suggestions(suggestions_path, suggestions)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        del kwargs["component_type"]
+        kwargs.update(get_values(component_dict, ("suggestions_path", "suggestions")))
+        return kwargs
+
     def get_base_component_dict(self):
         component = super().get_base_component_dict()
         component["type"] = "input_with_suggestions"
@@ -422,6 +562,13 @@ class DateTime(Input):
         self.component_type = self.get_datetime_type(datetime_type)
         self.open_to = self.get_open_to(open_to)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["datetime_type"] = kwargs.pop("component_type")
+        kwargs.update(get_values(component_dict, ("open_to",)))
+        return kwargs
+
     def get_base_component_dict(self):
         component = super().get_base_component_dict()
         if self.open_to:
@@ -443,6 +590,7 @@ class Button(Component):
         "payload_paths",
         "payload",
         "response_path",
+        "_text",
     ]
 
     text = Translatable()
@@ -481,6 +629,17 @@ class Button(Component):
         # NOTE: No handling exists for this currently.
         self.response_path = response_path
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["disabling_validators"] = loader.get_validators(component_dict.get("disabled"))
+        keys = (
+            "action", "style", "text", "show_confirmation", "value", "destination_path",
+            "load_values", "url", "method", "payload_paths", "payload", "response_path",
+        )
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def _get_default_identifier(self):
         return "_".join([self.action, "button"])
 
@@ -541,7 +700,9 @@ class DisplayData(Component):
     __slots__ = [
         "data",
         "display_type",
-        "max_height"
+        "max_height",
+        "_title",
+        "_subtitle",
     ]
 
     title = Translatable()
@@ -555,6 +716,13 @@ class DisplayData(Component):
         self.display_type = display_type
         self.max_height = max_height
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["display_type"] = component_dict["type"]
+        kwargs.update(get_values(component_dict, ("title", "data", "subtitle", "max_height")))
+        return kwargs
+
     def _get_default_identifier(self):
         return "_".join([self.display_type, self.title.lower().replace(" ", "_")])
 
@@ -609,6 +777,14 @@ class OptionList(DisplayData):
         self.grid = grid
         self.grid_min_item_width = grid_min_item_width
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        # The display type of option lists is not in their dict, they are displayed as details
+        kwargs.update(display_type="details", grid=component_dict["type"] == "optionlist_grid")
+        kwargs.update(get_values(component_dict, ("grid_min_item_width",)))
+        return kwargs
+
     def get_base_component_dict(self):
         component = super().get_base_component_dict()
         if self.grid:
@@ -648,6 +824,17 @@ class Modal(Component):
         self.trigger = self.validate_trigger(trigger)
         self.css_style = css_style
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(
+            title=component_dict["title"],
+            components=loader.get_components(component_dict["components"]),
+            trigger_conditions=loader.get_validators(component_dict.get("trigger_conditions")),
+            trigger=component_dict["trigger"],
+        )
+        return kwargs
+
     def validate_trigger(self, trigger):
         trigger_values = ["onLoad", "onBlur", "onSubmit"]
         if trigger in trigger_values:
@@ -676,6 +863,9 @@ class Modal(Component):
         yield from super().get_components()
         yield from self.components
 
+    def get_version(self):
+        return super().get_version() + get_components_version(self.components)
+
     def get_validators(self):
         yield from super().get_validators()
         yield from self.trigger_conditions
@@ -683,6 +873,13 @@ class Modal(Component):
             for component in row:
                 yield from component.get_validators()
 
+    def compile(self, compiler):
+        compiler.add_component(self)
+        compiler.add_validators(super().get_validators())
+        compiler.add_validators(self.trigger_conditions)
+        for row in self.components:
+            compiler.add_components(row)
+
 
 class Checkbox(Component):
     """
@@ -723,6 +920,13 @@ class Checkbox(Component):
         self.value_path, self.value = self.get_value(value_path, value)
         self.destination_path = destination_path
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        keys = ("label", "destination_path", "value", "value_path")
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_base_component_dict(self):
         base_component_dict = {
             "type": "checkbox",
@@ -773,6 +977,7 @@ class CheckboxList(Component):
         "destination_path",
         "data_path",
         "data",
+        "_title",
     ]
 
     title = Translatable()
@@ -801,6 +1006,13 @@ class CheckboxList(Component):
         self.destination_path = destination_path
         self.data_path, self.data = self.get_data(data_path, data)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        keys = ("title", "destination_path", "data_path", "data")
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_base_component_dict(self):
         base_component_dict = {
             "type": "checkbox_list",
@@ -815,7 +1027,15 @@ class CheckboxList(Component):
 
 
 class MessageBox(Component):
-    __slots__ = ["type", "size", "box", "title", "background_color", "css_title_style"]
+    __slots__ = [
+        "type",
+        "size",
+        "box",
+        "title",
+        "background_color",
+        "css_title_style",
+        "_template",
+    ]
 
     template = Translatable()
 
@@ -839,6 +1059,15 @@ class MessageBox(Component):
         self.background_color = background_color
         self.css_title_style = css_title_style
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        message = component_dict["message"]
+        kwargs.update(message_type=message["type"], template=message["template"])
+        keys = ("background_color", "box", "size", "title", "css_title_style")
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_message(self):
         return {
             "template": self.template,
@@ -871,6 +1100,7 @@ class Toggle(Component):
         "preconditions",
         "value",
         "destination_path",
+        "_label",
     ]
 
     label = Translatable()
@@ -882,6 +1112,12 @@ class Toggle(Component):
         self.value = value
         self.destination_path = destination_path
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(get_values(component_dict, ("style", "label", "value", "destination_path")))
+        return kwargs
+
     def get_base_component_dict(self):
         return {
             "type": "toggle",
@@ -901,6 +1137,7 @@ class Selection(Component):
         "options_key",
         "options_values",
         "default_value",
+        "_label",
     ]
 
     label = Translatable()
@@ -935,6 +1172,17 @@ class Selection(Component):
         self.destination_path = destination_path
         self.default_value = default_value
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["validators"] = loader.get_validators(component_dict.get("validator"))
+        keys = (
+            "label", "style", "is_required", "destination_path", "options_key", "options_values",
+            "default_value",
+        )
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_base_component_dict(self):
         return {
             "type": "select",
@@ -964,6 +1212,13 @@ class Image(Component):
         self.style = style
         self.title = title
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        keys = ("url", "style", "title", "max_Height", "max_Width")
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_base_component_dict(self):
         base_component_dict = {
             "type": "image",
@@ -1007,6 +1262,14 @@ class Repeat(Component):
         self.times_to_repeat_path = times_to_repeat_path
         self.destination_path = destination_path
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["components"] = loader.get_components(component_dict["components"])
+        keys = ("times_to_repeat", "times_to_repeat_path", "destination_path")
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     @staticmethod
     def _validate_args(times_to_repeat, times_to_repeat_path):
         if times_to_repeat is not None and times_to_repeat_path is not None:
@@ -1039,11 +1302,20 @@ class Repeat(Component):
         yield from super().get_components()
         yield from self.components
 
+    def get_version(self):
+        return super().get_version() + get_components_version(self.components)
+
     def get_validators(self):
         yield from super().get_validators()
         for component in self.components:
             yield from component.get_validators()
 
+    def compile(self, compiler):
+        compiler.add_component(self)
+        compiler.add_validators(super().get_validators())
+        for row in self.components:
+            compiler.add_components(row)
+
 class Table(Component):
     """
     A meta component which can be used to put other components into a table.
@@ -1154,6 +1426,17 @@ class Table(Component):
         self.table_filter_path = table_filter_path
         self.table_filter_input_label = table_filter_input_label
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["table_components"] = loader.get_components(component_dict["components"])[0]
+        keys = (
+            "table_data_path", "table_headers_path", "table_container_width", "table_filter_path",
+            "table_filter_input_label",
+        )
+        kwargs.update(get_values(component_dict, keys))
+        return kwargs
+
     def get_base_component_dict(self):
         components_dicts = [
             component.get_flow_component_dict() for component in self.table_components
@@ -1177,11 +1460,19 @@ class Table(Component):
         yield from super().get_components()
         yield from self.table_components
 
+    def get_version(self):
+        return super().get_version() + get_components_version(self.table_components)
+
     def get_validators(self):
         yield from super().get_validators()
         for component in self.table_components:
             yield from component.get_validators()
 
+    def compile(self, compiler):
+        compiler.add_component(self)
+        compiler.add_validators(super().get_validators())
+        compiler.add_components(self.table_components)
+
 
 class Container(Component):
     """A container with components and optional styling."""
@@ -1195,6 +1486,13 @@ class Container(Component):
         self.style = validate_style(style, ("transparent",))
         self.title = title
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs["components"] = loader.get_components(component_dict["components"])
+        kwargs.update(get_values(component_dict, ("width", "style", "title")))
+        return kwargs
+
     def validate_components(self, components):
         """Ensure no Container or ContainerRow components are added to Containers"""
         invalid_component_types = (Container, ContainerRow, Modal)
@@ -1222,6 +1520,9 @@ class Container(Component):
         yield from super().get_components()
         yield from self.components
 
+    def get_version(self):
+        return super().get_version() + get_components_version(self.components)
+
 
 class ContainerRow(Component):
     """A row of containers, where the height of all containers in the row is set."""
@@ -1236,6 +1537,16 @@ class ContainerRow(Component):
         self.components = self.validate_components(components)
         self.height = validate_size(height)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        # Each container is the only component of a row, and is loaded as only containers can
+        # be added to container rows
+        rows = loader.get_components(component_dict["components"])
+        kwargs.update(components=[container.load() for row in rows for container in row])
+        kwargs.update(get_values(component_dict, ("height",)))
+        return kwargs
+
     def validate_components(self, components):
         """Ensure only Container components are added to ContainerRows"""
         if any(not isinstance(component, Container) for component in components):
@@ -1260,6 +1571,9 @@ class ContainerRow(Component):
         for component in self.components:
             yield from component.get_components()
 
+    def get_version(self):
+        return super().get_version() + get_components_version(self.components)
+
     def get_validators(self):
         """Include validators of child components if applicable (e.g. child container validators)"""
         yield from super().get_validators()
@@ -1270,6 +1584,11 @@ class ContainerRow(Component):
                 for container_component in container_component_list:
                     yield from container_component.get_validators()
 
+    def compile(self, compiler):
+        compiler.add_component(self)
+        compiler.add_validators(super().get_validators())
+        compiler.add_components(self.components)
+
 
 class Spacer(Component):
     """A component used for spacing."""
@@ -1280,6 +1599,12 @@ class Spacer(Component):
         super().__init__(**kwargs)
         self.amount = self.validate_amount(amount)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(get_values(component_dict, ("amount",)))
+        return kwargs
+
     def validate_amount(self, amount):
         if amount < 1:
             raise InvalidArguments("Amount cannot be below 1.")
@@ -1307,6 +1632,12 @@ class InstructionBox(Component):
         self.direction = self.validate_direction(direction)
         self.style = validate_style(style)
 
+    @classmethod
+    def kwargs_from_dict(cls, name, component_dict, flow_dict, loader):
+        kwargs = super().kwargs_from_dict(name, component_dict, flow_dict, loader)
+        kwargs.update(get_values(component_dict, ("message", "direction", "style")))
+        return kwargs
+
     def validate_direction(self, direction):
         supported_directions = ("none", "left", "right", "up", "down")
 
@@ -1325,3 +1656,33 @@ class InstructionBox(Component):
             "direction": self.direction,
             "style": self.style,
         }
+
+
+COMPONENT_TYPE_MAPPING = {
+    "textbox": Textbox,
+    "metrics": Metrics,
+    "input": Input,
+    "input_number": InputNumber,
+    "input_with_suggestions": InputWithSuggestions,
+    "datetime": DateTime,
+    "date": DateTime,
+    "time": DateTime,
+    "button": Button,
+    "list": DisplayData,
+    "details": DisplayData,
+    "optionlist": OptionList,
+    "optionlist_grid": OptionList,
+    "modal": Modal,
+    "checkbox": Checkbox,
+    "checkbox_list": CheckboxList,
+    "message_box": MessageBox,
+    "toggle": Toggle,
+    "select": Selection,
+    "image": Image,
+    "repeated_field": Repeat,
+    "table": Table,
+    "container": Container,
+    "container_row": ContainerRow,
+    "spacer": Spacer,
+    "instruction_box": InstructionBox,
+}
@@ -1,13 +1,20 @@
+from .compiler import get_state, set_state
 from .translate import Translatable
 from ..exceptions import InvalidArguments
 
 
 class Container:
-    __slots__ = ["__weakref__"]
+    __slots__ = []
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
 
 
 class Message(Container):
-    __slots__ = ["message_type"]
+    __slots__ = ["message_type", "_template"]
 
     template = Translatable()
 
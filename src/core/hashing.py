@@ -0,0 +1,208 @@
+import json
+from hashlib import blake2b, sha512
+
+__all__ = ("WorkflowHasher", "hash_encoded", "get_workflow_hash")
+
+
+# Sections of workflow dicts only emitted by some workflows, hashed when not empty
+OPTIONAL_SECTIONS = ("messages", "path_tokens", "template_tokens")
+
+
+_stable_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+def encode(value):
+    """Stable JSON encoding used for hashing"""
+    return _stable_encoder.encode(value).encode()
+
+
+def hash_encoded(encoded, locale=None):
+    """Get the hash of an encoded workflow dict without the hash and context values, the locale
+    the workflow was translated to is part of the hash when not None"""
+    digest = sha512(encoded)
+    if locale is not None:
+        digest.update("\nlocale={}".format(locale).encode())
+    return digest.hexdigest()
+
+
+def get_workflow_hash(workflow_dict, locale=None):
+    """Get the hash of a workflow dict, see ``hash_encoded``, without the content hashes added by
+    ``WorkflowHasher.add_hashes``"""
+    workflow_dict = {
+        key: value for key, value in workflow_dict.items() if key not in ("hash", "context")
+    }
+    workflow_dict["flow"] = _remove_task_hashes(workflow_dict["flow"])
+    workflow_dict["components"] = {
+        name: WorkflowHasher.own_values(component_dict)
+        for name, component_dict in workflow_dict["components"].items()
+    }
+    return hash_encoded(json.dumps(workflow_dict).encode(), locale)
+
+
+def _remove_task_hashes(task_dict):
+    task_dict = WorkflowHasher.own_values(task_dict)
+    if task_dict.get("type") == "flow":
+        task_dict["tasks"] = [_remove_task_hashes(task) for task in task_dict["tasks"]]
+    return task_dict
+
+
+def component_names(component_dict):
+    """Get the identifiers of the components referenced by a base component dict"""
+    for row in component_dict.get("components") or []:
+        if not isinstance(row, list):
+            row = [row]
+        for flow_component in row:
+            if isinstance(flow_component, dict) and "name" in flow_component:
+                yield flow_component["name"]
+
+
+class WorkflowHasher:
+    """Computes content hashes for the sections of a workflow
+
+    The hash of a task or component is composed of the hash of its own values and the hashes of
+    its children, so unchanged parts of a workflow keep their hash when another part changes. The
+    children of a task include the components and validators it references by name. The hash of
+    the workflow is that of its encoded dict, see ``hash_encoded``, the content hashes are only
+    computed to emit them or to compare workflows, see ``make_patch``.
+
+    The hashed dicts are not modified, they may be shared with other workflows, see
+    ``add_hashes`` to emit the hashes.
+
+    args:
+        memo: dict (default=None)
+            The ``memo`` of a previous hasher, the hashes of the dicts it hashed are reused when
+            the dicts and the hashes of their children are unchanged. Dicts must not be modified
+            once hashed.
+    """
+
+    __slots__ = [
+        "previous",
+        "memo",
+        "component_hashes",
+        "validator_hashes",
+        "task_hashes",
+        "section_hashes",
+    ]
+
+    def __init__(self, memo=None):
+        self.previous = memo or {}
+        # The dict, children and hash of each dict hashed by id of the dict
+        self.memo = {}
+        self.component_hashes = {}
+        self.validator_hashes = {}
+        # Task hashes by the id of the task dict
+        self.task_hashes = {}
+        # Hashes of the validators, components and json validators by section name
+        self.section_hashes = {}
+
+    def digest(self, value, children=(), exclude=None):
+        """Get the hash of ``value`` without the ``exclude`` keys and the hashes of its children"""
+        entry = self.previous.get(id(value))
+        if entry is not None and entry[0] is value and entry[1] == children:
+            value_hash = entry[2]
+        else:
+            digest = blake2b(
+                encode(self.own_values(value, exclude) if exclude else value), digest_size=16
+            )
+            for child in children:
+                digest.update(b"\n")
+                digest.update(child.encode())
+            value_hash = digest.hexdigest()
+        if isinstance(value, dict):
+            self.memo[id(value)] = (value, children, value_hash)
+        return value_hash
+
+    @staticmethod
+    def own_values(part_dict, exclude=("hash",)):
+        return {key: value for key, value in part_dict.items() if key not in exclude}
+
+    def get_references(self, task_dict):
+        """Get the hashes of the components and validators referenced by a task dict"""
+        names = list(task_dict.get("preconditions") or [])
+        conditions = task_dict.get("conditions")
+        if isinstance(conditions, list):
+            names.extend(conditions)
+        config = task_dict.get("config")
+        if isinstance(config, dict):
+            names.extend(config.get("conditions") or [])
+        references = [
+            self.validator_hashes[name] for name in names if name in self.validator_hashes
+        ]
+        references.extend(
+            self.component_hashes[name]
+            for name in component_names(task_dict)
+            if name in self.component_hashes
+        )
+        return references
+
+    def hash_task(self, task_dict):
+        """Get the hash of a task dict including the tasks of sub flows"""
+        children = self.get_references(task_dict)
+        if task_dict.get("type") == "flow":
+            children.extend(self.hash_task(task) for task in task_dict["tasks"])
+            task_hash = self.digest(task_dict, children, ("hash", "tasks"))
+        else:
+            task_hash = self.digest(task_dict, children, ("hash",))
+
+        self.task_hashes[id(task_dict)] = task_hash
+        return task_hash
+
+    def hash_components(self, components):
+        """Get the hash of each component dict including the components it contains"""
+        for name in components:
+            self._hash_component(name, components, ())
+        return {name: self.component_hashes[name] for name in components}
+
+    def _hash_component(self, name, components, parents):
+        component_hash = self.component_hashes.get(name)
+        if component_hash is not None:
+            return component_hash
+
+        component_dict = components[name]
+        children = [
+            self._hash_component(child, components, parents + (name,))
+            for child in component_names(component_dict)
+            if child in components and child not in parents and child != name
+        ]
+        component_hash = self.digest(component_dict, children, ("hash",))
+        self.component_hashes[name] = component_hash
+        return component_hash
+
+    def hash_validators(self, validators):
+        hashes = {name: self.digest(validator) for name, validator in validators.items()}
+        self.validator_hashes.update(hashes)
+        return hashes
+
+    def hash_parts(self, workflow_dict):
+        """Compute the content hashes of the flow, validators, components and other sections of
+        a workflow dict, kept in ``task_hashes``, ``component_hashes`` and ``section_hashes``"""
+        sections = (
+            ("json_validators", self.hash_validators(workflow_dict.get("json_validators", {}))),
+            ("validators", self.hash_validators(workflow_dict["validators"])),
+            ("components", self.hash_components(workflow_dict["components"])),
+        )
+        for section in OPTIONAL_SECTIONS:
+            values = workflow_dict.get(section)
+            if values:
+                sections += (
+                    (section, {key: self.digest(value) for key, value in values.items()}),
+                )
+        self.section_hashes.update(sections)
+        self.hash_task(workflow_dict["flow"])
+
+    def add_hashes(self, workflow_dict):
+        """Get a copy of a hashed workflow dict with the ``hash`` of each task and component
+        added to a copy of its dict"""
+        workflow_dict = dict(workflow_dict)
+        workflow_dict["flow"] = self._add_task_hashes(workflow_dict["flow"])
+        workflow_dict["components"] = {
+            name: dict(component_dict, hash=self.component_hashes[name])
+            for name, component_dict in workflow_dict["components"].items()
+        }
+        return workflow_dict
+
+    def _add_task_hashes(self, task_dict):
+        hashed = dict(task_dict, hash=self.task_hashes[id(task_dict)])
+        if task_dict.get("type") == "flow":
+            hashed["tasks"] = [self._add_task_hashes(task) for task in task_dict["tasks"]]
+        return hashed
@@ -0,0 +1,432 @@
+"""Runs workflows in Python the way a client would, e.g. to simulate or benchmark their flows
+
+    interpreter = Interpreter(MyWorkflow(), handlers={"/api/save": save})
+    report = interpreter.run(inputs=[{"$.name": "Alice"}])
+    report.round_trips, report.bytes_sent, report.bytes_received, report.steps
+"""
+import json
+from copy import deepcopy
+from urllib.parse import urlencode
+from .jsonpath import PathAccessor, WorkflowPaths, compile_template
+from .validators import CompiledValidators, VALIDATOR_TYPE_MAPPING
+
+__all__ = ("Interpreter", "RunReport", "InterpreterError", "render_template")
+
+
+class InterpreterError(Exception):
+    """A workflow cannot be run, e.g. a task type is not known or a JSON-RPC url has no handler"""
+
+
+def render_template(template, context):
+    """Replace the jsonpaths of a template in braces with their values in the context, see
+    ``compile_template``"""
+    parts = []
+    for segment in compile_template(template):
+        if isinstance(segment, str):
+            parts.append(segment)
+        elif isinstance(segment, PathAccessor):
+            value = segment.get(context)
+            if value is not None:
+                parts.append(str(value))
+    return "".join(parts)
+
+
+class _Jump(Exception):
+    """Raised by a condition to continue with the task ``task`` of the flow ``flow``"""
+
+    def __init__(self, flow, task):
+        super().__init__(flow, task)
+        self.flow = flow
+        self.task = task
+
+
+class _Break(Exception):
+    """Raised by a break event to leave the loop running it"""
+
+
+class _Stop(Exception):
+    """Raised by a redirect to end the run"""
+
+
+class RunReport:
+    """The result of running a workflow with ``Interpreter.run``
+
+    attrs:
+        context: dict
+            The context at the end of the run
+
+        path: list
+            The ``(flow name, task name)`` of each task run, in order, without the tasks skipped
+            by their preconditions
+
+        round_trips: int
+            The number of requests made, fetching the workflow and each JSON-RPC call
+
+        bytes_sent: int
+            The size of the encoded payloads of the JSON-RPC calls
+
+        bytes_received: int
+            The size of the encoded workflow and of the encoded responses of the JSON-RPC calls
+
+        requests: list
+            The ``(url, payload)`` of each JSON-RPC call, the url includes the domain params
+
+        screens: list
+            The name of each screen shown, a screen is shown again when its input is not valid
+
+        invalid_inputs: int
+            The number of screen inputs rejected by the validators of their fields
+
+        messages: list
+            The status and condition messages shown, as dicts with a type and template
+
+        events: list
+            The dicts of the events which are not breaks
+
+        redirect_url: str
+            The url of the redirect ending the run, None when the flow completed
+
+        domain_params: dict
+            The domain params set at the end of the run
+    """
+
+    __slots__ = [
+        "context",
+        "path",
+        "round_trips",
+        "bytes_sent",
+        "bytes_received",
+        "requests",
+        "screens",
+        "invalid_inputs",
+        "messages",
+        "events",
+        "redirect_url",
+        "domain_params",
+        "_inputs",
+    ]
+
+    def __init__(self, context, inputs=()):
+        self.context = context
+        self.path = []
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = []
+        self.screens = []
+        self.invalid_inputs = 0
+        self.messages = []
+        self.events = []
+        self.redirect_url = None
+        self.domain_params = {}
+        self._inputs = iter(inputs)
+
+    @property
+    def steps(self):
+        """The number of tasks run"""
+        return len(self.path)
+
+    def add_exchange(self, sent, received):
+        self.round_trips += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def next_input(self):
+        """Get the next screen input, None when there are none left"""
+        return next(self._inputs, None)
+
+    def as_dict(self):
+        """Get the measures of the run"""
+        return {
+            "steps": self.steps,
+            "round_trips": self.round_trips,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "screens": len(self.screens),
+            "invalid_inputs": self.invalid_inputs,
+            "redirect_url": self.redirect_url,
+        }
+
+
+class Interpreter:
+    """Runs a built workflow against a context without a client
+
+    Each task type is run by the method ``run_<type>``, subclasses add methods to run custom task
+    types. Screens are answered with scripted inputs and JSON-RPC calls by local handlers, the
+    report of a run counts the steps, round trips and bytes exchanged, see ``RunReport``.
+
+    args:
+        workflow: Workflow | dict
+            The workflow to run or its workflow dict
+
+        handlers: dict (default=None)
+            Callables by url answering the JSON-RPC calls, called with the payload and
+            returning the response
+
+        validator_functions: dict (default=None)
+            Functions of validator types added to ``VALIDATOR_TYPE_MAPPING`` for this
+            interpreter, see ``compile_validator``
+
+        max_steps: int (default=10000)
+            The maximum number of tasks run, so loops which do not end raise an error
+
+        max_polls: int (default=100)
+            The maximum number of calls of a wait task
+    """
+
+    __slots__ = [
+        "workflow_dict",
+        "size",
+        "handlers",
+        "paths",
+        "validators",
+        "max_steps",
+        "max_polls",
+    ]
+
+    def __init__(
+        self, workflow, handlers=None, validator_functions=None, max_steps=10000, max_polls=100
+    ):
+        if isinstance(workflow, dict):
+            data = json.dumps(workflow).encode()
+        else:
+            data = workflow.as_json_bytes()
+        self.workflow_dict = json.loads(data)
+        self.size = len(data)
+        self.handlers = handlers or {}
+        self.paths = WorkflowPaths.for_workflow(self.workflow_dict)
+        if validator_functions:
+            self.validators = CompiledValidators(
+                self.workflow_dict, dict(VALIDATOR_TYPE_MAPPING, **validator_functions)
+            )
+        else:
+            self.validators = CompiledValidators.for_workflow(self.workflow_dict)
+        self.max_steps = max_steps
+        self.max_polls = max_polls
+
+    def run(self, context=None, inputs=()):
+        """Run the workflow, returning a ``RunReport``
+
+        args:
+            context: dict (default=None)
+                The initial context, a copy of the context of the workflow if None
+
+            inputs: Iterable[dict]
+                The input of each screen shown, in order, a dict of jsonpath to the value set in
+                the context. Screens shown once the inputs are exhausted get an empty input.
+        """
+        if context is None:
+            context = deepcopy(self.workflow_dict.get("context") or {})
+        report = RunReport(context, inputs)
+        report.add_exchange(0, self.size)
+
+        flow = self.workflow_dict["flow"]
+        try:
+            self.run_tasks(flow, context, report)
+        except _Stop:
+            pass
+        except _Jump as jump:
+            raise InterpreterError("No task {} in flow {}".format(jump.task, jump.flow))
+        except _Break:
+            pass
+        return report
+
+    def run_task(self, task, flow_name, context, report):
+        if not self.validators.all_valid(task.get("preconditions"), context):
+            return
+        if len(report.path) >= self.max_steps:
+            raise InterpreterError("More than {} steps were run".format(self.max_steps))
+        report.path.append((flow_name, task.get("name")))
+
+        runner = getattr(self, "run_" + task["type"], None)
+        if runner is None:
+            raise InterpreterError("Unknown task type {!r}".format(task["type"]))
+        runner(task, flow_name, context, report)
+
+    def run_tasks(self, flow, context, report):
+        """Run the tasks of a flow in its context, following the jumps to its tasks"""
+        tasks = flow["tasks"]
+        index = 0
+        while index < len(tasks):
+            try:
+                self.run_task(tasks[index], flow["name"], context, report)
+            except _Jump as jump:
+                if jump.flow != flow["name"]:
+                    raise
+                index = self.get_task_index(tasks, jump)
+            else:
+                index += 1
+
+    @staticmethod
+    def get_task_index(tasks, jump):
+        for index, task in enumerate(tasks):
+            if task.get("name") == jump.task:
+                return index
+        raise InterpreterError("No task {} in flow {}".format(jump.task, jump.flow))
+
+    def get_result(self, config, context):
+        """Build the result of a flow from its ``result`` and ``result_keys``"""
+        result = deepcopy(config.get("result") or {})
+        for result_key in config.get("result_keys") or ():
+            value = self.get_value(result_key, context)
+            self.paths[result_key["result_key"]].set(result, value)
+        return result
+
+    def get_value(self, update, context):
+        """Get the value of an update or payload path from its key, result or template"""
+        if "key" in update:
+            return deepcopy(self.paths[update["key"]].get(context))
+        if "template" in update:
+            return render_template(update["template"], context)
+        return deepcopy(update.get("result"))
+
+    def set_result(self, result, destination_path, context):
+        if destination_path is False:
+            context.update(result)
+        elif destination_path is not None:
+            self.paths[destination_path].set(context, result)
+
+    def run_flow(self, task, flow_name, context, report):
+        """Run a sub flow or loop in a copy of the context, only its result is kept"""
+        config = task.get("config") or {}
+        scope = deepcopy(context)
+        if "iterable_path" in config:
+            results = []
+            try:
+                for item in self.paths[config["iterable_path"]].get(context) or ():
+                    if isinstance(item, dict):
+                        scope.update(deepcopy(item))
+                    self.run_tasks(task, scope, report)
+                    results.append(self.get_result(config, scope))
+            except _Break:
+                pass
+            self.set_result(results, config.get("destination_path"), context)
+        elif "conditions" in config:
+            results = []
+            try:
+                while self.validators.all_valid(config["conditions"], scope):
+                    self.run_tasks(task, scope, report)
+                    results.append(self.get_result(config, scope))
+            except _Break:
+                pass
+            self.set_result(results, config.get("destination_path"), context)
+        else:
+            self.run_tasks(task, scope, report)
+            if config:
+                self.set_result(
+                    self.get_result(config, scope), config.get("destination_path"), context
+                )
+
+    def iter_fields(self, rows, context):
+        """Yield the flow dicts and component dicts of the components shown in rows of
+        components, including the components they contain"""
+        for row in rows:
+            for flow_dict in row:
+                if not self.validators.all_valid(flow_dict.get("preconditions"), context):
+                    continue
+                component = self.workflow_dict["components"][flow_dict["name"]]
+                yield flow_dict, component
+                yield from self.iter_fields(component.get("components") or (), context)
+
+    def run_screen(self, task, flow_name, context, report):
+        """Show the screen until an input is valid for the validators of the fields it sets, an
+        empty input is valid"""
+        if task.get("status_message"):
+            report.messages.append(task["status_message"])
+        while True:
+            report.screens.append(task["name"])
+            values = report.next_input() or {}
+            if self.is_valid_input(task, values, context):
+                break
+            report.invalid_inputs += 1
+        for path, value in values.items():
+            self.paths[path].set(context, deepcopy(value))
+
+    def is_valid_input(self, task, values, context):
+        for flow_dict, component in self.iter_fields(task["components"], context):
+            path = flow_dict.get("destination_path")
+            if path not in values:
+                continue
+            for identifier in component.get("validator") or ():
+                if not self.validators.is_valid(identifier, context, values[path]):
+                    return False
+        return True
+
+    def call(self, task, context, report):
+        """Make the JSON-RPC call of a task and store its response"""
+        handler = self.handlers.get(task["url"])
+        if handler is None:
+            raise InterpreterError("No handler for {}".format(task["url"]))
+
+        payload = deepcopy(task.get("payload") or {})
+        for payload_path in task.get("payload_paths") or ():
+            value = self.get_value(payload_path, context)
+            self.paths[payload_path["result_key"]].set(payload, value)
+        url = task["url"]
+        if report.domain_params:
+            url = "{}?{}".format(url, urlencode(report.domain_params))
+        report.requests.append((url, payload))
+
+        response = handler(payload)
+        report.add_exchange(len(json.dumps(payload).encode()), len(json.dumps(response).encode()))
+        if task.get("response_path"):
+            self.paths[task["response_path"]].set(context, response)
+
+    def run_jsonrpc(self, task, flow_name, context, report):
+        self.call(task, context, report)
+
+    def run_wait(self, task, flow_name, context, report):
+        """Call the url until the conditions are valid"""
+        for _ in range(self.max_polls):
+            self.call(task, context, report)
+            if self.validators.all_valid(task.get("conditions"), context):
+                return
+        raise InterpreterError(
+            "Wait {} did not end after {} calls".format(task["name"], self.max_polls)
+        )
+
+    def run_update(self, task, flow_name, context, report):
+        for update in task["tasks"] or ():
+            value = self.get_value(update, context)
+            if update.get("append") or update.get("extend"):
+                values = self.paths[update["result_key"]].get(context)
+                if values is None:
+                    values = []
+                    self.paths[update["result_key"]].set(context, values)
+                if update.get("append"):
+                    values.append(value)
+                else:
+                    values.extend(value)
+            else:
+                self.paths[update["result_key"]].set(context, value)
+
+    def run_redirect(self, task, flow_name, context, report):
+        report.redirect_url = task["url"]
+        raise _Stop()
+
+    def run_set_domain_param(self, task, flow_name, context, report):
+        report.domain_params[task["param"]] = self.paths[task["context_path"]].get(context)
+
+    def run_clear_domain_params(self, task, flow_name, context, report):
+        report.domain_params.clear()
+
+    def run_event(self, task, flow_name, context, report):
+        if task["action"] == "break":
+            raise _Break()
+        report.events.append(task)
+
+    def run_condition(self, task, flow_name, context, report):
+        """Continue with the target of the outcome of the conditions, a task run in place or a
+        task of the flow or of one of its ancestors"""
+        if self.validators.all_valid(task.get("conditions"), context):
+            target, message = task.get("on_success"), task.get("success_message")
+        else:
+            target, message = task.get("on_failure"), task.get("failure_message")
+        if message:
+            report.messages.append(message)
+        if not target:
+            return
+        if "type" in target:
+            self.run_task(target, flow_name, context, report)
+        else:
+            raise _Jump(target["flow"], target["task"])
@@ -0,0 +1,352 @@
+import re
+from .cache import LRUCache
+from ..exceptions import InvalidArguments
+
+__all__ = (
+    "PathAccessor",
+    "WorkflowPaths",
+    "compile_path",
+    "parse_path",
+    "get_path",
+    "set_path",
+    "make_getter",
+    "iter_paths",
+    "parse_template",
+    "compile_template",
+    "iter_templates",
+    "tokenize_template",
+    "tokenize_workflow",
+)
+
+
+# Matches the keys of a jsonpath, ``.key``, ``[0]``, ``['key']`` or ``["key"]``
+PATH_TOKEN = re.compile(r"""\.([^.\[\]*]+)|\[(\d+)\]|\['([^']*)'\]|\["([^"]*)"\]""")
+
+# Keys of the dicts of a workflow holding jsonpaths, besides those ending with ``_path``
+PATH_KEYS = frozenset(("value_key", "validator_key", "key", "result_key", "path"))
+
+# Matches the jsonpaths of a template, ``{{$.key}}`` in messages or ``{$.key}`` in updates
+TEMPLATE_PLACEHOLDER = re.compile(r"\{\{\s*(\$[^{}]*?)\s*\}\}|\{(\$[^{}]*)\}")
+
+# Compiled accessors by path, shared by all workflows
+_accessors = LRUCache(10000)
+# Parsed templates by template, shared by all workflows
+_templates = LRUCache(10000)
+
+
+def parse_path(path):
+    """Get the list of keys and indexes of a jsonpath, e.g. ``$.values[0]`` is ``["values", 0]``
+
+    Only the keys and indexes of a single value are supported, not filters, wildcards (``*``)
+    or recursive descent (``..``).
+    """
+    if not path.startswith("$"):
+        raise InvalidArguments("Invalid jsonpath {!r}".format(path))
+    keys = []
+    position = 1
+    while position < len(path):
+        match = PATH_TOKEN.match(path, position)
+        if match is None:
+            raise InvalidArguments("Unsupported jsonpath {!r}".format(path))
+        key, index, quoted, double_quoted = match.groups()
+        if index is not None:
+            keys.append(int(index))
+        else:
+            keys.append(next(value for value in (key, quoted, double_quoted) if value is not None))
+        position = match.end()
+    return keys
+
+
+def _make_getter(keys):
+    if len(keys) == 1:
+        (key,) = keys
+
+        def getter(value, default=None):
+            try:
+                return value[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+
+        return getter
+
+    if len(keys) == 2:
+        first, second = keys
+
+        def getter(value, default=None):
+            try:
+                return value[first][second]
+            except (KeyError, IndexError, TypeError):
+                return default
+
+        return getter
+
+    def getter(value, default=None):
+        try:
+            for key in keys:
+                value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return value
+
+    return getter
+
+
+def _make_setter(keys):
+    if not keys:
+
+        def setter(value, new_value):
+            raise InvalidArguments("Cannot set the root of a value")
+
+        return setter
+
+    parents = tuple(zip(keys, keys[1:]))
+    last = keys[-1]
+
+    def setter(value, new_value):
+        for key, next_key in parents:
+            if _get_item(value, key) is None:
+                _set_item(value, key, [] if isinstance(next_key, int) else {})
+            value = value[key]
+        _set_item(value, last, new_value)
+
+    return setter
+
+
+def _get_item(value, key):
+    if isinstance(key, int):
+        return value[key] if key < len(value) else None
+    return value.get(key)
+
+
+def _set_item(value, key, item):
+    if isinstance(key, int):
+        value.extend([None] * (key + 1 - len(value)))
+    value[key] = item
+
+
+class PathAccessor:
+    """A jsonpath parsed once, see ``compile_path``
+
+    attrs:
+        path: str
+            The jsonpath
+
+        keys: tuple
+            The keys and indexes of the path, see ``parse_path``
+
+        get: Callable
+            Called with a value and optionally a default, returns the value at the path or the
+            default when it does not exist
+
+        set: Callable
+            Called with a value and a new value, sets the value at the path creating the dicts
+            and lists leading to it
+    """
+
+    __slots__ = ["path", "keys", "get", "set"]
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = tuple(parse_path(path))
+        self.get = _make_getter(self.keys)
+        self.set = _make_setter(self.keys)
+
+    def __repr__(self):
+        return "PathAccessor({!r})".format(self.path)
+
+
+def compile_path(path):
+    """Get the accessor of a jsonpath, each distinct path is only parsed once"""
+    accessor = _accessors.get(path)
+    if accessor is None:
+        accessor = _accessors.set(path, PathAccessor(path))
+    return accessor
+
+
+def get_path(value, path, default=None):
+    """Get the value at a jsonpath, ``default`` when it does not exist"""
+    return compile_path(path).get(value, default)
+
+
+def set_path(value, path, new_value):
+    """Set the value at a jsonpath, creating the dicts and lists leading to it"""
+    compile_path(path).set(value, new_value)
+
+
+def make_getter(path):
+    """Get a function returning the value at a jsonpath of its argument, or its ``default``
+    argument when it does not exist. The path is only parsed once."""
+    return compile_path(path).get
+
+
+def iter_paths(value):
+    """Yield the jsonpaths of a workflow dict or part of one, the values of the keys ending with
+    ``_path`` and of ``PATH_KEYS`` which start with ``$``"""
+    values = [value]
+    while values:
+        value = values.pop()
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, item in items:
+            if isinstance(item, (dict, list)):
+                values.append(item)
+            elif (
+                isinstance(item, str)
+                and item.startswith("$")
+                and (key in PATH_KEYS or isinstance(key, str) and key.endswith("_path"))
+            ):
+                yield item
+
+
+class WorkflowPaths:
+    """The accessors of the jsonpaths of a workflow dict, see ``compile_path``, so the tools
+    reading and writing contexts share them rather than parsing the paths
+
+    Use ``for_workflow`` to share the accessors of a workflow hash.
+
+    args:
+        workflow_dict: dict
+            The workflow dict, or its sections without the hash and context
+    """
+
+    __slots__ = ["accessors"]
+
+    # Accessors of workflows by hash
+    cache = LRUCache(256)
+
+    def __init__(self, workflow_dict):
+        sections = {key: value for key, value in workflow_dict.items() if key != "context"}
+        self.accessors = {}
+        for path in iter_paths(sections):
+            if path not in self.accessors:
+                try:
+                    self.accessors[path] = compile_path(path)
+                except InvalidArguments:
+                    # Paths using filters or wildcards are only evaluated by clients
+                    pass
+
+    @classmethod
+    def for_workflow(cls, workflow_dict, workflow_hash=None):
+        """Get the accessors of a workflow dict, shared by the workflows with the same hash,
+        ``workflow_hash`` or the hash of the dict"""
+        if workflow_hash is None:
+            workflow_hash = workflow_dict.get("hash")
+        if workflow_hash is None:
+            return cls(workflow_dict)
+        paths = cls.cache.get(workflow_hash)
+        if paths is None:
+            paths = cls.cache.set(workflow_hash, cls(workflow_dict))
+        return paths
+
+    def __getitem__(self, path):
+        """Get the accessor of a path, compiled when it is not a path of the workflow"""
+        accessor = self.accessors.get(path)
+        if accessor is None:
+            accessor = compile_path(path)
+        return accessor
+
+    def __contains__(self, path):
+        return path in self.accessors
+
+    def __len__(self):
+        return len(self.accessors)
+
+
+def parse_template(template):
+    """Get the list of segments of a template, its literal strings and the accessors of its
+    placeholders, e.g. ``Hello {{$.name}}!`` is ``["Hello ", PathAccessor("$.name"), "!"]``
+
+    Placeholders of paths which are not supported by ``parse_path`` are a dict of their ``path``.
+    """
+    segments = []
+    position = 0
+    for match in TEMPLATE_PLACEHOLDER.finditer(template):
+        if match.start() > position:
+            segments.append(template[position : match.start()])
+        path = match.group(1) or match.group(2)
+        try:
+            segments.append(compile_path(path))
+        except InvalidArguments:
+            segments.append({"path": path})
+        position = match.end()
+    if position < len(template):
+        segments.append(template[position:])
+    return segments
+
+
+def compile_template(template):
+    """Get the segments of a template as a tuple, see ``parse_template``, each distinct template
+    is only parsed once"""
+    segments = _templates.get(template)
+    if segments is None:
+        segments = _templates.set(template, tuple(parse_template(template)))
+    return segments
+
+
+def iter_templates(value):
+    """Yield the templates of a workflow dict or part of one, the values of the ``template`` keys
+    which contain a placeholder"""
+    values = [value]
+    while values:
+        value = values.pop()
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, item in items:
+            if isinstance(item, (dict, list)):
+                values.append(item)
+            elif key == "template" and isinstance(item, str) and "{" in item:
+                yield item
+
+
+def _template_tokens(segments):
+    tokens = []
+    for segment in segments:
+        if isinstance(segment, PathAccessor):
+            tokens.append({"path": segment.path, "keys": list(segment.keys)})
+        elif isinstance(segment, dict):
+            tokens.append(dict(segment))
+        else:
+            tokens.append(segment)
+    return tokens
+
+
+def tokenize_template(template):
+    """Get the segments of a template as in ``template_tokens``, see ``tokenize_workflow``, None
+    when it has no placeholder"""
+    segments = compile_template(template)
+    if all(isinstance(segment, str) for segment in segments):
+        return None
+    return _template_tokens(segments)
+
+
+def tokenize_workflow(workflow_dict):
+    """Get the ``path_tokens`` and ``template_tokens`` sections of a workflow dict
+
+    ``path_tokens`` has the list of keys and indexes of each jsonpath of the workflow, see
+    ``iter_paths``, paths using filters or wildcards are left out. ``template_tokens`` has the
+    list of segments of each template of the workflow, see ``iter_templates``. The segments are
+    the literal strings and, for each placeholder, a dict of its ``path`` and ``keys``, without
+    ``keys`` when the path is not supported.
+
+    The strings of the ``messages`` section are left out, they are translated by the client, see
+    ``Workflow.get_catalogue_tokens``.
+    """
+    sections = {
+        key: value
+        for key, value in workflow_dict.items()
+        if key not in ("context", "path_tokens", "template_tokens")
+    }
+    path_tokens = {}
+    for path in iter_paths(sections):
+        if path not in path_tokens:
+            try:
+                path_tokens[path] = list(compile_path(path).keys)
+            except InvalidArguments:
+                pass
+
+    sections.pop("messages", None)
+    template_tokens = {}
+    for template in iter_templates(sections):
+        if template not in template_tokens:
+            tokens = tokenize_template(template)
+            if tokens is not None:
+                template_tokens[template] = tokens
+    return {"path_tokens": path_tokens, "template_tokens": template_tokens}
@@ -0,0 +1,244 @@
+from .components import COMPONENT_TYPE_MAPPING, Component
+from .readonly import read_only
+from .tasks import TASK_TYPE_MAPPING, DomainParam, Task
+from .validators import Validator
+from ..exceptions import InvalidArguments
+
+__all__ = ("WorkflowLoader", "LoadedTask", "LoadedComponent")
+
+
+# Types of task dicts which are not the name of their task type in ``TASK_TYPE_MAPPING``
+LOADED_TASK_TYPES = {"set_domain_param": DomainParam}
+
+# Keys of component dicts holding the identifiers of validators
+VALIDATOR_KEYS = ("validator", "disabled", "trigger_conditions")
+
+
+class WorkflowLoader:
+    """Creates the tasks, components and validators of a workflow dict, e.g. as returned by
+    ``Workflow.as_dict`` or stored as an artifact
+
+    Tasks and components are only created when accessed. The tasks of a loaded flow are
+    ``LoadedTask`` and the components of a loaded screen are ``LoadedComponent``, which are
+    compiled from their dicts. Their ``load`` method creates the task or component of the type of
+    their dict, see ``TASK_TYPE_MAPPING`` and ``COMPONENT_TYPE_MAPPING``, so it can be modified.
+
+    Translatable values are loaded as they are in the dict, workflows emitting message keys
+    cannot be loaded.
+
+    args:
+        workflow_dict: dict
+            The workflow dict to load, a read only copy is kept which is shared by the dicts of
+            the loaded tasks and components
+    """
+
+    __slots__ = ["workflow_dict", "_validators", "_json_validators"]
+
+    def __init__(self, workflow_dict):
+        if workflow_dict.get("messages"):
+            raise InvalidArguments("Workflows emitting message keys cannot be loaded")
+        self.workflow_dict = read_only(workflow_dict)
+        # Validators by identifier, so each validator is created once
+        self._validators = {}
+        self._json_validators = {}
+
+    @staticmethod
+    def get_task_class(task_type):
+        """Get the class of the tasks of a dict type, None when it is not known"""
+        task_class = LOADED_TASK_TYPES.get(task_type, TASK_TYPE_MAPPING.get(task_type))
+        return task_class if isinstance(task_class, type) else None
+
+    def load_flow(self):
+        """Create the main flow of the workflow, its tasks are loaded when accessed"""
+        return self.get_task(self.workflow_dict["flow"]).load()
+
+    def _get_validator(self, identifier, section, validators):
+        validator = validators.get(identifier)
+        if validator is None:
+            validator_dict = self.workflow_dict[section][identifier]
+            validator = validators[identifier] = Validator.from_dict(identifier, validator_dict)
+        return validator
+
+    def get_validators(self, identifiers):
+        """Get the list of validators with the ``identifiers``"""
+        if not identifiers:
+            return []
+        return [
+            self._get_validator(identifier, "validators", self._validators)
+            for identifier in identifiers
+        ]
+
+    def get_json_validators(self, identifiers):
+        """Get the list of json validators with the ``identifiers``"""
+        if not identifiers:
+            return []
+        return [
+            self._get_validator(identifier, "json_validators", self._json_validators)
+            for identifier in identifiers
+        ]
+
+    def get_task(self, task_dict):
+        return LoadedTask(task_dict, self)
+
+    def get_component(self, flow_dict):
+        """Get the component of its dict in a screen or containing component"""
+        name = flow_dict["name"]
+        return LoadedComponent(name, self.workflow_dict["components"][name], flow_dict, self)
+
+    def get_components(self, rows):
+        """Get the rows of components of rows of component dicts"""
+        return [[self.get_component(flow_dict) for flow_dict in row] for row in rows]
+
+
+class LoadedTask(Task):
+    """A task of a workflow dict, compiled from its dict until it is loaded, see ``load``
+
+    Sub flows are not loaded either, so a loaded task includes all the tasks of its dict.
+    """
+
+    __slots__ = ["task_dict", "loader", "_components"]
+
+    def __init__(self, task_dict, loader):
+        super().__init__(name=task_dict.get("name"), task_type=task_dict["type"])
+        self.task_dict = task_dict
+        self.loader = loader
+        self._components = None
+
+    def load(self):
+        """Create the task of the type of its dict, this task if the type is not known"""
+        task_class = self.loader.get_task_class(self.task_type)
+        if task_class is None:
+            return self
+        return task_class.from_dict(self.task_dict, self.loader)
+
+    def copy(self):
+        """Load the task, see ``Task.copy``"""
+        task = self.load()
+        return super().copy() if task is self else task
+
+    def as_dict(self):
+        return self.task_dict
+
+    def iter_task_dicts(self):
+        """Yield the dict of the task and the dicts of the tasks of its sub flows and of the
+        inline tasks of its conditions"""
+        task_dicts = [self.task_dict]
+        while task_dicts:
+            task_dict = task_dicts.pop()
+            yield task_dict
+            if task_dict.get("type") == "flow":
+                task_dicts.extend(reversed(task_dict["tasks"]))
+            elif task_dict.get("type") == "condition":
+                targets = (task_dict.get("on_failure"), task_dict.get("on_success"))
+                task_dicts.extend(
+                    target for target in targets if isinstance(target, dict) and "type" in target
+                )
+
+    def get_component_rows(self):
+        """Get the rows of components of the screens of the task and its sub flows"""
+        if self._components is None:
+            self._components = [
+                row
+                for task_dict in self.iter_task_dicts()
+                if task_dict.get("type") == "screen"
+                for row in self.loader.get_components(task_dict["components"])
+            ]
+        return self._components
+
+    def get_task_validators(self):
+        """Get the validators of the task and its sub flows, without those of their components"""
+        for task_dict in self.iter_task_dicts():
+            yield from self.loader.get_validators(task_dict.get("preconditions"))
+            if task_dict.get("type") == "flow":
+                conditions = (task_dict.get("config") or {}).get("conditions")
+            else:
+                conditions = task_dict.get("conditions")
+            yield from self.loader.get_validators(conditions)
+
+    def get_validators(self):
+        yield from self.get_task_validators()
+        for row in self.get_component_rows():
+            for component in row:
+                yield from component.get_validators()
+
+    def get_base_components(self):
+        for row in self.get_component_rows():
+            for component in row:
+                yield from component.get_components()
+
+    def compile(self, compiler):
+        compiler.add_validators(self.get_task_validators())
+        for row in self.get_component_rows():
+            compiler.add_components(row)
+        return compiler.get_dict(self, self.as_dict)
+
+
+class LoadedComponent(Component):
+    """A component of a workflow dict, compiled from its dicts until it is loaded, see ``load``"""
+
+    __slots__ = ["component_dict", "flow_dict", "loader", "_components"]
+
+    def __init__(self, name, component_dict, flow_dict, loader):
+        super().__init__(
+            identifier=name,
+            preconditions=loader.get_validators(flow_dict.get("preconditions")),
+            json_validators=loader.get_json_validators(component_dict.get("json_validators")),
+        )
+        self.component_dict = component_dict
+        self.flow_dict = flow_dict
+        self.loader = loader
+        self._components = None
+
+    def load(self):
+        """Create the component of the type of its dict, this component if the type is not
+        known"""
+        component_class = COMPONENT_TYPE_MAPPING.get(self.component_dict["type"])
+        if component_class is None:
+            return self
+        return component_class.from_dict(
+            self.identifier, self.component_dict, self.flow_dict, self.loader
+        )
+
+    def copy(self):
+        """Load the component, see ``Component.copy``"""
+        component = self.load()
+        return super().copy() if component is self else component
+
+    def get_flow_component_dict(self):
+        return self.flow_dict
+
+    def get_base_component_dict(self):
+        return self.component_dict
+
+    def get_component_rows(self):
+        """Get the rows of the components contained by the component"""
+        if self._components is None:
+            self._components = self.loader.get_components(self.component_dict.get("components", ()))
+        return self._components
+
+    def get_components(self):
+        yield self
+        for row in self.get_component_rows():
+            for component in row:
+                yield from component.get_components()
+
+    def get_component_validators(self):
+        """Get the validators of the component, without those of the components it contains"""
+        yield from self.preconditions
+        for key in VALIDATOR_KEYS:
+            yield from self.loader.get_validators(self.component_dict.get(key))
+        populate = self.component_dict.get("populate")
+        if populate:
+            yield from self.loader.get_validators(populate["validators"])
+
+    def get_validators(self):
+        yield from self.get_component_validators()
+        for row in self.get_component_rows():
+            for component in row:
+                yield from component.get_validators()
+
+    def compile(self, compiler):
+        compiler.add_component(self)
+        compiler.add_validators(self.get_component_validators())
+        for row in self.get_component_rows():
+            compiler.add_components(row)
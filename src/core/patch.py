@@ -0,0 +1,152 @@
+import copy
+from .hashing import OPTIONAL_SECTIONS, WorkflowHasher, get_workflow_hash
+
+__all__ = ("make_patch", "apply_patch")
+
+
+SECTIONS = ("validators", "components", "json_validators") + OPTIONAL_SECTIONS
+
+
+def _section_patch(old, new, old_hashes, new_hashes):
+    changed = {
+        name: value for name, value in new.items() if old_hashes.get(name) != new_hashes[name]
+    }
+    removed = [name for name in old if name not in new]
+    patch = {}
+    if changed:
+        patch["set"] = changed
+    if removed:
+        patch["remove"] = removed
+    return patch
+
+
+def _task_patch(old, new, old_hashes, new_hashes):
+    """Get the patch of a task with the same name and type, None if unchanged"""
+    if old_hashes.task_hashes[id(old)] == new_hashes.task_hashes[id(new)]:
+        return None
+
+    patch = {}
+    changed = {
+        key: value
+        for key, value in new.items()
+        if key != "tasks" and (key not in old or old[key] != value)
+    }
+    removed = [key for key in old if key not in new]
+    if changed:
+        patch["set"] = changed
+    if removed:
+        patch["remove"] = removed
+    if new.get("type") == "flow" and old.get("type") == "flow":
+        tasks = _tasks_patch(old["tasks"], new["tasks"], old_hashes, new_hashes)
+        if tasks is not None:
+            patch["tasks"] = tasks
+    return patch
+
+
+def _tasks_patch(old_tasks, new_tasks, old_hashes, new_hashes):
+    """Get the list of operations producing the new tasks of a flow, None if unchanged
+
+    Each operation is one of:
+        ``{"keep": index}`` the old task at index is unchanged
+        ``{"index": index, ...}`` the patch of the old task at index
+        ``{"task": task}`` a new task
+    """
+    old_indexes = {}
+    for index, task in enumerate(old_tasks):
+        old_indexes.setdefault((task.get("type"), task.get("name")), []).append(index)
+
+    operations = []
+    for task in new_tasks:
+        indexes = old_indexes.get((task.get("type"), task.get("name")))
+        if not indexes:
+            operations.append({"task": task})
+            continue
+
+        index = indexes.pop(0)
+        patch = _task_patch(old_tasks[index], task, old_hashes, new_hashes)
+        if patch is None:
+            operations.append({"keep": index})
+        else:
+            patch["index"] = index
+            operations.append(patch)
+
+    if len(old_tasks) == len(new_tasks) and all(
+        operation.get("keep") == index for index, operation in enumerate(operations)
+    ):
+        return None
+    return operations
+
+
+def make_patch(old, new):
+    """Get a patch which transforms the ``old`` workflow dict into the ``new`` workflow dict
+
+    The workflow dicts are as returned by ``Workflow.as_dict``, the context is ignored. Unchanged
+    validators, components and sub trees of the flow are found by their content hash and left out
+    of the patch, changed tasks are matched to old tasks by type and name.
+    """
+    old_hashes = WorkflowHasher()
+    new_hashes = WorkflowHasher()
+    old_hashes.hash_parts(old)
+    new_hashes.hash_parts(new)
+
+    patch = {
+        "from": old.get("hash") or get_workflow_hash(old),
+        "to": new.get("hash") or get_workflow_hash(new),
+    }
+    for section in SECTIONS:
+        section_patch = _section_patch(
+            old.get(section, {}),
+            new.get(section, {}),
+            old_hashes.section_hashes.get(section, {}),
+            new_hashes.section_hashes.get(section, {}),
+        )
+        if section_patch:
+            patch[section] = section_patch
+
+    old_flow, new_flow = old["flow"], new["flow"]
+    if (old_flow.get("type"), old_flow.get("name")) != (new_flow.get("type"), new_flow.get("name")):
+        patch["flow"] = {"task": new_flow}
+    else:
+        flow_patch = _task_patch(old_flow, new_flow, old_hashes, new_hashes)
+        if flow_patch is not None:
+            patch["flow"] = flow_patch
+    return patch
+
+
+def _apply_task_patch(task, patch):
+    if "task" in patch:
+        return patch["task"]
+
+    for key in patch.get("remove", ()):
+        task.pop(key, None)
+    task.update(patch.get("set", {}))
+    if "tasks" in patch:
+        old_tasks = task["tasks"]
+        task["tasks"] = [
+            old_tasks[operation["keep"]]
+            if "keep" in operation
+            else _apply_task_patch(old_tasks[operation["index"]], operation)
+            if "index" in operation
+            else operation["task"]
+            for operation in patch["tasks"]
+        ]
+    return task
+
+
+def apply_patch(old, patch):
+    """Apply a patch from ``make_patch`` to the ``old`` workflow dict, returning a new dict"""
+    workflow = copy.deepcopy({key: old.get(key, {}) for key in SECTIONS + ("flow",)})
+    patch = copy.deepcopy(patch)
+    for section in SECTIONS:
+        section_patch = patch.get(section, {})
+        for name in section_patch.get("remove", ()):
+            workflow[section].pop(name, None)
+        workflow[section].update(section_patch.get("set", {}))
+
+    for section in OPTIONAL_SECTIONS:
+        if not workflow[section]:
+            del workflow[section]
+    if "flow" in patch:
+        workflow["flow"] = _apply_task_patch(workflow["flow"], patch["flow"])
+    workflow["hash"] = patch["to"]
+    return workflow
@@ -0,0 +1,68 @@
+from copy import deepcopy
+
+__all__ = ("ReadOnlyDict", "ReadOnlyList", "read_only")
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(
+        "{} cannot be modified, use as_dict(copy=True) for a copy".format(type(self).__name__)
+    )
+
+
+_set_item = dict.__setitem__
+_set_list_item = list.__setitem__
+
+
+class ReadOnlyDict(dict):
+    """A dict which cannot be modified, copies of it are plain dicts"""
+
+    __slots__ = []
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class ReadOnlyList(list):
+    """A list which cannot be modified, copies of it are plain lists"""
+
+    __slots__ = []
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def read_only(value):
+    """Get a read only copy of a dict or list and the dicts and lists it contains, read only dicts
+    and lists are not copied"""
+    if type(value) is ReadOnlyDict or type(value) is ReadOnlyList:
+        return value
+    # The values are copied at once and the dicts and lists replaced by their copies
+    if isinstance(value, dict):
+        copy = ReadOnlyDict(value)
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                _set_item(copy, key, read_only(item))
+    else:
+        copy = ReadOnlyList(value)
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list)):
+                _set_list_item(copy, index, read_only(item))
+    return copy
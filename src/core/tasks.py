@@ -1,5 +1,7 @@
-from itertools import chain
+import copy
 
+from .compiler import get_part_version, get_state, mark_changed, set_state
+from .containers import Message, TaskTarget
 from .translate import Translatable
 
 __all__ = (
@@ -21,13 +23,29 @@ class Task:
         "name",
         "task_type",
         "preconditions",
-        "__weakref__",
+        "_version",
+        "_dict_cache",
     ]
 
     def __init__(self, name, task_type, preconditions=None):
         self.name = name
         self.preconditions = preconditions
         self.task_type = task_type
+        self._version = 0
+        self._dict_cache = None
+
+    @classmethod
+    def from_dict(cls, task_dict, loader):
+        """Create the task from its dict in a workflow dict, see ``WorkflowLoader``"""
+        return cls(**cls.kwargs_from_dict(task_dict, loader))
+
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        """Get the arguments creating the task from its dict"""
+        return {
+            "name": task_dict["name"],
+            "preconditions": loader.get_validators(task_dict.get("preconditions")),
+        }
 
     def as_dict(self):
         base = {
@@ -44,6 +62,42 @@ class Task:
     def get_base_components(self):
         return []
 
+    def get_version(self):
+        """Get the versions of the task and of the parts its dict depends on"""
+        return (get_part_version(self),) + tuple(
+            get_part_version(validator) for validator in self.preconditions or ()
+        )
+
+    def changed(self):
+        """Mark the task as modified after modifying its lists or dicts in place"""
+        mark_changed(self)
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
+    def copy(self):
+        """Get a shallow copy of the task to modify, e.g. in a variant of a workflow
+
+        The copy shares the lists of the task, so assign new lists rather than modifying them.
+        """
+        task = copy.copy(self)
+        mark_changed(task)
+        return task
+
+    def compile(self, compiler):
+        """Add the validators and components of the task to a ``WorkflowCompiler``
+
+        Returns the dict of the task.
+        """
+        compiler.add_validators(self.get_validators())
+        for components in self.get_base_components():
+            for component in components:
+                compiler.add_component(component)
+        return compiler.get_dict(self, self.as_dict)
+
     def get_result(self):
         return {}
 
@@ -62,6 +116,7 @@ class Screen(Task):
     __slots__ = [
         "components",
         "show_status_message",
+        "_status_message_template",
     ]
 
     status_message_template = Translatable()
@@ -79,6 +134,16 @@ class Screen(Task):
         self.status_message_template = status_message_template
         self.show_status_message = show_status_message
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        status_message = task_dict.get("status_message")
+        kwargs.update(
+            components=loader.get_components(task_dict["components"]),
+            status_message_template=status_message and status_message["template"],
+        )
+        return kwargs
+
     def get_flow_components(self):
         return [[c.get_flow_component_dict() for c in row] for row in self.components]
 
@@ -93,6 +158,20 @@ class Screen(Task):
             for component in row:
                 yield from component.get_validators()
 
+    def get_version(self):
+        return super().get_version() + tuple(
+            version
+            for row in self.components
+            for component in row
+            for version in component.get_version()
+        )
+
+    def compile(self, compiler):
+        compiler.add_validators(super().get_validators())
+        for row in self.components:
+            compiler.add_components(row)
+        return compiler.get_dict(self, self.as_dict)
+
     def get_status_message(self):
         if self.status_message_template:
             return {
@@ -139,6 +218,13 @@ class JsonRpc(Task):
         self.payload = payload or {}
         self.response_path = response_path
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        for key in ("url", "method", "payload_paths", "payload", "response_path"):
+            kwargs[key] = task_dict.get(key)
+        return kwargs
+
     def get_payload(self):
         return self.payload
 
@@ -191,9 +277,23 @@ class Wait(JsonRpc):
         self.timeout = timeout
         self.conditions = conditions
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs.update(
+            timeout=task_dict.get("timeout"),
+            conditions=loader.get_validators(task_dict.get("conditions")),
+        )
+        return kwargs
+
     def get_conditions(self):
         return [c.identifier for c in self.conditions]
 
+    def get_version(self):
+        return super().get_version() + tuple(
+            get_part_version(validator) for validator in self.conditions or ()
+        )
+
     def as_dict(self):
         endpoint = super().as_dict()
         endpoint.update({
@@ -217,6 +317,12 @@ class Update(Task):
         super().__init__(name=name, preconditions=preconditions, task_type="update")
         self.tasks = tasks
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs["tasks"] = task_dict.get("tasks")
+        return kwargs
+
     def get_tasks(self):
         return self.tasks
 
@@ -235,6 +341,12 @@ class Redirect(Task):
         super().__init__(name=name, preconditions=preconditions, task_type="redirect")
         self.url = url
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs["url"] = task_dict["url"]
+        return kwargs
+
     def as_dict(self):
         update = super().as_dict()
         update["url"] = self.url
@@ -253,6 +365,12 @@ class DomainParam(Task):
         self.context_path = context_path
         self.param = param
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs.update(context_path=task_dict["context_path"], param=task_dict["param"])
+        return kwargs
+
     def as_dict(self):
         domain = super().as_dict()
         domain.update(
@@ -297,6 +415,24 @@ class Condition(Task):
         self.on_failure = on_failure
         self.failure_message = failure_message
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs["conditions"] = loader.get_validators(task_dict.get("conditions"))
+        for key in ("on_success", "on_failure"):
+            target = task_dict.get(key)
+            if isinstance(target, dict):
+                # Inline tasks have a type, task targets a flow and a task name
+                if "type" in target:
+                    target = loader.get_task(target)
+                else:
+                    target = TaskTarget(target["flow"], target["task"])
+            kwargs[key] = target
+        for key in ("success_message", "failure_message"):
+            message = task_dict.get(key)
+            kwargs[key] = message and Message(message["template"], message["type"])
+        return kwargs
+
     @staticmethod
     def get_message(message):
         if message is None:
@@ -312,23 +448,51 @@ class Condition(Task):
     def get_conditions(self):
         return [c.identifier for c in self.conditions]
 
+    def get_version(self):
+        return super().get_version() + tuple(
+            get_part_version(validator) for validator in self.conditions or ()
+        )
+
     def get_validators(self):
         yield from super().get_validators()
         yield from self.conditions
 
-    def as_dict(self):
+    def compile(self, compiler):
+        """Compile the inline tasks of the targets too, their dicts are the children of the dict
+        of the condition"""
+        compiler.add_validators(self.get_validators())
+        targets = (self.on_success, self.on_failure)
+        target_dicts = [
+            compiler.compile_task(target)
+            if isinstance(target, Task)
+            else self.get_task_target(target)
+            for target in targets
+        ]
+        children = [
+            target_dict
+            for target, target_dict in zip(targets, target_dicts)
+            if isinstance(target, Task)
+        ]
+        return compiler.get_dict(self, lambda: self._get_compiled_dict(*target_dicts), children)
+
+    def _get_compiled_dict(self, on_success, on_failure):
         condition = super().as_dict()
         condition.update(
             {
                 "conditions": self.get_conditions(),
-                "on_success": self.get_task_target(self.on_success),
-                "on_failure": self.get_task_target(self.on_failure),
+                "on_success": on_success,
+                "on_failure": on_failure,
                 "success_message": self.get_message(self.success_message),
                 "failure_message": self.get_message(self.failure_message),
             }
         )
         return condition
 
+    def as_dict(self):
+        return self._get_compiled_dict(
+            self.get_task_target(self.on_success), self.get_task_target(self.on_failure)
+        )
+
 
 class Flow(Task):
     __slots__ = [
@@ -363,6 +527,25 @@ class Flow(Task):
         self.sub_type = sub_type
         self.iterable_path = iterable_path
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        """The tasks of the flow are loaded when accessed, see ``WorkflowLoader.get_task``"""
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        config = task_dict.get("config") or {}
+        if "iterable_path" in config:
+            kwargs.update(sub_type="for_loop", iterable_path=config["iterable_path"])
+        elif "conditions" in config:
+            kwargs.update(
+                sub_type="while_loop", conditions=loader.get_validators(config["conditions"])
+            )
+        kwargs.update(
+            tasks=[loader.get_task(task) for task in task_dict["tasks"]],
+            result=config.get("result"),
+            result_keys=config.get("result_keys"),
+            destination_path=config.get("destination_path"),
+        )
+        return kwargs
+
     def get_validators(self):
         yield from super().get_validators()
         yield from self.conditions
@@ -424,13 +607,50 @@ class Flow(Task):
         flow.update({"tasks": self.get_tasks(), "config": self.get_config()})
         return flow
 
+    def get_version(self):
+        return super().get_version() + tuple(
+            get_part_version(validator) for validator in self.conditions or ()
+        )
+
+    def compile(self, compiler):
+        compiler.add_validators(super().get_validators())
+        compiler.add_validators(self.conditions)
+        tasks = [compiler.compile_task(task) for task in self.tasks]
+        return compiler.get_dict(self, lambda: self._get_compiled_dict(tasks), tasks)
+
+    def _get_compiled_dict(self, tasks):
+        flow = super().as_dict()
+        flow.update({"tasks": tasks, "config": self.get_config()})
+        return flow
+
     def add_task(self, task_type, name, **kwargs):
         task = TASK_TYPE_MAPPING[task_type](name=name, **kwargs)
         self.tasks.append(task)
+        self.changed()
         return task
 
     def clear_tasks(self):
         self.tasks = []
+        self.changed()
+
+    def get_task_index(self, name):
+        """Get the index of the task named ``name``, raises a ``KeyError`` when there is none"""
+        for index, task in enumerate(self.tasks):
+            if task.name == name:
+                return index
+        raise KeyError(name)
+
+    def replace_task(self, name, task):
+        """Replace the task named ``name`` with ``task``"""
+        self.tasks[self.get_task_index(name)] = task
+        self.changed()
+
+    def copy_task(self, name):
+        """Replace the task named ``name`` with a copy and return it, see ``Task.copy``"""
+        index = self.get_task_index(name)
+        task = self.tasks[index] = self.tasks[index].copy()
+        self.changed()
+        return task
 
 
 class Event(Task):
@@ -444,6 +664,12 @@ class Event(Task):
         self.action = action
         self.payload = payload or {}
 
+    @classmethod
+    def kwargs_from_dict(cls, task_dict, loader):
+        kwargs = super().kwargs_from_dict(task_dict, loader)
+        kwargs.update(action=task_dict["action"], payload=task_dict.get("payload"))
+        return kwargs
+
     def as_dict(self):
         event = super().as_dict()
         event.update(
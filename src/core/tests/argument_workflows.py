@@ -0,0 +1,9 @@
+"""Workflows which cannot be built without arguments, compiled by ``test_artifacts``"""
+from workflows_engine import Workflow
+
+
+class ArgumentWorkflow(Workflow):
+    cache_templates = True
+
+    def flow(self, url):
+        self.add_task(task_type="redirect", name="redirect", url=url)
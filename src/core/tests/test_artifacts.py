@@ -0,0 +1,163 @@
+import json
+import multiprocessing
+import pytest
+from workflows_engine import Workflow
+from workflows_engine.cli import compile_workflows, find_workflows, main
+from workflows_engine.core.artifacts import ArtifactStore, SharedWorkflowStore
+from . import argument_workflows
+
+
+class ArtifactWorkflow(Workflow):
+    cache_templates = True
+
+    def flow(self):
+        self.add_task(task_type="redirect", name="redirect", url="/")
+
+
+MODULE = ArtifactWorkflow.__module__
+ARGUMENT_MODULE = argument_workflows.__name__
+
+
+@pytest.fixture
+def store(tmp_path):
+    compile_workflows([MODULE], str(tmp_path), jobs=1)
+    yield ArtifactStore(str(tmp_path))
+    ArtifactWorkflow.clear_template_cache()
+
+
+def test_find_workflows():
+    assert find_workflows(MODULE) == [MODULE + ".ArtifactWorkflow"]
+
+
+def test_compile_writes_manifest_and_artifact(store):
+    workflow = ArtifactWorkflow()
+    manifest = store.get_manifest()
+
+    assert manifest == {MODULE + ".ArtifactWorkflow": workflow.get_hash()}
+    with open(store.get_path(workflow.get_hash()), "rb") as fp:
+        assert json.load(fp) == workflow.as_dict()
+
+
+def test_load_artifact(store):
+    ArtifactWorkflow.clear_template_cache()
+    assert ArtifactWorkflow.load_artifact(store)
+
+    workflow = ArtifactWorkflow(context={"value": 1})
+    assert workflow.base_flow_task is None, "Flow built instead of using the artifact"
+    workflow_dict = json.loads(workflow.as_json_bytes())
+    assert workflow_dict["hash"] == store.get_manifest()[MODULE + ".ArtifactWorkflow"]
+    assert workflow_dict["context"] == {"value": 1}
+    assert workflow.as_dict() == workflow_dict
+
+
+def test_add_task_to_loaded_workflow(store):
+    ArtifactWorkflow.clear_template_cache()
+    ArtifactWorkflow.load_artifact(store)
+    workflow = ArtifactWorkflow()
+    workflow.add_task(task_type="redirect", name="second", url="/")
+
+    assert [task.name for task in workflow.base_flow_task.tasks] == ["redirect", "second"]
+
+
+def test_main(tmp_path, capsys):
+    assert main(["compile", "--output", str(tmp_path), "--jobs", "1", MODULE]) == 0
+    assert MODULE + ".ArtifactWorkflow" in capsys.readouterr().out
+
+
+def test_compile_skips_workflows_which_cannot_be_built(tmp_path):
+    errors = {}
+    manifest = compile_workflows([ARGUMENT_MODULE, MODULE], str(tmp_path), jobs=1, errors=errors)
+
+    assert list(manifest) == [MODULE + ".ArtifactWorkflow"]
+    assert list(errors) == [ARGUMENT_MODULE + ".ArgumentWorkflow"]
+    assert errors[ARGUMENT_MODULE + ".ArgumentWorkflow"].startswith("TypeError")
+    assert ArtifactStore(str(tmp_path)).get_manifest() == manifest
+
+
+def test_main_reports_skipped_workflows(tmp_path, capsys):
+    assert main(["compile", "--output", str(tmp_path), "--jobs", "1", ARGUMENT_MODULE]) == 1
+    assert "Skipped " + ARGUMENT_MODULE + ".ArgumentWorkflow" in capsys.readouterr().err
+
+
+def add_artifact_workflow_as(store, workflow_class):
+    """Add the artifact of ``ArtifactWorkflow`` to the manifest as that of ``workflow_class``"""
+    workflow_hash = store.get_manifest()[MODULE + ".ArtifactWorkflow"]
+    store.write_manifest({store.get_key(workflow_class): workflow_hash})
+
+
+def test_load_artifact_requires_cache_templates(store):
+    class UncachedWorkflow(ArtifactWorkflow):
+        cache_templates = False
+
+    add_artifact_workflow_as(store, UncachedWorkflow)
+    assert store.get(store.get_key(UncachedWorkflow)) is not None
+    assert not UncachedWorkflow.load_artifact(store)
+
+
+def test_load_artifact_larger_than_template_cache(store):
+    class SmallCacheWorkflow(ArtifactWorkflow):
+        template_cache_max_size = 1
+
+    add_artifact_workflow_as(store, SmallCacheWorkflow)
+    assert not SmallCacheWorkflow.load_artifact(store)
+    assert SmallCacheWorkflow().base_flow_task is not None
+
+
+@pytest.fixture
+def shared_store():
+    store = SharedWorkflowStore.create([ArtifactWorkflow])
+    yield store
+    ArtifactWorkflow.clear_template_cache()
+    store.close()
+    store.unlink()
+
+
+def test_shared_store_load_artifact(shared_store):
+    expected = ArtifactWorkflow(context={"value": 1}).as_dict()
+    assert shared_store.get_manifest() == {MODULE + ".ArtifactWorkflow": expected["hash"]}
+    assert shared_store.get("missing") is None
+
+    ArtifactWorkflow.clear_template_cache()
+    assert ArtifactWorkflow.load_artifact(shared_store)
+    workflow = ArtifactWorkflow(context={"value": 1})
+    assert workflow.base_flow_task is None, "Flow built instead of using the store"
+    assert json.loads(workflow.as_json_bytes()) == expected
+    assert workflow.as_dict() == expected
+
+
+def test_shared_store_workflows_by_offset():
+    class OtherWorkflow(ArtifactWorkflow):
+        def flow(self):
+            self.add_task(task_type="redirect", name="other", url="/other")
+
+    store = SharedWorkflowStore.create([ArtifactWorkflow, OtherWorkflow, ArtifactWorkflow])
+    try:
+        index = store.get_index()
+        assert len(index) == 2
+        for workflow_class in (ArtifactWorkflow, OtherWorkflow):
+            workflow = workflow_class()
+            compiled = store.get(store.get_key(workflow_class))
+            assert compiled.hash == workflow.get_hash()
+            assert bytes(compiled.encoded) == bytes(workflow.get_compiled().encoded)
+            del compiled
+    finally:
+        store.close()
+        store.unlink()
+
+
+def _serve_attached(name, queue):
+    store = SharedWorkflowStore.attach(name)
+    ArtifactWorkflow.load_artifact(store)
+    queue.put(ArtifactWorkflow(context={"worker": True}).as_json_bytes())
+
+
+def test_shared_store_attach(shared_store):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_serve_attached, args=(shared_store.name, queue))
+    process.start()
+    workflow_dict = json.loads(queue.get(timeout=30))
+    process.join()
+
+    assert process.exitcode == 0
+    assert workflow_dict == ArtifactWorkflow(context={"worker": True}).as_dict()
@@ -0,0 +1,30 @@
+from workflows_engine.core.cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_evicts_by_size():
+    cache = LRUCache(max_entries=10, max_size=10)
+    cache.set("a", 1, size=6)
+    cache.set("b", 2, size=6)
+
+    assert "a" not in cache
+    assert cache.size == 6
+
+
+def test_too_large_not_cached():
+    cache = LRUCache(max_entries=10, max_size=10)
+    cache.set("a", 1, size=11)
+
+    assert "a" not in cache
+    assert cache.size == 0
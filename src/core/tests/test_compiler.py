@@ -0,0 +1,328 @@
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.compiler import Parts, WorkflowCompiler, SameIdentiferDifferentValues
+from workflows_engine.core.tasks import Flow, Task, TASK_TYPE_MAPPING
+from workflows_engine.core.translate import Translatable
+
+
+class Custom(Task):
+    __slots__ = ["component"]
+
+    def __init__(self, name, component, preconditions=None):
+        super().__init__(name=name, preconditions=preconditions, task_type="custom")
+        self.component = component
+
+    def get_base_components(self):
+        yield from self.component.get_components()
+
+
+@pytest.fixture
+def workflow():
+    TASK_TYPE_MAPPING["custom"] = Custom
+    is_int = validators.is_int(value_key="$.value")
+    is_true = validators.is_true(value_key="$.done")
+    submit = components.Button(text="Submit", action="submit", style="primary")
+
+    class CompiledWorkflowTest(Workflow):
+        def flow(self):
+            for index in range(3):
+                self.add_task(
+                    task_type="screen",
+                    name="screen_{}".format(index),
+                    preconditions=is_true,
+                    components=[
+                        [
+                            components.Input(
+                                label="Value",
+                                target="value",
+                                validators=[is_int],
+                                json_validators=[validators.greater_than_zero()],
+                            ),
+                            components.Modal(
+                                title="Modal",
+                                components=[[components.Textbox(content="Modal text")]],
+                                trigger_conditions=[is_true],
+                            ),
+                        ],
+                        [
+                            components.Table(
+                                table_components=[components.Textbox(identifier="cell")],
+                                table_data_path="$.data",
+                                table_headers_path="$.headers",
+                            ),
+                            submit,
+                        ],
+                    ],
+                )
+            loop = self.add_task(
+                task_type="while_loop", name="loop", conditions=[is_true], preconditions=is_int
+            )
+            loop.add_task(task_type="condition", name="condition", conditions=[is_int])
+            loop.add_task(task_type="redirect", name="redirect", url="/")
+            self.add_task(
+                task_type="custom",
+                name="custom",
+                preconditions=is_int,
+                component=components.Spacer(identifier="custom_spacer"),
+            )
+
+    yield CompiledWorkflowTest()
+    del TASK_TYPE_MAPPING["custom"]
+
+
+def test_compile_matches_separate_walks(workflow):
+    compiled = WorkflowCompiler().compile(workflow.base_flow_task)
+
+    assert compiled == {
+        "validators": workflow.get_validators(),
+        "components": workflow.get_base_components(),
+        "flow": workflow.base_flow_task.as_dict(),
+        "json_validators": workflow.get_json_validators(),
+    }
+
+
+def test_compile_includes_custom_task_parts(workflow):
+    compiled = WorkflowCompiler().compile(workflow.base_flow_task)
+
+    assert "custom_spacer" in compiled["components"]
+    assert compiled["flow"]["tasks"][-1]["type"] == "custom"
+
+
+def test_compile_same_identifier_different_values():
+    flow = Workflow().base_flow_task
+    flow.add_task(
+        task_type="screen",
+        name="screen",
+        components=[
+            components.Textbox(identifier="text", content="a"),
+            components.Textbox(identifier="text", content="b"),
+        ],
+    )
+    with pytest.raises(SameIdentiferDifferentValues):
+        WorkflowCompiler().compile(flow)
+
+
+def test_same_identifier_error_contains_both_values():
+    flow = Workflow().base_flow_task
+    flow.add_task(
+        task_type="screen",
+        name="screen",
+        components=[
+            components.Textbox(identifier="text", content="a"),
+            components.Textbox(identifier="text", content="b"),
+        ],
+    )
+    with pytest.raises(SameIdentiferDifferentValues) as error:
+        WorkflowCompiler().compile(flow)
+
+    assert error.value.first["content"] == "a"
+    assert error.value.second["content"] == "b"
+    assert "'content': 'b'" in str(error.value)
+
+
+def test_repeated_part_added_once():
+    calls = []
+
+    class CountingTextbox(components.Textbox):
+        __slots__ = []
+
+        def get_base_component_dict(self):
+            calls.append(self)
+            return super().get_base_component_dict()
+
+    textbox = CountingTextbox(identifier="text", content="a")
+    parts = Parts("components", lambda x: x.get_base_component_dict())
+    for _ in range(3):
+        parts.add(textbox)
+
+    assert len(calls) == 1
+
+
+def test_fingerprint_cached_on_part():
+    options = [{"label": "A", "value": "a"}, {"label": "B", "value": "b"}]
+    parts = Parts("components", lambda x: x.get_base_component_dict())
+    first = components.Selection(identifier="select", label="Select", options_values=options)
+    second = components.Selection(
+        identifier="select", label="Select", options_values=options[::-1]
+    )
+    parts.add(first)
+    parts.add(second)
+
+    assert second._fingerprint is not None
+    assert parts.get_fingerprint(second) is second._fingerprint[1]
+
+
+def test_rebuild_reuses_unchanged_dicts(workflow):
+    first = workflow.as_dict()
+    workflow.add_task(task_type="redirect", name="added", url="/added")
+    second = workflow.as_dict()
+
+    assert second["flow"]["tasks"][0] is first["flow"]["tasks"][0]
+    assert second["flow"]["tasks"][-1]["name"] == "added"
+    assert second["hash"] != first["hash"]
+
+
+def test_rebuild_after_add_task_matches_fresh_build(workflow):
+    workflow.as_dict()
+    workflow.add_task(task_type="redirect", name="added", url="/added")
+    fresh = type(workflow)()
+    fresh.add_task(task_type="redirect", name="added", url="/added")
+
+    assert workflow.as_dict() == fresh.as_dict()
+    assert workflow.get_hash() == fresh.get_hash()
+
+
+def test_rebuild_after_changed_component(workflow):
+    first = workflow.as_dict()
+    submit = workflow.base_flow_task.tasks[0].components[1][1]
+    submit.text = "Send"
+    submit.changed()
+    workflow.changed()
+    second = workflow.as_dict()
+
+    assert second["components"][submit.identifier]["text"] == "Send"
+    assert second["flow"]["tasks"][0] is not first["flow"]["tasks"][0]
+    assert second["flow"]["tasks"][3] is first["flow"]["tasks"][3]
+    assert second["hash"] != first["hash"]
+
+    fresh = WorkflowCompiler().compile(workflow.base_flow_task)
+    assert second["flow"] == fresh["flow"]
+    assert second["components"] == fresh["components"]
+
+
+def test_rebuild_after_setting_attributes(workflow):
+    first = workflow.as_dict()
+    workflow.base_flow_task.tasks[0].name = "renamed"
+    workflow.changed()
+
+    assert workflow.as_dict()["flow"]["tasks"][0]["name"] == "renamed"
+    assert workflow.as_dict()["flow"]["tasks"][1] is first["flow"]["tasks"][1]
+
+
+def test_rebuild_without_changed_keeps_modified_lists(workflow):
+    first = workflow.as_dict()
+    screen = workflow.base_flow_task.tasks[0]
+    screen.components[0][0] = components.Textbox(identifier="replaced", content="a")
+    workflow.changed()
+
+    assert workflow.as_dict()["flow"]["tasks"][0] is first["flow"]["tasks"][0]
+
+    screen.changed()
+    workflow.changed()
+    assert workflow.as_dict()["flow"]["tasks"][0]["components"][0][0] == {"name": "replaced"}
+
+
+def test_clear_cache_rebuilds_part_dicts(workflow):
+    workflow.as_dict()
+    screen = workflow.base_flow_task.tasks[0]
+    screen.components[0][0] = components.Textbox(identifier="replaced", content="a")
+    is_int = workflow.base_flow_task.tasks[3].preconditions
+    is_int.identifier = "renamed"
+    workflow.clear_cache()
+    workflow_dict = workflow.as_dict()
+
+    assert workflow_dict["flow"]["tasks"][0]["components"][0][0] == {"name": "replaced"}
+    assert workflow_dict["flow"]["tasks"][3]["preconditions"] == ["renamed"]
+    assert workflow_dict["flow"] == workflow.base_flow_task.as_dict()
+    assert workflow_dict["components"] == workflow.get_base_components()
+    assert workflow_dict["validators"] == workflow.get_validators()
+
+
+def test_rebuild_after_changing_inline_target():
+    target = Flow(name="target")
+    target.add_task(task_type="redirect", name="redirect", url="/")
+
+    class InlineTargetWorkflow(Workflow):
+        def flow(self):
+            self.add_task(
+                task_type="condition",
+                name="condition",
+                conditions=[validators.is_true(value_key="$.done")],
+                on_success=target,
+            )
+
+    workflow = InlineTargetWorkflow()
+    workflow.as_dict()
+    target.tasks[0].name = "renamed"
+    workflow.changed()
+    on_success = workflow.as_dict()["flow"]["tasks"][0]["on_success"]
+
+    assert on_success["tasks"][0]["name"] == "renamed"
+    assert on_success == target.as_dict()
+
+
+def test_rebuild_after_renaming_validators():
+    is_int = validators.is_int(value_key="$.value", identifier="v1")
+    is_true = validators.is_true(value_key="$.done", identifier="t1")
+    field = components.Input(label="Value", target="value", validators=[is_int])
+    text = components.Textbox(content="Text", preconditions=[is_true])
+
+    class ValidatedWorkflow(Workflow):
+        def flow(self):
+            self.add_task(task_type="screen", name="screen", components=[[field, text]])
+
+    workflow = ValidatedWorkflow()
+    workflow.as_dict()
+    is_int.identifier = "v2"
+    is_true.identifier = "t2"
+    workflow.changed()
+    workflow_dict = workflow.as_dict()
+
+    assert workflow_dict["components"][field.identifier]["validator"] == ["v2"]
+    assert workflow_dict["flow"]["tasks"][0]["components"][0][1]["preconditions"] == ["t2"]
+    assert set(workflow_dict["validators"]) == {"v2", "t2"}
+
+
+def test_shared_parts_set_between_builds():
+    button = components.Button(text="Go", action="submit", style="primary")
+    is_int = validators.is_int(value_key="$.x")
+
+    class SharedPartsWorkflow(Workflow):
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[[button, components.Input(label="X", validators=[is_int])]],
+            )
+
+    SharedPartsWorkflow().as_dict()
+    button.text = "Stop"
+    is_int.value_key = "$.y"
+    workflow_dict = SharedPartsWorkflow().as_dict()
+
+    assert workflow_dict["components"][button.identifier]["text"] == "Stop"
+    assert workflow_dict["validators"][is_int.identifier]["value_key"] == "$.y"
+
+
+def test_translator_without_locale(monkeypatch):
+    language = ["en"]
+    monkeypatch.setattr(
+        Translatable, "_translator", staticmethod(lambda string: string + "-" + language[0])
+    )
+    button = components.Button(text="Go", action="submit", style="primary")
+
+    class TranslatedWorkflow(Workflow):
+        def flow(self):
+            self.add_task(task_type="screen", name="screen", components=[[button]])
+
+    texts = []
+    for language[0] in ("en", "fr"):
+        texts.append(TranslatedWorkflow().as_dict()["components"][button.identifier]["text"])
+
+    assert texts == ["Go-en", "Go-fr"]
+
+
+def test_default_identifiers_are_translated(monkeypatch):
+    monkeypatch.setattr(Translatable, "_translator", staticmethod(lambda string: "fr " + string))
+    display = components.DisplayData(display_type="list", title="Hello World", data="$.items")
+
+    class DisplayWorkflow(Workflow):
+        def flow(self):
+            self.add_task(task_type="screen", name="screen", components=[[display]])
+
+    workflow_dict = DisplayWorkflow().as_dict()
+
+    assert list(workflow_dict["components"]) == ["list_fr_hello_world"]
+    assert workflow_dict["components"]["list_fr_hello_world"]["title"] == "fr Hello World"
+    assert workflow_dict["flow"]["tasks"][0]["components"] == [[{"name": "list_fr_hello_world"}]]
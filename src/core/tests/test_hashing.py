@@ -0,0 +1,104 @@
+from workflows_engine import Workflow
+from workflows_engine.core import components
+from workflows_engine.core.hashing import WorkflowHasher, get_workflow_hash
+from .schema_validator import get_validator_for
+
+
+def make_workflow(second_label, emit=False):
+    class HashedWorkflow(Workflow):
+        emit_content_hashes = emit
+
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="first",
+                components=[components.Input(label="First", target="first")],
+            )
+            self.add_task(
+                task_type="screen",
+                name="second",
+                components=[components.Input(label=second_label, target="second")],
+            )
+
+    return HashedWorkflow()
+
+
+def task_hashes(workflow):
+    workflow_dict = workflow.as_dict()
+    hasher = WorkflowHasher()
+    hasher.hash_validators(workflow_dict["validators"])
+    hasher.hash_components(workflow_dict["components"])
+    return [hasher.hash_task(task) for task in workflow_dict["flow"]["tasks"]]
+
+
+def test_hash_is_stable():
+    assert make_workflow("Second").get_hash() == make_workflow("Second").get_hash()
+
+
+def test_unchanged_subtree_keeps_hash():
+    first_hashes = task_hashes(make_workflow("Second"))
+    second_hashes = task_hashes(make_workflow("Changed"))
+
+    assert first_hashes[0] == second_hashes[0]
+    assert first_hashes[1] != second_hashes[1]
+    assert make_workflow("Second").get_hash() != make_workflow("Changed").get_hash()
+
+
+def test_component_hash_includes_children():
+    components_dict = {
+        "container": {"type": "container", "components": [[{"name": "child"}]]},
+        "child": {"type": "textbox", "content": "a"},
+    }
+    first = WorkflowHasher().hash_components(components_dict)
+    components_dict["child"]["content"] = "b"
+    second = WorkflowHasher().hash_components(components_dict)
+
+    assert first["container"] != second["container"]
+
+
+def test_emitted_hashes():
+    workflow = make_workflow("Second", emit=True)
+    workflow_dict = workflow.as_dict()
+
+    assert all("hash" in task for task in workflow_dict["flow"]["tasks"])
+    assert all("hash" in component for component in workflow_dict["components"].values())
+    assert workflow.get_hash() == make_workflow("Second").get_hash()
+    get_validator_for("tasks/flow").validate(workflow_dict["flow"])
+
+
+def test_emitted_hashes_not_added_to_shared_dicts():
+    shared = components.Input(label="Shared", target="shared")
+
+    class SharedWorkflow(Workflow):
+        def flow(self):
+            self.add_task(task_type="screen", name="screen", components=[shared])
+
+    class EmittingWorkflow(SharedWorkflow):
+        emit_content_hashes = True
+
+    emitted = EmittingWorkflow().as_dict()
+    plain = SharedWorkflow().as_dict()
+
+    assert "hash" in emitted["components"][shared.identifier]
+    assert "hash" in emitted["flow"]["tasks"][0]
+    assert "hash" not in plain["components"][shared.identifier]
+    assert "hash" not in plain["flow"]["tasks"][0]
+
+
+def test_loaded_workflow_emitting_hashes_does_not_modify_dict():
+    workflow = make_workflow("Second")
+    workflow_dict = workflow.as_dict()
+    loaded = make_workflow("Second", emit=True).from_dict(workflow_dict)
+
+    assert all("hash" in task for task in loaded.as_dict()["flow"]["tasks"])
+    assert not any("hash" in task for task in workflow.as_dict()["flow"]["tasks"])
+    assert loaded.get_hash() == workflow.get_hash()
+
+
+def test_hash_of_encoded_workflow():
+    workflow = make_workflow("Second")
+    emitting = make_workflow("Second", emit=True)
+
+    assert get_workflow_hash(workflow.as_dict()) == workflow.get_hash()
+    assert get_workflow_hash(emitting.as_dict()) == workflow.get_hash()
+    assert workflow.get_compiled().memo is None
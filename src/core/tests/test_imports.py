@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+import pytest
+import workflows_engine
+
+
+def get_imported_modules(statement):
+    code = "import sys\n{}\nprint('\\n'.join(sys.modules))".format(statement)
+    return set(subprocess.check_output([sys.executable, "-c", code]).decode().split())
+
+
+def test_import_workflow_does_not_import_components():
+    modules = get_imported_modules("from workflows_engine import Workflow")
+    assert "workflows_engine.core.workflows" in modules
+    assert "workflows_engine.core.components" not in modules
+    assert "workflows_engine.components" not in modules
+    assert "workflows_engine.validators" not in modules
+    for name in ("hashing", "patch", "jsonpath", "validators"):
+        assert "workflows_engine.core." + name not in modules
+
+
+def test_lazy_attributes():
+    from workflows_engine.core.workflows import Workflow
+
+    assert workflows_engine.Workflow is Workflow
+    assert workflows_engine.core.components.Component
+    assert set(workflows_engine.__all__) <= set(dir(workflows_engine))
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        workflows_engine.missing
@@ -0,0 +1,159 @@
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.containers import TaskTarget
+from workflows_engine.core.interpreter import Interpreter, InterpreterError, render_template
+from workflows_engine.core.tasks import Redirect
+from workflows_engine.core.validators import Validator
+
+
+class InterpretedWorkflow(Workflow):
+    def flow(self):
+        is_int = validators.is_int()
+        is_saved = validators.is_true(value_key="$.saved", identifier="is_saved")
+        self.add_task(
+            task_type="screen",
+            name="ask",
+            components=[
+                [
+                    components.Input(
+                        label="Amount",
+                        target="amount",
+                        destination_path="$.amount",
+                        validators=[is_int],
+                    )
+                ],
+                [components.Button(text="Next", action="submit", style="primary")],
+            ],
+        )
+        self.add_task(
+            task_type="domain_param", name="domain", context_path="$.site", param="site"
+        )
+        self.add_task(
+            task_type="jsonrpc",
+            name="save",
+            url="/api/save",
+            method="POST",
+            payload={"source": "test"},
+            payload_paths=[{"key": "$.amount", "result_key": "$.amount"}],
+            response_path="$.response",
+        )
+        self.add_task(
+            task_type="update",
+            name="update",
+            tasks=[
+                {"key": "$.response.saved", "result_key": "$.saved"},
+                {"template": "{$.amount} saved", "result_key": "$.summary"},
+                {"result": "save", "result_key": "$.log", "append": True},
+            ],
+        )
+        self.add_task(
+            task_type="condition",
+            name="check",
+            conditions=[is_saved],
+            on_success=TaskTarget(flow_name=self.name, task_name="total"),
+            on_failure=Redirect(name="failed", url="/failed"),
+        )
+        self.add_task(task_type="redirect", name="skipped", url="/skipped")
+        totals = self.add_task(
+            task_type="for_loop",
+            name="total",
+            iterable_path="$.items",
+            result_keys=[{"key": "$.price", "result_key": "$.price"}],
+            result={"currency": "EUR"},
+            destination_path="$.prices",
+        )
+        totals.add_task(
+            task_type="update", name="count", tasks=[{"result": 1, "result_key": "$.n"}]
+        )
+
+
+HANDLERS = {"/api/save": lambda payload: {"saved": True, "id": 1}}
+
+
+@pytest.fixture
+def interpreter():
+    return Interpreter(
+        InterpretedWorkflow(context={"site": "main", "items": [{"price": 1}, {"price": 2}]}),
+        handlers=HANDLERS,
+    )
+
+
+def test_render_template():
+    context = {"a": {"b": [None, 2]}, "c": "d"}
+    assert render_template("{$.c}{$.a.b[1]}{$.missing}!", context) == "d2!"
+
+
+def test_run(interpreter):
+    report = interpreter.run(inputs=[{"$.amount": "ten"}, {"$.amount": "10"}])
+
+    assert report.screens == ["ask", "ask"]
+    assert report.invalid_inputs == 1
+    assert report.requests == [("/api/save?site=main", {"source": "test", "amount": "10"})]
+    assert report.round_trips == 2
+    assert report.bytes_sent == len(b'{"source": "test", "amount": "10"}')
+    assert report.bytes_received == interpreter.size + len(b'{"saved": true, "id": 1}')
+    assert report.context["summary"] == "10 saved"
+    assert report.context["log"] == ["save"]
+    assert report.context["prices"] == [
+        {"currency": "EUR", "price": 1},
+        {"currency": "EUR", "price": 2},
+    ]
+    assert "n" not in report.context, "Sub flows changed the context outside of their result"
+    assert [name for _, name in report.path] == [
+        "ask", "domain", "save", "update", "check", "total", "count", "count",
+    ]
+    assert report.steps == 8
+    assert report.redirect_url is None
+
+
+def test_run_failure_redirects(interpreter):
+    handlers = {"/api/save": lambda payload: {"saved": False}}
+    report = Interpreter(interpreter.workflow_dict, handlers=handlers).run(
+        inputs=[{"$.amount": "1"}]
+    )
+
+    assert report.redirect_url == "/failed"
+    assert report.path[-2:] == [
+        ("InterpretedWorkflow", "check"),
+        ("InterpretedWorkflow", "failed"),
+    ]
+
+
+def test_run_without_handler(interpreter):
+    with pytest.raises(InterpreterError):
+        Interpreter(interpreter.workflow_dict).run()
+
+
+class LoopWorkflow(Workflow):
+    def flow(self):
+        below_three = Validator(
+            identifier="below_three", validator="lessThan", value_key="$.count", validator_value=3
+        )
+        is_two = validators.is_equal(value_key="$.count", validator_value=2)
+        loop = self.add_task(
+            task_type="while_loop",
+            name="loop",
+            conditions=[below_three],
+            result_keys=[{"key": "$.count", "result_key": "$.count"}],
+            destination_path="$.counts",
+        )
+        loop.add_task(
+            task_type="wait",
+            name="poll",
+            url="/api/count",
+            method="GET",
+            payload_paths=[{"key": "$.count", "result_key": "$.count"}],
+            response_path="$.count",
+            conditions=[validators.greater_than_zero(value_key="$.count")],
+        )
+        loop.add_task(task_type="event", name="stop", action="break", preconditions=[is_two])
+
+
+def test_run_loops():
+    handlers = {"/api/count": lambda payload: (payload.get("count") or 0) + 1}
+    report = Interpreter(LoopWorkflow(context={"count": -1}), handlers=handlers).run()
+
+    assert report.context["counts"] == [{"count": 1}], "The break event did not end the loop"
+    assert report.round_trips == 1 + 3
+    assert [name for _, name in report.path] == ["loop", "poll", "poll", "stop"]
@@ -0,0 +1,176 @@
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.jsonpath import (
+    compile_path,
+    compile_template,
+    get_path,
+    make_getter,
+    parse_path,
+    parse_template,
+    set_path,
+)
+from workflows_engine.core.patch import apply_patch, make_patch
+from workflows_engine.exceptions import InvalidArguments
+
+
+def test_parse_path():
+    assert parse_path("$") == []
+    assert parse_path("$.a['b c'][2][\"d\"]") == ["a", "b c", 2, "d"]
+    for path in ("a.b", "$..a", "$.a..b", "$.a[*]", "$.items.*", "$.*", "$[?(@.a)]"):
+        with pytest.raises(InvalidArguments):
+            parse_path(path)
+
+
+def test_get_and_set_path():
+    value = {}
+    set_path(value, "$.a.b[1]", 2)
+    set_path(value, "$['c']", "d")
+
+    assert value == {"a": {"b": [None, 2]}, "c": "d"}
+    assert get_path(value, "$.a.b[1]") == 2
+    assert get_path(value, "$.a.missing[0]", "default") == "default"
+    assert get_path(value, "$.c.d") is None
+
+
+def test_make_getter():
+    value = {"a": [{"b": 1}], "c": 0}
+
+    assert make_getter("$.a[0].b")(value) == 1
+    assert make_getter("$.c")(value) == 0
+    assert make_getter("$.a[1].b")(value, "default") == "default"
+    assert make_getter("$.missing")(value) is None
+    assert make_getter("$")(value) is value
+
+
+def test_compile_path_interns_accessors():
+    accessor = compile_path("$.a.b")
+    assert compile_path("$.a.b") is accessor
+    assert make_getter("$.a.b") is accessor.get
+
+    value = {}
+    accessor.set(value, 1)
+    assert value == {"a": {"b": 1}}
+    with pytest.raises(InvalidArguments):
+        compile_path("$").set(value, 1)
+
+
+class PathsWorkflow(Workflow):
+    def flow(self):
+        loop = self.add_task(
+            task_type="for_loop",
+            name="loop",
+            iterable_path="$.items",
+            result_keys=[{"key": "$.item", "result_key": "$.item"}],
+            result={"id": "$.not_a_path_key"},
+            destination_path="$.results",
+        )
+        loop.add_task(
+            task_type="screen",
+            name="screen",
+            components=[
+                [
+                    components.Input(
+                        label="Value",
+                        target="value",
+                        destination_path="$.value",
+                        validators=[validators.is_equal(value_key="$.a", validator_key="$.b")],
+                    ),
+                    components.Table(
+                        table_components=[components.Textbox(identifier="cell")],
+                        table_data_path="$.rows",
+                        table_headers_path="$.headers",
+                    ),
+                ]
+            ],
+        )
+        loop.add_task(
+            task_type="jsonrpc",
+            name="save",
+            url="/save",
+            method="POST",
+            payload_paths=[{"key": "$.value", "result_key": "$.value"}],
+            response_path="$['response']",
+        )
+        self.add_task(
+            task_type="domain_param", name="domain", context_path="$.site", param="site"
+        )
+
+
+def test_workflow_paths():
+    workflow = PathsWorkflow(context={"path": "$.context"})
+    paths = workflow.get_path_accessors()
+
+    assert set(paths.accessors) == {
+        "$.items",
+        "$.item",
+        "$.results",
+        "$.value",
+        "$.a",
+        "$.b",
+        "$.rows",
+        "$.headers",
+        "$['response']",
+        "$.site",
+    }
+    assert paths["$.rows"] is compile_path("$.rows")
+    assert "$.other" not in paths
+    assert paths["$.other"].get({"other": 1}) == 1
+    assert PathsWorkflow().get_path_accessors() is paths
+
+
+def test_parse_template():
+    segments = parse_template("Hello {{ $.name }}, {$.items[0]} {{$..x}}!")
+    assert segments == [
+        "Hello ",
+        compile_path("$.name"),
+        ", ",
+        compile_path("$.items[0]"),
+        " ",
+        {"path": "$..x"},
+        "!",
+    ]
+    assert compile_template("{$.a}") is compile_template("{$.a}")
+
+
+class TokensWorkflow(Workflow):
+    emit_path_tokens = True
+
+    def flow(self):
+        self.add_task(
+            task_type="screen",
+            name="screen",
+            components=[
+                [
+                    components.Input(
+                        label="Name", target="name", destination_path="$.person['name']"
+                    ),
+                    components.MessageBox(
+                        message_type="info",
+                        background_color="#fff",
+                        template="Hi {{$.person.name}}",
+                    ),
+                ]
+            ],
+        )
+        self.add_task(
+            task_type="update",
+            name="update",
+            tasks=[{"template": "{$.person.name}!", "result_key": "$.greeting"}],
+        )
+
+
+def test_emit_path_tokens():
+    workflow_dict = TokensWorkflow().as_dict()
+
+    assert workflow_dict["path_tokens"]["$.person['name']"] == ["person", "name"]
+    assert workflow_dict["path_tokens"]["$.greeting"] == ["greeting"]
+    assert workflow_dict["template_tokens"] == {
+        "Hi {{$.person.name}}": ["Hi ", {"path": "$.person.name", "keys": ["person", "name"]}],
+        "{$.person.name}!": [{"path": "$.person.name", "keys": ["person", "name"]}, "!"],
+    }
+    assert "path_tokens" not in PathsWorkflow().as_dict()
+
+    old = dict(workflow_dict, template_tokens={}, path_tokens={})
+    patched = apply_patch(old, make_patch(old, workflow_dict))
+    assert patched["template_tokens"] == workflow_dict["template_tokens"]
@@ -0,0 +1,229 @@
+import json
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.containers import Message, Populate, TaskTarget
+from workflows_engine.core.loader import LoadedComponent, LoadedTask, WorkflowLoader
+from workflows_engine.core.tasks import Condition, Flow, Redirect, Screen, Update
+from workflows_engine.exceptions import InvalidArguments
+
+
+class LoadedWorkflowTest(Workflow):
+    def flow(self):
+        is_int = validators.is_int(value_key="$.value")
+        is_true = validators.is_true(value_key="$.done")
+        self.add_task(
+            task_type="screen",
+            name="screen",
+            preconditions=[is_true],
+            status_message_template="Saved",
+            components=[
+                [
+                    components.Input(
+                        label="Value",
+                        target="value",
+                        validators=[is_int],
+                        json_validators=[validators.greater_than_zero()],
+                        populate=Populate([is_true], path="$.value"),
+                    ),
+                    components.Button(
+                        text="Submit",
+                        action="submit",
+                        style="primary",
+                        disabling_validators=[is_int],
+                    ),
+                ],
+                [
+                    components.Modal(
+                        title="Modal",
+                        components=[[components.Textbox(content="Modal text")]],
+                        trigger_conditions=[is_true],
+                    ),
+                    components.Table(
+                        table_components=[components.Textbox(identifier="cell")],
+                        table_data_path="$.data",
+                        table_headers_path="$.headers",
+                    ),
+                ],
+                [
+                    components.ContainerRow(
+                        components=[
+                            components.Container(
+                                components=[[components.Spacer(identifier="spacer")]]
+                            )
+                        ]
+                    ),
+                    components.MessageBox(
+                        message_type="info", background_color="white", template="Note"
+                    ),
+                    components.DateTime(datetime_type="date", target="date"),
+                ],
+            ],
+        )
+        loop = self.add_task(
+            task_type="while_loop", name="loop", conditions=[is_true], preconditions=[is_int]
+        )
+        loop.add_task(
+            task_type="condition",
+            name="condition",
+            conditions=[is_int],
+            on_success=Redirect(name="done", url="/done"),
+            failure_message=Message("Failed", "error"),
+        )
+        loop.add_task(task_type="jsonrpc", name="save", url="/save", method="POST")
+        self.add_task(task_type="domain_param", name="param", context_path="$.a", param="a")
+        self.add_task(task_type="wait", name="wait", url="/poll", conditions=[is_true])
+        self.add_task(task_type="event", name="event", action="done")
+
+
+def load_all(task):
+    """Load every task and component of a loaded task"""
+    task = task.load() if isinstance(task, LoadedTask) else task
+    if isinstance(task, Flow):
+        task.tasks = [load_all(sub_task) for sub_task in task.tasks]
+    elif isinstance(task, Screen):
+        task.components = [
+            [load_component(component) for component in row] for row in task.components
+        ]
+    return task
+
+
+def load_component(component):
+    """Load a loaded component and the components it contains"""
+    if isinstance(component, LoadedComponent):
+        component = component.load()
+    if isinstance(component, components.Table):
+        component.table_components = [load_component(item) for item in component.table_components]
+    elif isinstance(component, components.ContainerRow):
+        component.components = [load_component(item) for item in component.components]
+    elif hasattr(component, "components"):
+        component.components = [
+            [load_component(item) for item in row] for row in component.components
+        ]
+    return component
+
+
+@pytest.fixture
+def workflow():
+    return LoadedWorkflowTest(context={"value": 1})
+
+
+def test_from_dict(workflow):
+    loaded = Workflow.from_dict(workflow.as_dict())
+
+    assert all(isinstance(task, LoadedTask) for task in loaded.base_flow_task.tasks)
+    assert loaded.as_dict() == workflow.as_dict()
+    assert loaded.context == {"value": 1}
+
+
+def test_from_json(workflow):
+    loaded = Workflow.from_json(workflow.as_json_bytes(), context={"value": 2})
+
+    assert loaded.get_hash() == workflow.get_hash()
+    assert loaded.as_dict()["context"] == {"value": 2}
+
+
+def test_load_all_tasks_and_components(workflow):
+    loaded = Workflow.from_dict(workflow.as_dict())
+    loaded.base_flow_task = load_all(loaded.base_flow_task)
+    flow = loaded.base_flow_task
+
+    assert type(flow.tasks[0]) is Screen
+    assert type(flow.tasks[1].tasks[0]) is Condition
+    assert type(flow.tasks[1].tasks[0].on_success) is LoadedTask
+    assert flow.tasks[1].sub_type == "while_loop"
+    assert not any(
+        isinstance(component, LoadedComponent) for component in flow.get_base_components()
+    )
+    assert loaded.as_dict() == workflow.as_dict()
+
+
+def test_loaded_components_are_loaded_when_accessed(workflow):
+    loaded = Workflow.from_dict(workflow.as_dict())
+    screen = loaded.base_flow_task.tasks[0].load()
+    button = screen.components[0][1]
+
+    assert isinstance(button, LoadedComponent)
+    button = button.load()
+    assert type(button) is components.Button
+    assert button.text == "Submit"
+    assert [validator.identifier for validator in button.disabling_validators] == ["isint_value"]
+
+
+def test_copy_task_of_loaded_workflow(workflow):
+    original = workflow.as_dict()
+    loaded = Workflow.from_dict(original)
+    screen = loaded.copy_task("screen")
+    screen.status_message_template = "Done"
+    modified = loaded.as_dict()
+
+    assert type(screen) is Screen
+    assert modified["flow"]["tasks"][0]["status_message"]["template"] == "Done"
+    assert modified["flow"]["tasks"][1] == original["flow"]["tasks"][1]
+    assert modified["hash"] != original["hash"]
+
+
+def test_unknown_types_are_not_loaded(workflow):
+    workflow_dict = json.loads(workflow.as_json_bytes())
+    workflow_dict["flow"]["tasks"][-1]["type"] = "custom"
+    workflow_dict["components"]["spacer"]["type"] = "custom"
+    loader = WorkflowLoader(workflow_dict)
+    task = loader.get_task(workflow_dict["flow"]["tasks"][-1])
+    component = loader.get_component({"name": "spacer"})
+
+    assert task.load() is task
+    assert component.load() is component
+    assert Workflow.from_dict(workflow_dict).as_dict()["flow"] == workflow_dict["flow"]
+
+
+def test_message_keys_not_loaded(workflow):
+    workflow_dict = dict(workflow.as_dict(), messages={"key": "Value"})
+
+    with pytest.raises(InvalidArguments):
+        Workflow.from_dict(workflow_dict)
+
+
+class ConditionTargetsTest(Workflow):
+    def flow(self):
+        is_int = validators.is_int(value_key="$.value")
+        is_true = validators.is_true(value_key="$.done")
+        self.add_task(
+            task_type="condition",
+            name="check",
+            conditions=[is_int],
+            on_success=TaskTarget("main", "done"),
+            on_failure=Screen(
+                name="retry",
+                preconditions=[is_true],
+                components=[[components.Textbox(identifier="retry_text", content="Retry")]],
+            ),
+        )
+        self.add_task(task_type="update", name="done")
+
+
+def test_load_task_target():
+    workflow = ConditionTargetsTest()
+    loaded = Workflow.from_dict(workflow.as_dict())
+    condition = loaded.base_flow_task.tasks[0].load()
+
+    assert type(condition.on_success) is TaskTarget
+    assert condition.on_success.as_dict() == {"flow": "main", "task": "done"}
+    assert type(condition.on_failure) is LoadedTask
+    assert type(loaded.base_flow_task.tasks[1].load()) is Update
+    assert loaded.as_dict() == workflow.as_dict()
+
+
+def test_loaded_condition_includes_inline_targets():
+    workflow = ConditionTargetsTest()
+    workflow_dict = workflow.as_dict()
+    loader = WorkflowLoader(workflow_dict)
+    condition = loader.get_task(workflow_dict["flow"]["tasks"][0])
+
+    assert set(workflow_dict["validators"]) == {"isint_value", "is_true"}
+    assert "retry_text" in workflow_dict["components"]
+    assert [task_dict["name"] for task_dict in condition.iter_task_dicts()] == ["check", "retry"]
+    assert [validator.identifier for validator in condition.get_validators()] == [
+        "isint_value",
+        "is_true",
+    ]
+    assert Workflow.from_dict(workflow_dict).as_dict() == workflow_dict
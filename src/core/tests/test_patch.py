@@ -0,0 +1,97 @@
+from workflows_engine import Workflow
+from workflows_engine.core import components
+from workflows_engine.core.patch import make_patch, apply_patch
+from workflows_engine.core.translate import use_locale
+from workflows_engine import validators
+
+
+def make_workflow(label="Second", extra_screen=False):
+    class PatchedWorkflow(Workflow):
+        history_max_entries = 8
+
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="first",
+                preconditions=validators.is_int(value_key="$.value"),
+                components=[components.Input(label="First", target="first")],
+            )
+            sub_flow = self.add_task(task_type="flow", name="sub_flow")
+            sub_flow.add_task(
+                task_type="screen",
+                name="second",
+                components=[components.Input(label=label, target="second")],
+            )
+            sub_flow.add_task(task_type="redirect", name="redirect", url="/")
+            if extra_screen:
+                self.add_task(
+                    task_type="screen",
+                    name="third",
+                    components=[components.Input(label="Third", target="third")],
+                )
+
+    return PatchedWorkflow
+
+
+def as_dict(workflow_class, **kwargs):
+    workflow_dict = workflow_class(**kwargs).as_dict(copy=True)
+    del workflow_dict["context"]
+    return workflow_dict
+
+
+def test_patch_round_trip():
+    old = as_dict(make_workflow())
+    new = as_dict(make_workflow(label="Changed", extra_screen=True))
+    patch = make_patch(old, new)
+
+    assert apply_patch(old, patch) == new
+    assert patch["from"] == old["hash"]
+    assert patch["to"] == new["hash"]
+
+
+def test_patch_only_contains_changes():
+    old = as_dict(make_workflow())
+    new = as_dict(make_workflow(label="Changed"))
+    patch = make_patch(old, new)
+
+    assert list(patch["components"]["set"]) == ["input_second"]
+    assert "validators" not in patch
+    assert patch["flow"]["tasks"][0] == {"keep": 0}
+
+
+def test_unchanged_patch():
+    old = as_dict(make_workflow())
+    patch = make_patch(old, old)
+
+    assert set(patch) == {"from", "to"}
+
+
+def test_get_patch_from_history():
+    old_class = make_workflow()
+    new_class = make_workflow(label="Changed")
+    old = as_dict(old_class)
+    new_class.add_history(old)
+    workflow = new_class()
+
+    patch = workflow.get_patch(old["hash"])
+    assert apply_patch(old, patch)["components"] == workflow.as_dict()["components"]
+    assert workflow.get_patch("unknown") is None
+    assert workflow.get_patch(old["hash"]) is patch
+
+
+def test_get_patch_in_locale():
+    workflow_class = make_workflow()
+    with use_locale("fr"):
+        workflow = workflow_class()
+        old_hash = workflow.get_hash()
+        workflow.add_task(task_type="redirect", name="added", url="/added")
+
+        patch = workflow.get_patch(old_hash)
+    assert patch["from"] == old_hash
+    assert patch["to"] == workflow.get_hash()
+
+    old = as_dict(make_workflow(label="Old"))
+    del old["hash"]
+    with use_locale("fr"):
+        old_hash = workflow_class.add_history(old, "fr")
+        assert workflow_class().get_patch(old_hash)["from"] == old_hash
@@ -0,0 +1,71 @@
+import copy
+import pickle
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.containers import Message
+
+
+class PickledWorkflow(Workflow):
+    def flow(self):
+        self.add_task(
+            task_type="screen",
+            name="screen",
+            preconditions=validators.is_int(value_key="$.value", message_template="Not a number"),
+            components=[
+                [components.Input(label="Value", target="value")],
+                [components.Button(text="Submit", action="submit", style="primary")],
+            ],
+        )
+
+
+def get_dict(value):
+    if isinstance(value, components.Component):
+        return value.get_base_component_dict()
+    return value.as_dict()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        components.Button(text="Submit", action="submit", style="primary"),
+        components.Input(label="Value", target="value"),
+        validators.is_int(value_key="$.value", message_template="Not a number"),
+        Message(template="Saved", message_type="success"),
+    ],
+)
+@pytest.mark.parametrize("round_trip", [lambda x: pickle.loads(pickle.dumps(x)), copy.deepcopy])
+def test_round_trip_keeps_translatable_values(value, round_trip):
+    copied = round_trip(value)
+
+    assert type(copied) is type(value)
+    assert get_dict(copied) == get_dict(value)
+
+
+def test_round_trip_leaves_out_caches():
+    workflow = PickledWorkflow()
+    workflow.as_dict()
+    task = pickle.loads(pickle.dumps(workflow.base_flow_task.tasks[0]))
+
+    assert task._dict_cache is None
+    assert task.as_dict() == workflow.base_flow_task.tasks[0].as_dict()
+
+
+def test_pickle_built_workflow():
+    workflow = PickledWorkflow(context={"value": 1})
+    workflow_dict = workflow.as_dict()
+    loaded = pickle.loads(pickle.dumps(workflow))
+
+    assert loaded.compiled.base_flow_task is loaded.base_flow_task
+    assert loaded.as_dict() == workflow_dict
+    assert loaded.as_json_bytes() == workflow.as_json_bytes()
+
+
+def test_pickled_workflow_can_be_modified():
+    workflow = PickledWorkflow()
+    workflow.as_dict()
+    loaded = pickle.loads(pickle.dumps(workflow))
+    loaded.add_task(task_type="redirect", name="redirect", url="/")
+
+    assert loaded.get_hash() != workflow.get_hash()
+    assert len(loaded.as_dict()["flow"]["tasks"]) == 2
@@ -0,0 +1,43 @@
+import copy
+import json
+import pickle
+import pytest
+from workflows_engine.core.readonly import ReadOnlyDict, ReadOnlyList, read_only
+
+
+@pytest.fixture
+def value():
+    return read_only({"a": [1, {"b": 2}], "c": {"d": [3]}})
+
+
+def test_read_only(value):
+    assert isinstance(value, ReadOnlyDict)
+    assert isinstance(value["a"], ReadOnlyList)
+    assert isinstance(value["a"][1], ReadOnlyDict)
+    assert value == {"a": [1, {"b": 2}], "c": {"d": [3]}}
+    assert json.loads(json.dumps(value)) == value
+
+
+@pytest.mark.parametrize(
+    "modify",
+    [
+        lambda value: value.update(a=1),
+        lambda value: value.pop("a"),
+        lambda value: value.__setitem__("e", 1),
+        lambda value: value["a"].append(1),
+        lambda value: value["a"][1].setdefault("e", 1),
+        lambda value: value["c"]["d"].sort(),
+    ],
+)
+def test_cannot_modify(value, modify):
+    with pytest.raises(TypeError):
+        modify(value)
+
+
+def test_copies_can_be_modified(value):
+    for value_copy in (copy.deepcopy(value), pickle.loads(pickle.dumps(value))):
+        assert type(value_copy) is dict
+        assert type(value_copy["c"]["d"]) is list
+        value_copy["a"][1]["b"] = 3
+        assert value["a"][1]["b"] == 2
+    assert type(copy.copy(value)) is dict
@@ -0,0 +1,176 @@
+import pytest
+from workflows_engine import Workflow, validators
+from workflows_engine.core import components
+from workflows_engine.core.validators import (
+    VALIDATOR_TYPE_MAPPING,
+    CompiledValidators,
+    Validator,
+    compile_batch_validator,
+    compile_validator,
+)
+from workflows_engine.exceptions import InvalidArguments
+
+
+def test_compile_validator():
+    is_equal = compile_validator(
+        {"type": "equals", "value_key": "$.a", "validator_key": "$.b", "valid_when": False}
+    )
+    assert is_equal({"a": 1, "b": 2})
+    assert not is_equal({"a": 1, "b": 1})
+
+    greater = compile_validator({"type": "greaterThan", "value_key": "$.a", "validator_value": 0})
+    assert greater({"a": "2"})
+    assert not greater({"a": "x"})
+    assert not greater({"a": 2}, -1), "The field value was not used"
+
+    missing = compile_validator({"type": "missing"})
+    with pytest.raises(InvalidArguments):
+        missing({})
+
+
+def test_is_int_and_is_length():
+    is_int = compile_validator({"type": "isInt", "value_key": "$.a"})
+    assert is_int({"a": "-12"})
+    for value in (" 2", "2 ", "\u0663", "1.5", True):
+        assert not is_int({"a": value}), value
+
+    not_empty = compile_validator({"type": "isLength", "validator_value": 1})
+    assert not_empty({}, "hello")
+    assert not_empty({}, ["a"])
+    assert not not_empty({}, "")
+    assert not not_empty({}, None)
+
+
+def test_add_validator_type():
+    Validator.add_validator_type("hasLength", lambda value, length: len(value) == length)
+    try:
+        has_length = compile_validator({"type": "hasLength", "validator_value": 2})
+        assert has_length({}, "ab")
+        assert not has_length({}, "abc")
+    finally:
+        del VALIDATOR_TYPE_MAPPING["hasLength"]
+
+
+class ValidatedWorkflow(Workflow):
+    def flow(self):
+        self.add_task(
+            task_type="screen",
+            name="screen",
+            components=[
+                [
+                    components.Input(
+                        label="Age",
+                        target="age",
+                        destination_path="$.person.age",
+                        validators=[validators.is_int(), validators.greater_than_zero()],
+                    ),
+                    components.Modal(
+                        title="More",
+                        components=[
+                            [
+                                components.Input(
+                                    label="Count",
+                                    target="count",
+                                    destination_path="$.count",
+                                    validators=[validators.is_int()],
+                                )
+                            ]
+                        ],
+                    ),
+                ]
+            ],
+        )
+
+
+def test_validate():
+    workflow = ValidatedWorkflow()
+
+    assert workflow.validate({"person": {"age": 3}, "count": "4"}) == {}
+    assert workflow.validate({"count": "four"}) == {
+        "$.count": ["Error: Field is not a whole number"]
+    }
+    assert workflow.validate({"person": {"age": "-1"}}) == {
+        "$.person.age": ["Error: Value less than zero"]
+    }
+
+
+def test_unknown_types_fail_when_evaluated():
+    class CustomWorkflow(Workflow):
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[
+                    components.Input(
+                        label="Message",
+                        target="message",
+                        destination_path="$.message",
+                        validators=Validator(
+                            identifier="not_empty", validator="isLength", validator_value=1
+                        ),
+                    ),
+                    components.Input(
+                        label="Code",
+                        target="code",
+                        destination_path="$.code",
+                        validators=Validator(identifier="custom", validator="custom"),
+                    ),
+                ],
+            )
+
+    workflow = CustomWorkflow()
+
+    assert workflow.validate({"message": "hello"}) == {}
+    assert list(workflow.validate({"message": ""})) == ["$.message"]
+    with pytest.raises(InvalidArguments):
+        workflow.validate({"code": "a"})
+
+
+def test_compiled_validators_are_shared_by_hash():
+    workflow_dict = ValidatedWorkflow().as_dict()
+    compiled = CompiledValidators.for_workflow(workflow_dict)
+
+    assert CompiledValidators.for_workflow(ValidatedWorkflow().as_dict()) is compiled
+    assert [path for path, _, _ in compiled.fields] == ["$.person.age", "$.count"]
+
+
+@pytest.mark.parametrize("valid_when", [True, False])
+@pytest.mark.parametrize(
+    "validator_dict",
+    [
+        {"type": "isInt"},
+        {"type": "greaterThan", "validator_value": 0},
+        {"type": "greaterThan", "validator_value": "x"},
+        {"type": "lessThan", "validator_value": "1.5"},
+        {"type": "equals", "validator_value": "1"},
+        {"type": "equals", "validator_key": "$.other"},
+    ],
+)
+def test_batch_validator_matches_validator(validator_dict, valid_when):
+    validator_dict = dict(validator_dict, valid_when=valid_when)
+    values = [0, 1, -1, True, None, "1", " 2 ", "1.5", "x", 2.5, [], float("nan")]
+    contexts = [{"other": value} for value in reversed(values)]
+
+    is_valid = compile_validator(validator_dict)
+    expected = [is_valid(context, value) for value, context in zip(values, contexts)]
+    assert compile_batch_validator(validator_dict)(values, contexts) == expected
+
+
+def test_validate_batch():
+    workflow = ValidatedWorkflow()
+    contexts = [
+        {"person": {"age": 3}, "count": "4"},
+        {"count": "four"},
+        {"person": {"age": "-1"}},
+        {},
+    ]
+
+    masks = workflow.validate_batch(contexts)
+    assert masks == {
+        "$.person.age": [False, False, True, False],
+        "$.count": [False, True, False, False],
+    }
+    for index, context in enumerate(contexts):
+        errors = workflow.validate(context)
+        assert {path for path, mask in masks.items() if mask[index]} == set(errors)
+    assert workflow.get_compiled_validators().get_error_mask(contexts) == [False, True, True, False]
@@ -1,6 +1,9 @@
+import io
+import json
 import pytest
 from workflows_engine import Workflow
 from workflows_engine import validators
+from workflows_engine.core.tasks import Redirect
 from .schema_validator import get_validator_for
 
 
@@ -29,3 +32,185 @@ def test_flow_to_dict(workflow):
     workflow_dict = workflow(context={"value": "a"}).as_dict()
     validator = get_validator_for("workflow")
     validator.validate(workflow_dict)
+
+
+def test_as_json_bytes(workflow):
+    instance = workflow(context={"value": "a"})
+    assert json.loads(instance.as_json_bytes()) == instance.as_dict()
+
+
+def test_as_json_bytes_encoded_context(workflow):
+    instance = workflow(context={"value": "a"})
+    workflow_dict = json.loads(instance.as_json_bytes(context=b'{"value": "b"}'))
+
+    assert workflow_dict["context"] == {"value": "b"}
+    assert workflow_dict["hash"] == instance.get_hash()
+
+
+def test_write_json(workflow):
+    instance = workflow(context={"value": "a"})
+    fp = io.BytesIO()
+    instance.write_json(fp)
+
+    assert fp.getvalue() == instance.as_json_bytes()
+
+
+@pytest.fixture
+def cached_workflow():
+    class CachedWorkflowTest(Workflow):
+        cache_templates = True
+        builds = 0
+
+        def flow(self, url="/endpoint/task/url"):
+            CachedWorkflowTest.builds += 1
+            self.add_task(task_type="jsonrpc", name="task", url=url, method="GET")
+
+    return CachedWorkflowTest
+
+
+def test_template_shared_between_instances(cached_workflow):
+    first = cached_workflow(context={"user": 1})
+    second = cached_workflow(context={"user": 2})
+
+    assert cached_workflow.builds == 1, "Flow rebuilt for the same arguments"
+    assert first.base_flow_task is second.base_flow_task
+    assert first.get_hash() == second.get_hash()
+    assert first.as_dict()["context"] == {"user": 1}
+    assert second.as_dict()["context"] == {"user": 2}
+
+
+def test_template_keyed_by_arguments(cached_workflow):
+    first = cached_workflow("/a")
+    second = cached_workflow("/b")
+
+    assert cached_workflow.builds == 2
+    assert first.get_hash() != second.get_hash()
+
+
+def test_template_cache_bounded(cached_workflow):
+    cached_workflow.template_cache_max_entries = 1
+    cached_workflow("/a")
+    cached_workflow("/b")
+    cached_workflow("/a")
+
+    assert cached_workflow.builds == 3, "Least recently used template not evicted"
+    assert len(cached_workflow.get_template_cache()) == 1
+
+
+def test_add_task_does_not_modify_template(cached_workflow):
+    first = cached_workflow()
+    first.as_dict()
+    first.add_task(task_type="redirect", name="redirect", url="/")
+    second = cached_workflow()
+
+    assert len(first.base_flow_task.tasks) == 2
+    assert len(second.base_flow_task.tasks) == 1
+    assert [task["name"] for task in first.as_dict()["flow"]["tasks"]] == ["task", "redirect"]
+    assert [task["name"] for task in second.as_dict()["flow"]["tasks"]] == ["task"]
+    assert first.get_hash() != second.get_hash()
+
+
+def test_iter_json(workflow):
+    context = {"rows": [{"value": index} for index in range(1000)]}
+    instance = workflow(context=context)
+    chunks = list(instance.iter_json(chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == instance.as_json_bytes()
+
+
+def test_iter_json_encoded_context(workflow):
+    instance = workflow(context={"value": "a"})
+    chunks = instance.iter_json(context=b'{"value": "b"}', chunk_size=16)
+
+    assert json.loads(b"".join(chunks))["context"] == {"value": "b"}
+
+
+def test_as_dict_read_only(workflow):
+    instance = workflow(context={"value": "a"})
+    workflow_dict = instance.as_dict()
+
+    with pytest.raises(TypeError):
+        workflow_dict["context"] = {}
+    with pytest.raises(TypeError):
+        workflow_dict["flow"]["tasks"].append({})
+    assert workflow_dict["flow"] is instance.as_dict()["flow"]
+
+
+def test_as_dict_copy(workflow):
+    instance = workflow(context={"value": "a"})
+    workflow_dict = instance.as_dict(copy=True)
+    workflow_dict["context"]["value"] = "b"
+    workflow_dict["flow"]["tasks"].append({})
+
+    assert workflow_dict != instance.as_dict()
+    assert instance.context == {"value": "a"}
+
+
+@pytest.fixture
+def variant_workflow():
+    class VariantWorkflowTest(Workflow):
+        def flow(self):
+            for index in range(3):
+                self.add_task(
+                    task_type="jsonrpc", name="task_{}".format(index), url="/", method="GET"
+                )
+
+    return VariantWorkflowTest
+
+
+def test_clone_shares_built_workflow(variant_workflow):
+    instance = variant_workflow(context={"value": "a"})
+    instance.as_dict()
+    clone = instance.clone(context={"value": "b"})
+
+    assert clone.base_flow_task is instance.base_flow_task
+    assert clone.get_compiled() is instance.get_compiled()
+    assert clone.as_dict()["context"] == {"value": "b"}
+
+
+def test_clone_add_task_does_not_modify_original(variant_workflow):
+    instance = variant_workflow()
+    original = instance.as_dict()
+    clone = instance.clone()
+    clone.add_task(task_type="redirect", name="redirect", url="/")
+    variant = clone.as_dict()
+
+    assert len(instance.base_flow_task.tasks) == 3
+    assert instance.as_dict() == original
+    assert len(variant["flow"]["tasks"]) == 4
+    assert variant["flow"]["tasks"][0] is original["flow"]["tasks"][0]
+    assert variant["hash"] != original["hash"]
+
+
+def test_clone_replace_task(variant_workflow):
+    instance = variant_workflow()
+    original = instance.as_dict()
+    clone = instance.clone()
+    clone.replace_task("task_1", Redirect(name="task_1", url="/other"))
+    variant = clone.as_dict()
+
+    assert instance.base_flow_task.tasks[1].task_type == "jsonrpc"
+    assert variant["flow"]["tasks"][1]["type"] == "redirect"
+    assert variant["flow"]["tasks"][2] is original["flow"]["tasks"][2]
+
+
+def test_clone_copy_task(variant_workflow):
+    instance = variant_workflow()
+    original = instance.as_dict()
+    clone = instance.clone()
+    task = clone.copy_task("task_0")
+    task.preconditions = [validators.is_true(value_key="$.done")]
+    variant = clone.as_dict()
+
+    assert instance.base_flow_task.tasks[0].preconditions is None
+    assert instance.as_dict()["flow"] == original["flow"]
+    assert variant["flow"]["tasks"][0]["preconditions"] == ["is_true"]
+    assert "is_true" in variant["validators"]
+    assert variant["flow"]["tasks"][1] is original["flow"]["tasks"][1]
+    assert variant["hash"] != original["hash"]
+
+
+def test_copy_task_missing(variant_workflow):
+    with pytest.raises(KeyError):
+        variant_workflow().clone().copy_task("missing")
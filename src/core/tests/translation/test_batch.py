@@ -0,0 +1,86 @@
+import pytest
+from workflows_engine import Workflow
+from workflows_engine.core.components import Button
+from workflows_engine.core.translate import BatchTranslator, Translatable
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def locale():
+    return ["en"]
+
+
+@pytest.fixture
+def batch_translator(calls, locale):
+    def translate(strings, locale):
+        calls.append(sorted(strings))
+        return ["{}:{}".format(locale, string) for string in strings]
+
+    translator = BatchTranslator(translate, max_entries=10)
+    old_batch_translator = Translatable._batch_translator
+    old_get_locale = Translatable.__dict__["_get_locale"]
+    Translatable._batch_translator = translator
+    Translatable._get_locale = staticmethod(lambda: locale[0])
+
+    yield translator
+
+    Translatable._batch_translator = old_batch_translator
+    Translatable._get_locale = old_get_locale
+
+
+@pytest.fixture
+def workflow():
+    class TranslatedWorkflow(Workflow):
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[
+                    [Button(action="submit", style="primary", text="Next")],
+                    [Button(action="reset", style="secondary", text="Back")],
+                ],
+            )
+
+    return TranslatedWorkflow
+
+
+def get_button_texts(workflow_dict):
+    return sorted(
+        component["text"]
+        for component in workflow_dict["components"].values()
+        if "text" in component
+    )
+
+
+def test_strings_translated_in_one_call(batch_translator, calls, workflow):
+    workflow_dict = workflow().as_dict()
+
+    assert calls == [["Back", "Next"]]
+    assert get_button_texts(workflow_dict) == ["en:Back", "en:Next"]
+
+
+def test_translations_memoized_per_locale(batch_translator, calls, locale, workflow):
+    workflow().as_dict()
+    workflow().as_dict()
+    assert len(calls) == 1, "Memoized translations translated again"
+
+    locale[0] = "fr"
+    workflow_dict = workflow().as_dict()
+    assert len(calls) == 2
+    assert get_button_texts(workflow_dict) == ["fr:Back", "fr:Next"]
+
+
+def test_memo_is_bounded(batch_translator):
+    batch_translator.get_translations(["string {}".format(i) for i in range(20)])
+
+    assert len(batch_translator.memo) == 10
+
+
+def test_single_string(batch_translator, calls):
+    assert batch_translator("Next") == "en:Next"
+    assert batch_translator("Next") == "en:Next"
+    assert calls == [["Next"]]
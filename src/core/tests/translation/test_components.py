@@ -1,3 +1,4 @@
+import copy
 import pytest
 from workflows_engine.core.translate import Translatable
 from workflows_engine.core.components import *
@@ -7,7 +8,7 @@ from workflows_engine.core.components import *
 def translate():
     func = lambda x: "{} has been translated!".format(x)
 
-    old_translator = Translatable._translator
+    old_translator = Translatable.__dict__["_translator"]
     Translatable._translator = staticmethod(func)
 
     yield func
@@ -19,3 +20,36 @@ def test_button(translate):
     button_text = "Button"
     button = Button(text=button_text, action="submit", style="primary")
     assert button.text == translate(button_text), "Button text not translated"
+
+
+def test_untranslated_value_is_stored_on_instance(translate):
+    button_text = "Button"
+    button = Button(text=button_text, action="submit", style="primary")
+    assert button._text == button_text, "Untranslated text not stored on the button"
+
+
+def test_copy_keeps_translatable_values(translate):
+    button_text = "Button"
+    button = copy.copy(Button(text=button_text, action="submit", style="primary"))
+    assert button.text == translate(button_text), "Button text not kept by copy"
+
+
+def test_weakref_slots_still_supported(translate):
+    class Greeting:
+        __slots__ = ["__weakref__"]
+
+        text = Translatable()
+
+    greeting = Greeting()
+    greeting.text = "Hello"
+    assert greeting.text == translate("Hello")
+
+
+def test_slots_without_translatable_attribute():
+    # Python before 3.12 wraps the errors of __set_name__ in a RuntimeError
+    with pytest.raises((TypeError, RuntimeError)):
+
+        class Greeting:
+            __slots__ = ["text_value"]
+
+            text = Translatable()
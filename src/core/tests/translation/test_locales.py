@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from workflows_engine import Workflow
+from workflows_engine.core.components import Button
+from workflows_engine.core.translate import Translatable, use_locale, use_translator
+
+
+@pytest.fixture
+def translate():
+    func = lambda x: "{}:{}".format(Translatable.get_locale(), x)
+
+    old_translator = Translatable.__dict__["_translator"]
+    Translatable._translator = staticmethod(func)
+
+    yield func
+
+    Translatable._translator = old_translator
+
+
+@pytest.fixture
+def workflow():
+    class LocaleWorkflow(Workflow):
+        cache_templates = True
+
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[[Button(action="submit", style="primary", text="Next")]],
+            )
+
+    return LocaleWorkflow
+
+
+def get_button_text(workflow_dict):
+    (button,) = workflow_dict["components"].values()
+    return button["text"]
+
+
+def test_workflows_cached_per_locale(translate, workflow):
+    with use_locale("en"):
+        english = workflow()
+    with use_locale("fr"):
+        french = workflow()
+        assert workflow().compiled is french.compiled
+
+    assert english.compiled is not french.compiled
+    assert get_button_text(english.as_dict()) == "en:Next"
+    assert get_button_text(french.as_dict()) == "fr:Next"
+
+
+def test_locale_in_hash(workflow):
+    # The workflows are identical apart from the locale as nothing is translated
+    with use_locale("en"):
+        english = workflow()
+    with use_locale("fr"):
+        french = workflow()
+
+    assert english.get_hash() != french.get_hash()
+    assert english.get_hash() != workflow().get_hash()
+
+
+def test_warm_up(translate, workflow):
+    hashes = workflow.warm_up(locales=("en", "fr"))
+
+    assert len(workflow.get_template_cache()) == 2
+    with use_locale("fr"):
+        assert workflow().get_hash() == hashes[((), "fr")]
+
+
+def test_concurrent_locales(translate, workflow):
+    def build(locale):
+        with use_locale(locale):
+            return get_button_text(workflow().as_dict())
+
+    locales = ["en", "fr", "de", "es"] * 8
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        texts = list(executor.map(build, locales))
+
+    assert texts == ["{}:Next".format(locale) for locale in locales]
+
+
+def test_translator_per_context():
+    async def build(suffix):
+        with use_translator(lambda x: x + suffix):
+            await asyncio.sleep(0)
+            return Button(action="submit", style="primary", text="Next").text
+
+    async def main():
+        return await asyncio.gather(build("!"), build("?"))
+
+    assert asyncio.run(main()) == ["Next!", "Next?"]
+    assert Button(action="submit", style="primary", text="Next").text == "Next"
@@ -0,0 +1,92 @@
+import pytest
+from workflows_engine import Workflow
+from workflows_engine.core.components import Button, MessageBox
+from workflows_engine.core.translate import Translatable, get_message_key, use_locale
+
+
+@pytest.fixture
+def translate():
+    func = lambda x: "{}:{}".format(Translatable.get_locale(), x)
+
+    old_translator = Translatable.__dict__["_translator"]
+    Translatable._translator = staticmethod(func)
+
+    yield func
+
+    Translatable._translator = old_translator
+
+
+@pytest.fixture
+def workflow():
+    class MessageKeysWorkflow(Workflow):
+        cache_templates = True
+        emit_message_keys = True
+
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[[Button(action="submit", style="primary", text="Next")]],
+            )
+
+    return MessageKeysWorkflow
+
+
+def test_message_keys_emitted(translate, workflow):
+    workflow_dict = workflow().as_dict()
+    (button,) = workflow_dict["components"].values()
+
+    assert button["text"] == get_message_key("Next")
+    assert workflow_dict["messages"] == {get_message_key("Next"): "Next"}
+
+
+def test_workflow_shared_between_locales(translate, workflow):
+    with use_locale("en"):
+        english = workflow()
+    with use_locale("fr"):
+        french = workflow()
+
+    assert english.compiled is french.compiled
+    assert english.get_hash() == french.get_hash()
+
+
+def test_catalogue(translate, workflow):
+    instance = workflow()
+    key = get_message_key("Next")
+
+    assert instance.get_catalogue("en") == {key: "en:Next"}
+    assert instance.get_catalogue("fr") == {key: "fr:Next"}
+    assert instance.get_catalogue("fr") is instance.get_catalogue("fr")
+    with use_locale("de"):
+        assert instance.get_catalogue() == {key: "de:Next"}
+
+
+
+def test_catalogue_tokens(translate):
+    class TokensWorkflow(Workflow):
+        emit_message_keys = True
+        emit_path_tokens = True
+
+        def flow(self):
+            self.add_task(
+                task_type="screen",
+                name="screen",
+                components=[
+                    [
+                        MessageBox(
+                            message_type="info",
+                            background_color="#fff",
+                            template="Hi {{$.name}}",
+                        ),
+                        Button(action="submit", style="primary", text="Next"),
+                    ]
+                ],
+            )
+
+    instance = TokensWorkflow()
+    key = get_message_key("Hi {{$.name}}")
+    placeholder = {"path": "$.name", "keys": ["name"]}
+
+    assert instance.as_dict()["template_tokens"] == {}
+    assert instance.get_catalogue_tokens("fr") == {key: ["fr:Hi ", placeholder]}
+    assert instance.get_catalogue_tokens("en") == {key: ["en:Hi ", placeholder]}
@@ -1,4 +1,35 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import blake2b
+from types import MemberDescriptorType
 from weakref import WeakKeyDictionary
+from .cache import LRUCache
+
+__all__ = (
+    "Translatable",
+    "BatchTranslator",
+    "PendingTranslation",
+    "pending_translations",
+    "call_translated",
+    "use_locale",
+    "use_translator",
+    "get_message_key",
+    "translate_strings",
+    "keep_untranslated",
+)
+
+
+# The translator and a tuple of the locale set for the current context by ``use_translator`` and
+# ``use_locale``, so threads and asyncio tasks can translate to different locales
+_translator = ContextVar("translator", default=None)
+_locale = ContextVar("locale", default=None)
+# The translator of the context ``pending_translations`` was entered in
+_pending_translator = ContextVar("pending_translator", default=None)
+
+
+def keep_untranslated(value):
+    """The default translator, strings are not translated"""
+    return value
 
 
 class Translatable:
@@ -12,22 +43,270 @@ class Translatable:
         ```python
         Translatable._translator = staticmethod(magic_translation_function)
         ```
+
+        When workflows are served in several languages, replace the `_get_locale` class method
+        so built workflows are cached and hashed per locale. Translators should translate to the
+        locale returned by `Translatable.get_locale()`. The translator and locale can also be set
+        for the current thread or asyncio task with `use_translator` and `use_locale`.
+
+        The untranslated value is stored on the instance in the attribute of the same name
+        prefixed with an underscore, which classes with ``__slots__`` should declare. Values are
+        translated when read. Classes with ``__slots__`` declaring ``__weakref__`` instead are
+        still supported, their values are kept in a dict of the descriptor by instance, which
+        is slower and not copied or pickled with the instance.
+
+        e.g
+        ```python
+        class Greeting:
+            __slots__ = ["_text"]
+
+            text = Translatable()
+        ```
     """
 
-    _translator = staticmethod(lambda x: x)
+    __slots__ = ["name", "attribute", "values"]
+
+    _translator = staticmethod(keep_untranslated)
+    # When set to a ``BatchTranslator`` the strings of a workflow are translated in one call
+    # when it is built, see ``BatchTranslator``
+    _batch_translator = None
+    # Returns the locale of the current request
+    _get_locale = staticmethod(lambda: None)
+
+    @classmethod
+    def get_translator(cls):
+        """Get the translator of the current context, ``_translator`` if not set"""
+        translator = _translator.get()
+        return cls._translator if translator is None else translator
+
+    @classmethod
+    def get_locale(cls):
+        """Get the locale strings are translated to, None if not known"""
+        locale = _locale.get()
+        return cls._get_locale() if locale is None else locale[0]
 
     def __init__(self):
-        self._refs = WeakKeyDictionary()
+        self.name = None
+        self.attribute = None
+        # The values by instance of classes without the attribute, see ``__set_name__``
+        self.values = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attribute = "_" + name
+        has_attribute = owner.__dictoffset__ or isinstance(
+            getattr(owner, self.attribute, None), MemberDescriptorType
+        )
+        if not has_attribute:
+            if not owner.__weakrefoffset__:
+                raise TypeError(
+                    "{}.{} is Translatable, {!r} must be declared in __slots__".format(
+                        owner.__name__, name, self.attribute
+                    )
+                )
+            self.values = WeakKeyDictionary()
 
     def __get__(self, inst, cls):
         if inst is None:
             return self
 
-        value = self._refs.get(inst)
+        if self.values is None:
+            value = getattr(inst, self.attribute, None)
+        else:
+            value = self.values.get(inst)
         if isinstance(value, str):
-            return self._translator(value)
+            translator = _translator.get()
+            return (self._translator if translator is None else translator)(value)
         else:
             return value
 
     def __set__(self, inst, value):
-        self._refs[inst] = value
+        if self.values is None:
+            setattr(inst, self.attribute, value)
+        else:
+            self.values[inst] = value
+
+
+class PendingTranslation(str):
+    """A translatable string read while a workflow is compiled, replaced by its translation"""
+
+    __slots__ = []
+
+
+@contextmanager
+def use_translator(translator):
+    """Translate with ``translator`` within the context, instead of ``Translatable._translator``"""
+    token = _translator.set(translator)
+    try:
+        yield
+    finally:
+        _translator.reset(token)
+
+
+@contextmanager
+def pending_translations():
+    """Translatable attributes return ``PendingTranslation`` strings within the context"""
+    token = _pending_translator.set(Translatable.get_translator())
+    try:
+        with use_translator(PendingTranslation):
+            yield
+    finally:
+        _pending_translator.reset(token)
+
+
+def call_translated(func):
+    """Call ``func`` with the translatable attributes it reads translated, even within
+    ``pending_translations``, e.g. to get an identifier derived from a translatable value which
+    must not depend on whether the translations are pending"""
+    if _translator.get() is not PendingTranslation:
+        return func()
+    token = _translator.set(_pending_translator.get())
+    try:
+        return func()
+    finally:
+        _translator.reset(token)
+
+
+@contextmanager
+def use_locale(locale):
+    """Translate to ``locale`` within the context, e.g. to build a workflow for a locale"""
+    token = _locale.set((locale,))
+    try:
+        yield
+    finally:
+        _locale.reset(token)
+
+
+class BatchTranslator:
+    """ Translates all the translatable strings of a workflow in a single call when it is built,
+        memoizing the translations of each locale
+
+        e.g
+        ```python
+        def translate(strings, locale):
+            return [catalogue(locale).get(string, string) for string in strings]
+
+        Translatable._batch_translator = BatchTranslator(translate)
+        Translatable._get_locale = staticmethod(current_locale)
+        ```
+
+        args:
+            translate: Callable
+                Called with a list of strings and the locale, returns the list of translations
+
+            max_entries: int (default=10000)
+                The maximum number of translations memoized over all locales
+    """
+
+    __slots__ = ["translate", "memo"]
+
+    def __init__(self, translate, max_entries=10000):
+        self.translate = translate
+        self.memo = LRUCache(max_entries)
+
+    def __call__(self, value):
+        """Translate a single string, allowing use as ``Translatable._translator``"""
+        return self.get_translations((value,))[value]
+
+    def get_translations(self, strings, locale=None):
+        """Get a dict of each string to its translation in ``locale``, the current locale if None
+
+        Only strings without a memoized translation are passed to ``translate``.
+        """
+        if locale is None:
+            locale = Translatable.get_locale()
+        translations = {}
+        missing = []
+        for string in strings:
+            translation = self.memo.get((locale, string))
+            if translation is None:
+                missing.append(string)
+            else:
+                translations[string] = translation
+        if missing:
+            for string, translation in zip(missing, self.translate(missing, locale)):
+                translations[string] = self.memo.set((locale, string), translation)
+        return translations
+
+    def translate_pending(self, value, locale=None):
+        """Get a copy of a dict or list with its ``PendingTranslation`` strings translated"""
+        return replace_pending(value, lambda strings: self.get_translations(strings, locale))
+
+
+def translate_strings(strings, locale=None):
+    """Get a dict of each string to its translation in ``locale``, the current locale if None
+
+    Uses the batch translator when set, otherwise ``Translatable._translator``.
+    """
+    if locale is None:
+        locale = Translatable.get_locale()
+    batch_translator = Translatable._batch_translator
+    if batch_translator is not None:
+        return batch_translator.get_translations(strings, locale)
+    translator = Translatable.get_translator()
+    with use_locale(locale):
+        return {string: translator(string) for string in strings}
+
+
+def get_message_key(string):
+    """Get the key identifying a translatable string in a message catalogue"""
+    return blake2b(string.encode(), digest_size=8).hexdigest()
+
+
+def use_message_keys(value):
+    """Replace the ``PendingTranslation`` strings of a dict or list with their message keys
+
+    Returns the replaced value and a dict of message key to string.
+    """
+    messages = {}
+
+    def get_keys(strings):
+        keys = {}
+        for string in strings:
+            key = keys[string] = get_message_key(string)
+            messages[key] = str(string)
+        return keys
+
+    return replace_pending(value, get_keys), messages
+
+
+def replace_pending(value, get_replacements):
+    """Get a copy of a dict or list with its ``PendingTranslation`` strings replaced
+
+    ``get_replacements`` is called once with the set of strings and returns a dict of each string
+    to its replacement. Only the dicts and lists containing the strings are copied, so ``value``
+    is not modified and may be cached.
+    """
+    strings = set()
+    containing = set()
+    if not _find_pending(value, strings, containing):
+        return value
+    return _replace_pending(value, get_replacements(strings), containing)
+
+
+def _find_pending(value, strings, containing):
+    """Add the pending strings of ``value`` to ``strings`` and the ids of the dicts and lists
+    containing them to ``containing``, returns whether ``value`` contains pending strings"""
+    found = False
+    for item in value.values() if isinstance(value, dict) else value:
+        if type(item) is PendingTranslation:
+            strings.add(item)
+            found = True
+        elif isinstance(item, (dict, list)) and _find_pending(item, strings, containing):
+            found = True
+    if found:
+        containing.add(id(value))
+    return found
+
+
+def _replace_pending(value, replacements, containing):
+    def replace(item):
+        if type(item) is PendingTranslation:
+            return replacements[item]
+        if isinstance(item, (dict, list)) and id(item) in containing:
+            return _replace_pending(item, replacements, containing)
+        return item
+
+    if isinstance(value, dict):
+        return {key: replace(item) for key, item in value.items()}
+    return [replace(item) for item in value]
@@ -1,6 +1,26 @@
+import re
+from itertools import compress
+from operator import not_
+from .cache import LRUCache
+from .compiler import get_part_version, get_state, mark_changed, set_state
+from .jsonpath import make_getter
 from .translate import Translatable
+from ..exceptions import InvalidArguments
 
-__all__ = ("Validator",)
+__all__ = (
+    "Validator",
+    "CompiledValidators",
+    "compile_validator",
+    "compile_batch_validator",
+    "VALIDATOR_TYPE_MAPPING",
+    "BATCH_VALIDATOR_TYPE_MAPPING",
+)
+
+
+# Passed as the value of fields which have no value, the ``value_key`` is used instead
+_NO_VALUE = object()
+
+INT_PATTERN = re.compile(r"[-+]?[0-9]+")
 
 
 class Validator:
@@ -39,7 +59,10 @@ class Validator:
         "validator_value",
         "validator_key",
         "valid_when",
-        "__weakref__",
+        "_fingerprint",
+        "_version",
+        "_dict_cache",
+        "_message_template",
     ]
 
     message_template = Translatable()
@@ -61,10 +84,50 @@ class Validator:
         self.validator_key = validator_key
         self.message_template = message_template or ""
         self.valid_when = valid_when
+        self._fingerprint = None
+        self._version = 0
+        self._dict_cache = None
 
     def __iter__(self):
         yield self
 
+    @staticmethod
+    def add_validator_type(name, function, batch_function=None):
+        """Evaluate the validators of type ``name`` with ``function`` on the server, see
+        ``compile_validator``, and lists of values with ``batch_function`` when given, see
+        ``compile_batch_validator``"""
+        VALIDATOR_TYPE_MAPPING[name] = function
+        if batch_function is None:
+            BATCH_VALIDATOR_TYPE_MAPPING.pop(name, None)
+        else:
+            BATCH_VALIDATOR_TYPE_MAPPING[name] = batch_function
+
+    @classmethod
+    def from_dict(cls, identifier, validator_dict):
+        """Create the validator from its dict in a workflow dict, see ``WorkflowLoader``"""
+        return cls(
+            identifier=identifier,
+            validator=validator_dict["type"],
+            value_key=validator_dict.get("value_key"),
+            validator_value=validator_dict.get("validator_value"),
+            validator_key=validator_dict.get("validator_key"),
+            message_template=validator_dict.get("message", {}).get("template"),
+            valid_when=validator_dict.get("valid_when", True),
+        )
+
+    def get_version(self):
+        return (get_part_version(self),)
+
+    def changed(self):
+        """Mark the validator as modified after modifying its lists or dicts in place"""
+        mark_changed(self)
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
     def get_message(self):
         return {"type": "error", "template": self.message_template}
 
@@ -85,3 +148,355 @@ class Validator:
             validator["validator_key"] = self.validator_key
 
         return validator
+
+
+def is_int(value, comparison):
+    if isinstance(value, str):
+        return INT_PATTERN.fullmatch(value) is not None
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_length(value, comparison):
+    """Whether a string or list has at least ``comparison`` items, e.g. is not empty when 1"""
+    try:
+        return len(value) >= int(comparison)
+    except (TypeError, ValueError):
+        return False
+
+
+def greater_than(value, comparison):
+    try:
+        return float(value) > float(comparison)
+    except (TypeError, ValueError):
+        return False
+
+
+def less_than(value, comparison):
+    try:
+        return float(value) < float(comparison)
+    except (TypeError, ValueError):
+        return False
+
+
+# Functions evaluating the validator types on the server, called with the value and the
+# comparison value, see ``Validator.add_validator_type``
+VALIDATOR_TYPE_MAPPING = {
+    "equals": lambda value, comparison: value == comparison,
+    "isInt": is_int,
+    "isLength": is_length,
+    "greaterThan": greater_than,
+    "lessThan": less_than,
+}
+
+
+def _get_validator_function(validator_type, validator_types=None):
+    """Get the function of a validator type, one raising ``InvalidArguments`` when evaluated if
+    the type is not known, so only the workflows evaluating it fail"""
+    function = (VALIDATOR_TYPE_MAPPING if validator_types is None else validator_types).get(
+        validator_type
+    )
+    if function is None:
+
+        def function(value, comparison):
+            raise InvalidArguments("Unknown validator type {!r}".format(validator_type))
+
+    return function
+
+
+def is_int_batch(values, comparison):
+    match = INT_PATTERN.fullmatch
+    return [
+        match(value) is not None
+        if type(value) is str
+        else type(value) is int or is_int(value, comparison)
+        for value in values
+    ]
+
+
+def _compare_batch(values, comparison, compare):
+    try:
+        comparison = float(comparison)
+    except (TypeError, ValueError):
+        return [False] * len(values)
+    results = []
+    append = results.append
+    for value in values:
+        try:
+            append(compare(float(value), comparison))
+        except (TypeError, ValueError):
+            append(False)
+    return results
+
+
+def greater_than_batch(values, comparison):
+    return _compare_batch(values, comparison, float.__gt__)
+
+
+def less_than_batch(values, comparison):
+    return _compare_batch(values, comparison, float.__lt__)
+
+
+# Functions evaluating the validator types for a list of values with the same comparison value,
+# returning a list of bools which must match the functions of ``VALIDATOR_TYPE_MAPPING``
+BATCH_VALIDATOR_TYPE_MAPPING = {
+    "equals": lambda values, comparison: [value == comparison for value in values],
+    "isInt": is_int_batch,
+    "greaterThan": greater_than_batch,
+    "lessThan": less_than_batch,
+}
+
+
+def compile_validator(validator_dict, validator_types=None):
+    """Get a function evaluating a validator dict
+
+    The function is called with the context and optionally the value of a field, which is
+    validated instead of the value at ``value_key``, and returns whether the validator is valid.
+    Its jsonpaths are parsed once. The function raises ``InvalidArguments`` when the validator
+    type is not known.
+
+    args:
+        validator_dict: dict
+            The dict of the validator in a workflow dict
+
+        validator_types: dict (default=None)
+            The functions of the validator types, ``VALIDATOR_TYPE_MAPPING`` if None
+    """
+    validator_type = validator_dict["type"]
+    function = _get_validator_function(validator_type, validator_types)
+
+    valid_when = validator_dict.get("valid_when", True)
+    value_key = validator_dict.get("value_key")
+    get_value = make_getter(value_key) if value_key is not None else lambda context: None
+    comparison = validator_dict.get("validator_value")
+    validator_key = validator_dict.get("validator_key")
+    if comparison is not None or validator_key is None:
+        get_comparison = None
+    else:
+        get_comparison = make_getter(validator_key)
+
+    if get_comparison is None:
+
+        def is_valid(context, value=_NO_VALUE):
+            if value is _NO_VALUE:
+                value = get_value(context)
+            return bool(function(value, comparison)) == valid_when
+
+    else:
+
+        def is_valid(context, value=_NO_VALUE):
+            if value is _NO_VALUE:
+                value = get_value(context)
+            return bool(function(value, get_comparison(context))) == valid_when
+
+    return is_valid
+
+
+def compile_batch_validator(validator_dict, validator_types=None):
+    """Get a function evaluating a validator dict for a column of field values
+
+    The function is called with the list of values and the list of the contexts they are from,
+    and returns the list of whether each value is valid, as ``compile_validator`` would. The
+    validator types of ``BATCH_VALIDATOR_TYPE_MAPPING`` evaluate the whole column at once when
+    the comparison value is the same for every value, i.e. it is not read from ``validator_key``.
+
+    args:
+        validator_dict: dict
+            The dict of the validator in a workflow dict
+
+        validator_types: dict (default=None)
+            The functions of the validator types, ``VALIDATOR_TYPE_MAPPING`` if None, in which
+            case the functions of ``BATCH_VALIDATOR_TYPE_MAPPING`` are used
+    """
+    validator_type = validator_dict["type"]
+    function = _get_validator_function(validator_type, validator_types)
+    batch_function = None
+    if validator_types is None:
+        batch_function = BATCH_VALIDATOR_TYPE_MAPPING.get(validator_type)
+
+    valid_when = validator_dict.get("valid_when", True)
+    comparison = validator_dict.get("validator_value")
+    validator_key = validator_dict.get("validator_key")
+    if comparison is None and validator_key is not None:
+        get_comparison = make_getter(validator_key)
+
+        def are_valid(values, contexts):
+            return [
+                bool(function(value, get_comparison(context))) == valid_when
+                for value, context in zip(values, contexts)
+            ]
+
+    elif batch_function is None:
+
+        def are_valid(values, contexts):
+            return [bool(function(value, comparison)) == valid_when for value in values]
+
+    elif valid_when is True:
+
+        def are_valid(values, contexts):
+            return batch_function(values, comparison)
+
+    elif valid_when is False:
+
+        def are_valid(values, contexts):
+            return [not result for result in batch_function(values, comparison)]
+
+    else:
+
+        def are_valid(values, contexts):
+            return [result == valid_when for result in batch_function(values, comparison)]
+
+    return are_valid
+
+
+class CompiledValidators:
+    """The validators of a workflow dict compiled to functions, see ``compile_validator``, so a
+    server can evaluate them, e.g. to validate the data submitted by a client
+
+    Use ``for_workflow`` to share the compiled validators of a workflow hash.
+
+    args:
+        workflow_dict: dict
+            The workflow dict, or its sections without the hash and context
+
+        validator_types: dict (default=None)
+            The functions of the validator types, ``VALIDATOR_TYPE_MAPPING`` if None
+    """
+
+    __slots__ = ["validators", "messages", "fields", "validator_dicts", "validator_types", "_batch"]
+
+    # Compiled validators by workflow hash
+    cache = LRUCache(256)
+
+    def __init__(self, workflow_dict, validator_types=None):
+        validator_dicts = self.validator_dicts = workflow_dict.get("validators") or {}
+        self.validator_types = validator_types
+        # The batch validators are compiled when first used, see ``get_error_masks``
+        self._batch = None
+        self.validators = {
+            identifier: compile_validator(validator_dict, validator_types)
+            for identifier, validator_dict in validator_dicts.items()
+        }
+        self.messages = {
+            identifier: (validator_dict.get("message") or {}).get("template")
+            for identifier, validator_dict in validator_dicts.items()
+        }
+        # The destination path, value getter and validator identifiers of each field
+        self.fields = []
+        seen = set()
+        components = workflow_dict.get("components") or {}
+        for flow_dict in iter_component_lookups(workflow_dict["flow"], components):
+            path = flow_dict.get("destination_path")
+            identifiers = components[flow_dict["name"]].get("validator")
+            if path and identifiers and (path, flow_dict["name"]) not in seen:
+                seen.add((path, flow_dict["name"]))
+                self.fields.append((path, make_getter(path), tuple(identifiers)))
+
+    @classmethod
+    def for_workflow(cls, workflow_dict, workflow_hash=None):
+        """Get the compiled validators of a workflow dict, shared by the workflows with the same
+        hash, ``workflow_hash`` or the hash of the dict"""
+        if workflow_hash is None:
+            workflow_hash = workflow_dict.get("hash")
+        if workflow_hash is None:
+            return cls(workflow_dict)
+        compiled = cls.cache.get(workflow_hash)
+        if compiled is None:
+            compiled = cls.cache.set(workflow_hash, cls(workflow_dict))
+        return compiled
+
+    def is_valid(self, identifier, context, value=_NO_VALUE):
+        """Evaluate a validator against the context, or ``value`` when it validates a field"""
+        return self.validators[identifier](context, value)
+
+    def all_valid(self, identifiers, context):
+        """Whether all the validators are valid, e.g. the preconditions of a task"""
+        validators = self.validators
+        return all(validators[identifier](context) for identifier in identifiers or ())
+
+    def get_errors(self, context):
+        """Validate the values of the fields of the workflow in a context
+
+        Returns a dict of the destination path of each invalid field to the message templates of
+        its invalid validators. Fields without a value in the context are not validated.
+        """
+        errors = {}
+        validators = self.validators
+        for path, getter, identifiers in self.fields:
+            value = getter(context, _NO_VALUE)
+            if value is _NO_VALUE:
+                continue
+            for identifier in identifiers:
+                if not validators[identifier](context, value):
+                    errors.setdefault(path, []).append(self.messages[identifier])
+        return errors
+
+    def get_batch_validators(self):
+        if self._batch is None:
+            self._batch = {
+                identifier: compile_batch_validator(validator_dict, self.validator_types)
+                for identifier, validator_dict in self.validator_dicts.items()
+            }
+        return self._batch
+
+    def get_error_masks(self, contexts):
+        """Validate the values of the fields of the workflow in many contexts, e.g. a bulk import
+
+        Each validator is evaluated for the column of the values of its field, see
+        ``compile_batch_validator``. Returns a dict of the destination path of each field invalid
+        in some contexts to a list with a bool for each context, True when the field is invalid
+        in that context. The fields are those ``get_errors`` would return for each context.
+        """
+        contexts = contexts if isinstance(contexts, list) else list(contexts)
+        batch_validators = self.get_batch_validators()
+        masks = {}
+        for path, getter, identifiers in self.fields:
+            column = [getter(context, _NO_VALUE) for context in contexts]
+            if _NO_VALUE in column:
+                indexes = [index for index, value in enumerate(column) if value is not _NO_VALUE]
+                values = [column[index] for index in indexes]
+                field_contexts = [contexts[index] for index in indexes]
+            else:
+                indexes = range(len(column))
+                values, field_contexts = column, contexts
+
+            mask = masks.get(path)
+            for identifier in identifiers:
+                results = batch_validators[identifier](values, field_contexts)
+                if all(results):
+                    continue
+                if mask is None:
+                    mask = masks[path] = [False] * len(contexts)
+                for index in compress(indexes, map(not_, results)):
+                    mask[index] = True
+        return masks
+
+    def get_error_mask(self, contexts):
+        """Get a list with a bool for each context, True when a field is invalid in it"""
+        contexts = contexts if isinstance(contexts, list) else list(contexts)
+        masks = self.get_error_masks(contexts)
+        if not masks:
+            return [False] * len(contexts)
+        return [any(invalid) for invalid in zip(*masks.values())]
+
+
+def iter_component_lookups(task_dict, components):
+    """Yield the component dicts of the screens of a task dict and its sub flows and of the
+    components they contain"""
+    task_dicts = [task_dict]
+    while task_dicts:
+        task_dict = task_dicts.pop()
+        task_type = task_dict.get("type")
+        if task_type == "flow":
+            task_dicts.extend(task_dict["tasks"])
+        elif task_type == "condition":
+            task_dicts.extend(
+                target
+                for target in (task_dict.get("on_success"), task_dict.get("on_failure"))
+                if isinstance(target, dict) and "type" in target
+            )
+        elif task_type == "screen":
+            rows = list(task_dict["components"])
+            while rows:
+                for flow_dict in rows.pop():
+                    yield flow_dict
+                    rows.extend(components[flow_dict["name"]].get("components") or ())
@@ -1,87 +1,548 @@
+import copy
 import json
-from hashlib import sha512
-from collections import defaultdict
+from copy import deepcopy
+from threading import Lock
+from .cache import LRUCache
+from .compiler import (
+    Parts,
+    SameIdentiferDifferentValues,
+    WorkflowCompiler,
+    dict_to_set,
+    freeze_list,
+    get_state,
+    mark_changed,
+    new_version,
+    set_state,
+)
+from .readonly import ReadOnlyDict, read_only
 from .tasks import Flow
+from .translate import Translatable, translate_strings, use_locale
 
-__all__ = ("Workflow",)
+# The hashing, patch, jsonpath and validators modules are imported by the methods using them, so
+# importing ``Workflow`` does not import them
 
+__all__ = (
+    "Workflow",
+    # Defined in the compiler since building the sections moved there, still imported from here
+    "SameIdentiferDifferentValues",
+    "dict_to_set",
+    "freeze_list",
+)
 
-class SameIdentiferDifferentValues(Exception):
-    pass
 
+# Guards the creation of the per class caches
+_class_cache_lock = Lock()
 
-def freeze_list(list_to_freeze):
-    return frozenset(
-        dict_to_set(value)
-        if isinstance(value, dict)
-        else freeze_list(value)
-        if isinstance(value, list)
-        else
-        value
-        for value in list_to_freeze
-    )
 
+def split_chunks(data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        yield bytes(data[start : start + chunk_size])
 
-def dict_to_set(d):
-    return frozenset(
-        (key, dict_to_set(value))
-        if isinstance(value, dict)
-        else (key, freeze_list(value))
-        if isinstance(value, list)
-        else (key, value)
-        for key, value in d.items()
-    )
+
+def join_chunks(pieces, chunk_size):
+    """Join the strings yielded by ``pieces`` into encoded chunks of about ``chunk_size`` bytes"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+class CompiledWorkflow:
+    """The context independent result of building a workflow
+
+    Instances of a workflow built with the same arguments share a single compiled workflow when
+    ``Workflow.cache_templates`` is enabled, so its sections are read only. The lazily
+    decoded and encoded values may be used from several threads.
+    """
+
+    __slots__ = ["base_flow_task", "hash", "size", "memo", "_flow_cache", "_encoded", "_lock"]
+
+    def __init__(self, base_flow_task, flow_cache, hash, size, memo=None, encoded_flow=None):
+        self.base_flow_task = base_flow_task
+        self._flow_cache = flow_cache
+        self.hash = hash
+        self.size = size
+        # The memo of the hasher, reused when the workflow is rebuilt
+        self.memo = memo
+        # The flow cache encoded when hashing it, see ``encoded``
+        self._encoded = None if encoded_flow is None else self._splice_hash(encoded_flow, hash)
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # The encoded workflow is pickled rather than its sections, which are decoded when needed
+        return (self.base_flow_task, self.hash, self.size, bytes(self.encoded))
+
+    def __setstate__(self, state):
+        self.base_flow_task, self.hash, self.size, self._encoded = state
+        self._flow_cache = None
+        self.memo = None
+        self._lock = Lock()
+
+    @classmethod
+    def from_encoded(cls, encoded, hash):
+        """Create from ``encoded``, e.g. a memory mapped artifact, decoding the sections only
+        when needed. The base flow task is not available."""
+        compiled = cls(None, None, hash, len(encoded))
+        compiled._encoded = encoded
+        return compiled
+
+    @property
+    def flow_cache(self):
+        if self._flow_cache is None:
+            with self._lock:
+                if self._flow_cache is None:
+                    flow_cache = json.loads(b"".join((self._encoded, b"{}}")))
+                    del flow_cache["hash"]
+                    del flow_cache["context"]
+                    self._flow_cache = read_only(flow_cache)
+        return self._flow_cache
+
+    @property
+    def encoded(self):
+        """The encoded workflow up to the context value, without the context and closing brace"""
+        if self._encoded is None:
+            flow_cache = self.flow_cache
+            with self._lock:
+                if self._encoded is None:
+                    self._encoded = self._splice_hash(
+                        json.dumps(flow_cache).encode(), self.hash
+                    )
+        return self._encoded
+
+    @staticmethod
+    def _splice_hash(encoded_flow, hash):
+        # The encoded flow cache without its closing brace, followed by the hash and the key of
+        # the context
+        return b"".join(
+            (encoded_flow[:-1], b', "hash": ', json.dumps(hash).encode(), b', "context": ')
+        )
+
+    def _iter_pieces(self):
+        encoder = json.JSONEncoder()
+        separator = "{"
+        for key, value in self.flow_cache.items():
+            yield separator + json.dumps(key) + ": "
+            yield from encoder.iterencode(value)
+            separator = ", "
+        yield ', "hash": ' + json.dumps(self.hash) + ', "context": '
+
+    def iter_encoded(self, chunk_size):
+        """Yield ``encoded`` in chunks, encoding it piece by piece when it is not yet cached"""
+        if self._encoded is not None:
+            yield from split_chunks(self._encoded, chunk_size)
+        else:
+            yield from join_chunks(self._iter_pieces(), chunk_size)
 
 
 class Workflow:
-    __slots__ = ["name", "base_flow_task", "hash", "flow_cache", "context"]
+    __slots__ = [
+        "name",
+        "base_flow_task",
+        "hash",
+        "flow_cache",
+        "context",
+        "compiled",
+        "is_shared",
+        "locale",
+        "_previous",
+        "_cached_since",
+    ]
+
+    # Share the built flow between instances created with the same arguments, only enable this
+    # when ``flow`` depends on nothing but its arguments (e.g. not on ``self.context``)
+    cache_templates = False
+    # Bounds of the per class cache, size is measured in bytes of the encoded workflow
+    template_cache_max_entries = 64
+    template_cache_max_size = 32 * 1024 * 1024
+    # Add the content hash of each task and component to its dict
+    emit_content_hashes = False
+    # Emit message keys instead of translated strings, so the workflow is the same for every
+    # locale, the translations are served separately by ``get_catalogue``
+    emit_message_keys = False
+    # Add the ``path_tokens`` and ``template_tokens`` sections with the parsed jsonpaths and
+    # templates of the workflow, so clients do not parse them, see ``tokenize_workflow``
+    emit_path_tokens = False
+    # Bounds of the per class cache of previous versions and patches used by ``get_patch``,
+    # disabled by default
+    history_max_entries = 0
+    history_max_size = 32 * 1024 * 1024
 
     def __init__(self, *args, context=None):
         self.context = context if context is not None else {}
         self.name = self.__class__.__name__
-        self.base_flow_task = Flow(name=self.name)
         self.flow_cache = None
         self.hash = None
-        self.build_flow(*args)
+        self.compiled = None
+        self._previous = None
+        # The version of the last ``clear_cache``, the dicts cached on the parts before it are
+        # rebuilt
+        self._cached_since = None
+        self.is_shared = False
+        # Workflows are translated to, cached and hashed for the locale they are created in
+        self.locale = None if self.emit_message_keys else Translatable.get_locale()
+
+        template = self.get_template(args) if self.cache_templates else None
+        if template is None:
+            self.base_flow_task = Flow(name=self.name)
+            self.build_flow(*args)
+        else:
+            self.use_template(template)
+
+    def __getstate__(self):
+        # The flow cache is that of the compiled workflow and the previous compiled workflow is
+        # only kept to rebuild the workflow after it changed, versions are only compared within
+        # a process
+        state = get_state(self)
+        state.pop("flow_cache", None)
+        state.pop("_previous", None)
+        state.pop("_cached_since", None)
+        return state
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
+    @classmethod
+    def from_dict(cls, workflow_dict, context=None):
+        """Create a workflow from a workflow dict, e.g. as returned by ``as_dict``, without running
+        ``flow``. The tasks and components are loaded when accessed, see ``WorkflowLoader``.
+
+        args:
+            workflow_dict: dict
+                The workflow dict
+
+            context: dict (default=None)
+                The context of the workflow, the context of the dict if None
+        """
+        # Imported here as loading imports the components
+        from .loader import WorkflowLoader
+
+        workflow = cls.__new__(cls)
+        set_state(
+            workflow,
+            {
+                "name": cls.__name__,
+                "base_flow_task": WorkflowLoader(workflow_dict).load_flow(),
+                "context": workflow_dict.get("context", {}) if context is None else context,
+                "is_shared": False,
+            },
+        )
+        return workflow
+
+    @classmethod
+    def from_json(cls, data, context=None):
+        """Create a workflow from its encoded JSON, see ``from_dict``"""
+        return cls.from_dict(json.loads(data), context)
 
     @property
     def has_been_built(self):
-        return self.flow_cache is not None
+        return self.compiled is not None or self.flow_cache is not None
+
+    @classmethod
+    def _get_class_cache(cls, name, max_entries, max_size):
+        cache = cls.__dict__.get(name)
+        if cache is None:
+            with _class_cache_lock:
+                cache = cls.__dict__.get(name)
+                if cache is None:
+                    cache = LRUCache(max_entries, max_size)
+                    setattr(cls, name, cache)
+        return cache
+
+    @classmethod
+    def get_template_cache(cls):
+        """Get the compiled workflow cache of this class, subclasses do not share caches"""
+        return cls._get_class_cache(
+            "_template_cache", cls.template_cache_max_entries, cls.template_cache_max_size
+        )
+
+    @classmethod
+    def get_catalogue_cache(cls):
+        """Get the cache of message catalogues of this class, bounded as the template cache"""
+        return cls._get_class_cache(
+            "_catalogue_cache", cls.template_cache_max_entries, cls.template_cache_max_size
+        )
+
+    @classmethod
+    def get_history(cls):
+        """Get the cache of previous versions and patches of this class"""
+        return cls._get_class_cache("_history", cls.history_max_entries, cls.history_max_size)
+
+    @classmethod
+    def add_history(cls, workflow_dict, locale=None):
+        """Add a previous version of the workflow, e.g. a stored artifact, to serve patches from
+
+        The hash of the version is that of the dict, or computed for the ``locale`` the workflow
+        was built in when the dict has none, see ``get_hash``. Returns the hash of the version.
+        """
+        from .hashing import get_workflow_hash
+
+        workflow_hash = workflow_dict.get("hash") or get_workflow_hash(workflow_dict, locale)
+        size = len(json.dumps(workflow_dict))
+        cls.get_history().set(workflow_hash, workflow_dict, size)
+        return workflow_hash
+
+    def get_patch(self, from_hash):
+        """Get the patch from the version with hash ``from_hash`` to this workflow
+
+        Returns None when the version is not in the history of the workflow class.
+        """
+        from .patch import make_patch
+
+        history = self.get_history()
+        key = (from_hash, self.get_hash())
+        patch = history.get(key)
+        if patch is None:
+            old = history.get(from_hash)
+            if old is None:
+                return None
+            # The versions are stored without their hash, which depends on the locale
+            old = dict(old, hash=from_hash)
+            new = dict(self._get_flow_no_context(), hash=self.get_hash())
+            patch = make_patch(old, new)
+            history.set(key, patch, len(json.dumps(patch)))
+        return patch
+
+    @classmethod
+    def clear_template_cache(cls):
+        cls.get_template_cache().clear()
+
+    @classmethod
+    def load_artifact(cls, store):
+        """Use the compiled workflow of this class from an ``ArtifactStore`` for instances built
+        without arguments and without a locale, instead of running ``flow``. Requires
+        ``cache_templates``.
+
+        Returns False when ``cache_templates`` is disabled, when the store has no artifact for
+        this class or when the artifact is larger than the template cache can hold.
+        """
+        if not cls.cache_templates:
+            return False
+        compiled = store.get(store.get_key(cls))
+        if compiled is None:
+            return False
+        cache = cls.get_template_cache()
+        cache.set(((), None), compiled, compiled.size)
+        return cache.get(((), None)) is compiled
+
+    @classmethod
+    def warm_up(cls, locales=(None,), arguments=((),)):
+        """Build the workflow for each locale and tuple of ``build_flow`` arguments, so they are
+        cached when ``cache_templates`` is enabled.
+
+        Returns a dict of (arguments, locale) to the hash of the workflow.
+        """
+        hashes = {}
+        for locale in locales:
+            with use_locale(locale):
+                for args in arguments:
+                    hashes[(args, locale)] = cls(*args).get_hash()
+        return hashes
+
+    def get_template(self, args):
+        """Get the compiled workflow for the ``build_flow`` arguments and locale, building it if
+        needed
+
+        Returns None when the arguments are not hashable and so cannot be cached.
+        """
+        key = (args, self.locale)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        cache = self.get_template_cache()
+        template = cache.get(key)
+        if template is None:
+            self.base_flow_task = Flow(name=self.name)
+            self.build_flow(*args)
+            template = self.compile()
+            cache.set(key, template, template.size)
+        return template
+
+    def use_template(self, template):
+        self.base_flow_task = template.base_flow_task
+        self.hash = template.hash
+        self.compiled = template
+        self.is_shared = True
+
+    def compile(self):
+        """Build and hash the context independent parts of the workflow, which are read only
+
+        The hash is that of the encoded workflow, which is kept for the output. After
+        ``changed`` only the dicts of the changed parts are rebuilt, and only their content
+        hashes are computed again when they are emitted.
+        """
+        from .hashing import WorkflowHasher, hash_encoded
+
+        self._ensure_flow()
+        with use_locale(self.locale):
+            compiler = WorkflowCompiler(
+                message_keys=self.emit_message_keys, since=self._cached_since
+            )
+            flow = compiler.compile(self.base_flow_task)
+        if self.emit_path_tokens:
+            from .jsonpath import tokenize_workflow
+
+            flow.update(tokenize_workflow(flow))
+
+        self.flow_cache = read_only(flow)
+        encoded = json.dumps(self.flow_cache).encode()
+        self.hash = hash_encoded(encoded, self.locale)
+        size = len(encoded)
+
+        previous = self._previous.memo if self._previous is not None else None
+        self._previous = None
+        memo = None
+        if self.emit_content_hashes:
+            # The content hashes are added to copies of the dicts, the workflow is encoded again
+            hasher = WorkflowHasher(memo=previous)
+            hasher.hash_parts(self.flow_cache)
+            self.flow_cache = read_only(hasher.add_hashes(self.flow_cache))
+            memo = hasher.memo
+            encoded = None
+        self.compiled = CompiledWorkflow(
+            self.base_flow_task, self.flow_cache, self.hash, size, memo, encoded
+        )
+        if self.history_max_entries:
+            self.get_history().set(self.hash, self.flow_cache, size)
+        return self.compiled
+
+    def get_catalogue(self, locale=None):
+        """Get the dict of message key to translation in ``locale``, the current locale if None,
+        of the strings used by the workflow. Requires ``emit_message_keys``.
+
+        Catalogues are cached by workflow hash and locale.
+        """
+        if locale is None:
+            locale = Translatable.get_locale()
+        cache = self.get_catalogue_cache()
+        key = (self.get_hash(), locale)
+        catalogue = cache.get(key)
+        if catalogue is None:
+            messages = self._get_flow_no_context().get("messages", {})
+            translations = translate_strings(set(messages.values()), locale)
+            catalogue = {
+                message_key: translations[string] for message_key, string in messages.items()
+            }
+            cache.set(key, catalogue, len(json.dumps(catalogue)))
+        return catalogue
+
+    def get_catalogue_tokens(self, locale=None):
+        """Get the dict of message key to the segments of the translation in ``locale``, the
+        current locale if None, of the strings with a placeholder, as in ``template_tokens``, see
+        ``emit_path_tokens``. Requires ``emit_message_keys``.
+
+        The tokens are cached by workflow hash and locale.
+        """
+        from .jsonpath import tokenize_template
+
+        if locale is None:
+            locale = Translatable.get_locale()
+        cache = self.get_catalogue_cache()
+        key = (self.get_hash(), locale, "template_tokens")
+        template_tokens = cache.get(key)
+        if template_tokens is None:
+            template_tokens = {}
+            for message_key, translation in self.get_catalogue(locale).items():
+                tokens = tokenize_template(translation) if "{" in translation else None
+                if tokens is not None:
+                    template_tokens[message_key] = tokens
+            cache.set(key, template_tokens, len(json.dumps(template_tokens)))
+        return template_tokens
+
+    def get_compiled(self):
+        if self.compiled is None:
+            self.compile()
+        return self.compiled
+
+    def _ensure_flow(self):
+        """Build the base flow of an instance using an artifact, see ``load_artifact``"""
+        if self.base_flow_task is None:
+            self.base_flow_task = Flow(name=self.name)
+            self.is_shared = False
+            self.flow()
+
+    def _detach(self):
+        """Stop sharing the base flow with other instances before it is modified, the dicts
+        built from the shared flow are not those of this instance anymore"""
+        if self.base_flow_task is None:
+            self._ensure_flow()
+        elif self.is_shared:
+            flow = copy.copy(self.base_flow_task)
+            flow.tasks = list(flow.tasks)
+            mark_changed(flow)
+            self.base_flow_task = flow
+            self.is_shared = False
+            self.changed()
 
     @staticmethod
     def _get_parts(part_type, iters, dict_getter):
-        result = {}
-        part_cache = defaultdict(set)
+        parts = Parts(part_type, dict_getter)
         for part in iters:
-            name = part.identifier
-            part_dict = dict_getter(part)
-            part_set = dict_to_set(part_dict)
-            if name in result:
-                if part_cache[name] != part_set:
-                    message = "Two {part_type} with the same identifer({name}) but different values"
-                    raise SameIdentiferDifferentValues(
-                        message.format(part_type=part_type, name=name)
-                    )
-            else:
-                result[name] = part_dict
-                part_cache[name] = part_set
-
-        return result
+            parts.add(part)
+        return parts.result
 
     def get_validators(self):
         """Get validator dicts"""
+        self._ensure_flow()
         return self._get_parts(
             "validators", self.base_flow_task.get_validators(), lambda x: x.as_dict()
         )
 
+    def validate(self, context=None):
+        """Validate the values of the fields of the workflow in a context, e.g. submitted by a
+        client, the context of the workflow if None
+
+        Returns a dict of the destination path of each invalid field to the message templates of
+        its invalid validators, see ``CompiledValidators``. The validators are compiled once for
+        each workflow hash.
+        """
+        return self.get_compiled_validators().get_errors(
+            self.context if context is None else context
+        )
+
+    def validate_batch(self, contexts):
+        """Validate the values of the fields of the workflow in many contexts, e.g. a bulk import
+
+        Returns a dict of the destination path of each field invalid in some contexts to a list
+        with a bool for each context, True when the field is invalid in it, see
+        ``CompiledValidators.get_error_masks``.
+        """
+        return self.get_compiled_validators().get_error_masks(contexts)
+
+    def get_path_accessors(self):
+        """Get the accessors of the jsonpaths of the workflow, see ``WorkflowPaths``, shared by
+        the workflows with the same hash"""
+        from .jsonpath import WorkflowPaths
+
+        compiled = self.get_compiled()
+        return WorkflowPaths.for_workflow(compiled.flow_cache, compiled.hash)
+
+    def get_compiled_validators(self):
+        """Get the validators of the workflow compiled to functions, shared by the workflows
+        with the same hash"""
+        from .validators import CompiledValidators
+
+        compiled = self.get_compiled()
+        return CompiledValidators.for_workflow(compiled.flow_cache, compiled.hash)
+
     def get_json_validators(self):
         """Get json validators dicts"""
+        self._ensure_flow()
         return self._get_parts(
             "json_validators", self.base_flow_task.get_json_validators(), lambda x: x.as_dict()
         )
 
     def get_base_components(self):
         """Get component dicts"""
+        self._ensure_flow()
         return self._get_parts(
             "components",
             self.base_flow_task.get_base_components(),
@@ -90,40 +551,132 @@ class Workflow:
 
     def _get_flow_no_context(self):
         if self.flow_cache is None:
-            self.flow_cache = {
-                "validators": self.get_validators(),
-                "components": self.get_base_components(),
-                "flow": self.base_flow_task.as_dict(),
-                "json_validators": self.get_json_validators(),
-            }
+            self.flow_cache = self.get_compiled().flow_cache
         return self.flow_cache
 
     def clear_cache(self):
+        """Clear the built workflow, the dicts cached on its parts are rebuilt too, e.g. after
+        modifying their lists or dicts in place without calling ``changed``"""
+        self.flow_cache = None
+        self.hash = None
+        self.compiled = None
+        self._previous = None
+        self._cached_since = new_version()
+
+    def changed(self):
+        """Mark the workflow as modified after changing its tasks or components, only the parts
+        which have changed are rebuilt. Call ``changed`` on the tasks and components whose lists
+        or dicts have been modified in place."""
+        if self.compiled is not None:
+            self._previous = self.compiled
         self.flow_cache = None
         self.hash = None
+        self.compiled = None
+
+    def clone(self, context=None):
+        """Get a variant of the workflow sharing its tasks, components and built dicts
+
+        The flow is copied when either workflow is modified, so modifying one does not modify
+        the other. Use ``replace_task`` and ``copy_task`` to change the tasks of a variant, the
+        dicts of the tasks which have not changed are shared rather than rebuilt.
+
+        args:
+            context: dict (default=None)
+                The context of the variant, the context of the workflow if None
+        """
+        clone = copy.copy(self)
+        if context is not None:
+            clone.context = context
+        if self.base_flow_task is not None:
+            self.is_shared = clone.is_shared = True
+        return clone
+
+    def replace_task(self, name, task):
+        """Replace the task of the main flow named ``name`` with ``task``"""
+        self._detach()
+        self.base_flow_task.replace_task(name, task)
+        self.changed()
+
+    def copy_task(self, name):
+        """Replace the task of the main flow named ``name`` with a copy and return it, so it can
+        be modified without modifying the workflows sharing the task, see ``clone``"""
+        self._detach()
+        task = self.base_flow_task.copy_task(name)
+        self.changed()
+        return task
 
     def clear_flow(self):
+        self._detach()
         self.base_flow_task.clear_tasks()
         self.clear_cache()
 
     def get_hash(self):
-        """Get hash of workflow json object not including the hash and context values"""
+        """Get hash of workflow json object not including the hash and context values
+
+        The hash is that of the encoded workflow and of the locale it was translated to, see
+        ``hash_encoded``, without the content hashes of ``emit_content_hashes``.
+        """
 
         if self.hash is None:
-            if self.flow_cache is None:
-                self._get_flow_no_context()
-            self.hash = str(sha512(json.dumps(self.flow_cache).encode()).hexdigest())
+            self.compile()
         return self.hash
 
-    def as_dict(self):
-        """Build workflow dictionary to transform into JSON"""
-        workflow = self._get_flow_no_context()
-        workflow.update({"hash": self.get_hash(), "context": self.context})
-        return workflow
+    def encode_context(self, context=None):
+        """Encode the context as JSON, contexts which are already encoded are returned as is"""
+        if context is None:
+            context = self.context
+        if isinstance(context, (bytes, bytearray, memoryview)):
+            return context
+        return json.dumps(context).encode()
+
+    def as_dict(self, copy=False):
+        """Build workflow dictionary to transform into JSON
+
+        The dictionary is read only as it shares the sections cached by the workflow, unless
+        ``copy`` is True in which case it is a deep copy which may be modified.
+        """
+        workflow = ReadOnlyDict(
+            self._get_flow_no_context(), hash=self.get_hash(), context=self.context
+        )
+        return deepcopy(workflow) if copy else workflow
+
+    def as_json_bytes(self, context=None):
+        """Get the workflow as encoded JSON
+
+        Only the context is encoded, the rest of the workflow is encoded once when compiled.
+        ``context`` overrides the context of the workflow and may be given already encoded.
+        """
+        return b"".join((self.get_compiled().encoded, self.encode_context(context), b"}"))
+
+    def iter_json(self, context=None, chunk_size=64 * 1024):
+        """Yield the workflow as encoded JSON in chunks of about ``chunk_size`` bytes
+
+        The workflow is encoded section by section and the context as it is yielded, so neither
+        is held in memory as a whole. This can be used directly as a WSGI response body.
+        ``context`` is as for ``as_json_bytes``.
+        """
+        yield from self.get_compiled().iter_encoded(chunk_size)
+        if context is None:
+            context = self.context
+        if isinstance(context, (bytes, bytearray, memoryview)):
+            yield from split_chunks(context, chunk_size)
+        else:
+            yield from join_chunks(json.JSONEncoder().iterencode(context), chunk_size)
+        yield b"}"
+
+    def write_json(self, fp, context=None):
+        """Write the workflow as encoded JSON to the binary file like object ``fp``"""
+        encoded_context = self.encode_context(context)
+        fp.write(self.get_compiled().encoded)
+        fp.write(encoded_context)
+        fp.write(b"}")
 
     def add_task(self, *args, **kwargs):
         """Add task to main flow of the workflow"""
-        return self.base_flow_task.add_task(*args, **kwargs)
+        self._detach()
+        task = self.base_flow_task.add_task(*args, **kwargs)
+        self.changed()
+        return task
 
     def build_flow(self, *args, **kwargs):
         self.clear_flow()